@@ -13,4 +13,58 @@ class Config:
     MAX_CONVERSATIONS_PER_AGENT = int(os.getenv("MAX_CONVERSATIONS_PER_AGENT", "10"))
     CONVERSATION_TTL_DAYS = int(os.getenv("CONVERSATION_TTL_DAYS", "7"))
     INSIGHT_TTL_DAYS = int(os.getenv("INSIGHT_TTL_DAYS", "7"))
-
+    RULE_PARSER_MIN_CONFIDENCE = float(os.getenv("RULE_PARSER_MIN_CONFIDENCE", "0.8"))
+    SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+    SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.9"))
+    SEMANTIC_CACHE_DIM = int(os.getenv("SEMANTIC_CACHE_DIM", "1024"))
+    CRITERIA_GPT_TIMEOUT_SECONDS = float(os.getenv("CRITERIA_GPT_TIMEOUT_SECONDS", "10"))
+    # The leader's lock outlives its GPT call by this margin; waiters give up a little after the lock
+    SINGLE_FLIGHT_LOCK_MARGIN_SECONDS = float(os.getenv("SINGLE_FLIGHT_LOCK_MARGIN_SECONDS", "5"))
+    SINGLE_FLIGHT_WAIT_MARGIN_SECONDS = float(os.getenv("SINGLE_FLIGHT_WAIT_MARGIN_SECONDS", "2"))
+    SINGLE_FLIGHT_POLL_SECONDS = float(os.getenv("SINGLE_FLIGHT_POLL_SECONDS", "0.1"))
+    OPENAI_ASYNC_TIMEOUT_SECONDS = float(os.getenv("OPENAI_ASYNC_TIMEOUT_SECONDS", "60"))
+    OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+    ESTIMATE_MAX_ATTEMPTS = int(os.getenv("ESTIMATE_MAX_ATTEMPTS", "5"))
+    ESTIMATE_RETRY_BASE_SECONDS = float(os.getenv("ESTIMATE_RETRY_BASE_SECONDS", "30"))
+    ESTIMATE_RETRY_MAX_SECONDS = float(os.getenv("ESTIMATE_RETRY_MAX_SECONDS", "1800"))
+    ESTIMATE_GPT_TIMEOUT_SECONDS = float(os.getenv("ESTIMATE_GPT_TIMEOUT_SECONDS", "30"))
+    ESTIMATE_WORKER_POLL_SECONDS = int(os.getenv("ESTIMATE_WORKER_POLL_SECONDS", "2"))
+    # A job not acknowledged this long after a worker took it is queued again
+    ESTIMATE_JOB_TIMEOUT_SECONDS = int(os.getenv("ESTIMATE_JOB_TIMEOUT_SECONDS", "300"))
+    RENT_MODEL_ENABLED = os.getenv("RENT_MODEL_ENABLED", "true").lower() == "true"
+    RENT_MODEL_PATH = os.getenv("RENT_MODEL_PATH", "rent_model.json")
+    RENT_MODEL_MIN_ROWS = int(os.getenv("RENT_MODEL_MIN_ROWS", "20"))
+    FUZZY_MATCH_ENABLED = os.getenv("FUZZY_MATCH_ENABLED", "true").lower() == "true"
+    FUZZY_MATCH_THRESHOLD = float(os.getenv("FUZZY_MATCH_THRESHOLD", "0.6"))
+    SEARCH_PAGE_SIZE = int(os.getenv("SEARCH_PAGE_SIZE", "10"))
+    SEARCH_MAX_PAGE_SIZE = int(os.getenv("SEARCH_MAX_PAGE_SIZE", "50"))
+    SEARCH_CACHE_ENABLED = os.getenv("SEARCH_CACHE_ENABLED", "true").lower() == "true"
+    SEARCH_CACHE_TTL_SECONDS = int(os.getenv("SEARCH_CACHE_TTL_SECONDS", "600"))
+    SEARCH_CACHE_LRU_SIZE = int(os.getenv("SEARCH_CACHE_LRU_SIZE", "256"))
+    PROPERTY_INDEX_ENABLED = os.getenv("PROPERTY_INDEX_ENABLED", "false").lower() == "true"
+    PROPERTY_INDEX_RESYNC_SECONDS = int(os.getenv("PROPERTY_INDEX_RESYNC_SECONDS", "300"))
+    EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+    PRESIGNED_URL_TTL_SECONDS = int(os.getenv("PRESIGNED_URL_TTL_SECONDS", "3600"))
+    PRESIGNED_URL_REFRESH_SECONDS = int(os.getenv("PRESIGNED_URL_REFRESH_SECONDS", "300"))  # re-sign this long before expiry
+    PRESIGNED_URL_LRU_SIZE = int(os.getenv("PRESIGNED_URL_LRU_SIZE", "5000"))
+    IMAGE_UPLOAD_MAX_MB = int(os.getenv("IMAGE_UPLOAD_MAX_MB", "25"))
+    IMAGE_UPLOAD_PART_MB = int(os.getenv("IMAGE_UPLOAD_PART_MB", "8"))  # S3 multipart parts are at least 5 MB
+    IMAGE_VARIANT_WORKERS = int(os.getenv("IMAGE_VARIANT_WORKERS", "2"))  # processes resizing uploads
+    IMAGE_VARIANT_QUALITY = int(os.getenv("IMAGE_VARIANT_QUALITY", "80"))
+    TELEGRAM_PAGE_SIZE = int(os.getenv("TELEGRAM_PAGE_SIZE", "5"))
+    TELEGRAM_INGEST_MODE = os.getenv("TELEGRAM_INGEST_MODE", "queue")  # queue / inline
+    TELEGRAM_WORKERS = int(os.getenv("TELEGRAM_WORKERS", "4"))
+    TELEGRAM_QUEUE_SIZE = int(os.getenv("TELEGRAM_QUEUE_SIZE", "1000"))
+    TELEGRAM_DRAIN_SECONDS = float(os.getenv("TELEGRAM_DRAIN_SECONDS", "10"))
+    TELEGRAM_DEDUP_TTL_SECONDS = int(os.getenv("TELEGRAM_DEDUP_TTL_SECONDS", "86400"))  # Telegram keeps updates 24h
+    TELEGRAM_DEDUP_LRU_SIZE = int(os.getenv("TELEGRAM_DEDUP_LRU_SIZE", "10000"))
+    TELEGRAM_SEARCH_TTL_SECONDS = int(os.getenv("TELEGRAM_SEARCH_TTL_SECONDS", "3600"))  # "show more" lifetime
+    TELEGRAM_SEARCH_LRU_SIZE = int(os.getenv("TELEGRAM_SEARCH_LRU_SIZE", "10000"))  # without Redis
+    TELEGRAM_MAX_CONNECTIONS = int(os.getenv("TELEGRAM_MAX_CONNECTIONS", "20"))
+    TELEGRAM_TIMEOUT_SECONDS = float(os.getenv("TELEGRAM_TIMEOUT_SECONDS", "15"))
+    TELEGRAM_GLOBAL_RATE = float(os.getenv("TELEGRAM_GLOBAL_RATE", "30"))  # messages per second, whole bot
+    TELEGRAM_CHAT_RATE = float(os.getenv("TELEGRAM_CHAT_RATE", "1"))  # per chat
+    TELEGRAM_CHAT_BURST = float(os.getenv("TELEGRAM_CHAT_BURST", "5"))
+    TELEGRAM_CHAT_BUCKETS = int(os.getenv("TELEGRAM_CHAT_BUCKETS", "10000"))
+    TELEGRAM_MAX_RETRIES = int(os.getenv("TELEGRAM_MAX_RETRIES", "3"))  # on 429
+    TELEGRAM_MAX_RETRY_AFTER = float(os.getenv("TELEGRAM_MAX_RETRY_AFTER", "30"))  # longer waits give up
@@ -0,0 +1,140 @@
+import time
+from typing import Optional
+
+from app.config import Config
+from app.utils.redis_client import get_redis_client
+
+QUEUE_KEY = "estimate_jobs"
+DELAYED_KEY = "estimate_jobs:delayed"  # property id -> time it may run again
+PROCESSING_KEY = "estimate_jobs:processing"  # taken by a worker, not acknowledged yet
+STARTED_KEY = "estimate_jobs:started"  # property id -> time a worker took it
+
+
+class EstimateQueue:
+    """
+    Redis queue of properties waiting for a GPT rental/yield estimate.
+    Jobs are just property ids - the worker reads everything else from the DB.
+    A taken job stays on the processing list until ack(); if the worker dies first,
+    it goes back on the queue after ESTIMATE_JOB_TIMEOUT_SECONDS.
+    """
+
+    @staticmethod
+    def enqueue(property_id: str) -> bool:
+        """
+        Queues a property for estimation.
+
+        Returns:
+            True if queued, False if Redis is unavailable (caller should estimate inline)
+        """
+        client = get_redis_client()
+        if not client:
+            return False
+
+        try:
+            client.lpush(QUEUE_KEY, str(property_id))
+            return True
+        except Exception as e:
+            print(f"⚠️ Estimate enqueue error: {e}")
+            return False
+
+    @staticmethod
+    def retry_delay(attempt: int) -> float:
+        """Exponential backoff: base, 2*base, 4*base... capped"""
+        delay = Config.ESTIMATE_RETRY_BASE_SECONDS * (2 ** max(attempt - 1, 0))
+        return min(delay, Config.ESTIMATE_RETRY_MAX_SECONDS)
+
+    @staticmethod
+    def schedule_retry(property_id: str, attempt: int) -> bool:
+        """Puts a failed job back on the queue after its backoff delay"""
+        client = get_redis_client()
+        if not client:
+            return False
+
+        try:
+            run_at = time.time() + EstimateQueue.retry_delay(attempt)
+            client.zadd(DELAYED_KEY, {str(property_id): run_at})
+            return True
+        except Exception as e:
+            print(f"⚠️ Estimate retry error: {e}")
+            return False
+
+    @staticmethod
+    def _promote_due(client) -> int:
+        """Moves retries whose delay has passed to the main queue"""
+        promoted = 0
+        for property_id in client.zrangebyscore(DELAYED_KEY, 0, time.time()):
+            # zrem decides which worker owns the move when several poll at once
+            if client.zrem(DELAYED_KEY, property_id):
+                client.lpush(QUEUE_KEY, property_id)
+                promoted += 1
+        return promoted
+
+    @staticmethod
+    def _requeue_stale(client) -> int:
+        """Puts jobs back whose worker took them too long ago - it crashed or was killed"""
+        now = time.time()
+        # A worker that died between BLMOVE and ZADD left no start time - the timeout counts from now
+        for property_id in client.lrange(PROCESSING_KEY, 0, -1):
+            client.zadd(STARTED_KEY, {property_id: now}, nx=True)
+
+        requeued = 0
+        for property_id in client.zrangebyscore(STARTED_KEY, 0, now - Config.ESTIMATE_JOB_TIMEOUT_SECONDS):
+            # Same ownership rule as _promote_due
+            if client.zrem(STARTED_KEY, property_id):
+                client.lrem(PROCESSING_KEY, 1, property_id)
+                client.lpush(QUEUE_KEY, property_id)
+                requeued += 1
+        if requeued:
+            print(f"♻️ Requeued {requeued} estimate jobs left by a stopped worker")
+        return requeued
+
+    @staticmethod
+    def dequeue(timeout: int) -> Optional[str]:
+        """
+        Blocks up to `timeout` seconds for the next property id and moves it to the
+        processing list - call ack() when the job is finished.
+        Keep timeout below the Redis socket timeout.
+        """
+        client = get_redis_client()
+        if not client:
+            return None
+
+        try:
+            EstimateQueue._promote_due(client)
+            EstimateQueue._requeue_stale(client)
+            property_id = client.blmove(QUEUE_KEY, PROCESSING_KEY, timeout, "RIGHT", "LEFT")
+            if property_id:
+                client.zadd(STARTED_KEY, {property_id: time.time()})
+            return property_id
+        except Exception as e:
+            print(f"⚠️ Estimate dequeue error: {e}")
+            return None
+
+    @staticmethod
+    def ack(property_id: str):
+        """The job finished (or scheduled its own retry) - it won't be requeued"""
+        client = get_redis_client()
+        if not client:
+            return
+
+        try:
+            client.lrem(PROCESSING_KEY, 1, str(property_id))
+            client.zrem(STARTED_KEY, str(property_id))
+        except Exception as e:
+            print(f"⚠️ Estimate ack error: {e}")
+
+    @staticmethod
+    def get_stats() -> dict:
+        client = get_redis_client()
+        if not client:
+            return {"status": "unavailable"}
+
+        try:
+            return {
+                "status": "connected",
+                "queued": client.llen(QUEUE_KEY),
+                "waiting_retry": client.zcard(DELAYED_KEY),
+                "processing": client.llen(PROCESSING_KEY),
+            }
+        except Exception as e:
+            return {"status": "error", "error": str(e)}
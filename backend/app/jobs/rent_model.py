@@ -0,0 +1,139 @@
+# app/jobs/rent_model.py
+"""
+Local rent/yield model.
+
+    python -m app.jobs.rent_model train       # fit on the properties table, write RENT_MODEL_PATH
+    python -m app.jobs.rent_model evaluate    # hold-out comparison against the stored GPT values
+
+Only agent- and GPT-supplied values are used (Property.estimate_source) - the model's
+own predictions are stored in the same columns and would otherwise be learned back.
+"""
+import argparse
+import json
+import time
+import zlib
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.config import Config
+from app.database import SessionLocal
+from app.models.agent import Agent  # noqa: F401 - registers the agents table for the FK
+from app.models.property import Property
+from app.services.rent_estimator import RentEstimator
+from app.utils.city_names import city_key
+
+
+TRAINING_SOURCES = ("agent", "gpt")
+
+
+def load_training_rows(db: Session) -> list:
+    query = db.query(
+        Property.id, Property.city, Property.price, Property.rooms, Property.floor,
+        Property.rental_estimate, Property.yield_percent, Property.estimate_source,
+    ).filter(
+        Property.rental_estimate.isnot(None),
+        Property.yield_percent.isnot(None),
+        Property.estimate_source.in_(TRAINING_SOURCES),
+    )
+    return [row._asdict() for row in query]
+
+
+def train(db: Session, path: str = None, min_rows: int = None) -> RentEstimator:
+    rows = load_training_rows(db)
+    estimator = RentEstimator(min_rows=min_rows).fit(rows)
+    estimator.save(path or Config.RENT_MODEL_PATH)
+    print(f"✅ Trained on {len(rows)} properties, {len(estimator.cities)} cities -> {path or Config.RENT_MODEL_PATH}")
+    return estimator
+
+
+def evaluate(rows: list, min_rows: int = None, holdout: int = 5) -> dict:
+    """
+    Fits on (holdout-1)/holdout of the rows and compares predictions for the rest
+    with the stored values. The split is by property id, so it is stable between runs.
+    Only GPT rows are held out - the report compares the model with GPT; model rows are skipped.
+    """
+    rows = [row for row in rows if row.get("estimate_source") in TRAINING_SOURCES]
+    is_test = [row["estimate_source"] == "gpt" and zlib.crc32(str(row["id"]).encode()) % holdout == 0
+               for row in rows]
+    estimator = RentEstimator(min_rows=min_rows).fit(r for r, test in zip(rows, is_test) if not test)
+    test_rows = [r for r, test in zip(rows, is_test) if test]
+
+    per_city = {}
+    started = time.perf_counter()
+    for row in test_rows:
+        predicted = estimator.predict(row["price"], row["city"], row["rooms"], row["floor"])
+        stats = per_city.setdefault(city_key(row["city"]), {"rows": 0, "rent": [], "yield": []})
+        stats["rows"] += 1
+        if predicted:
+            stats["rent"].append((predicted["rental_estimate"], float(row["rental_estimate"])))
+            stats["yield"].append((predicted["yield_percent"], float(row["yield_percent"])))
+    elapsed = time.perf_counter() - started
+
+    def errors(pairs):
+        if not pairs:
+            return {"mae": None, "mape": None}
+        predicted, actual = np.array(pairs).T
+        return {
+            "mae": round(float(np.mean(np.abs(predicted - actual))), 2),
+            "mape": round(float(np.mean(np.abs(predicted - actual) / actual)) * 100, 1),
+        }
+
+    cities = {
+        city: {"rows": s["rows"], "covered": len(s["rent"]), "rent": errors(s["rent"]), "yield": errors(s["yield"])}
+        for city, s in sorted(per_city.items())
+    }
+    all_rent = [p for s in per_city.values() for p in s["rent"]]
+    all_yield = [p for s in per_city.values() for p in s["yield"]]
+
+    return {
+        "train_rows": len(rows) - len(test_rows),
+        "test_rows": len(test_rows),
+        "model_cities": len(estimator.cities),
+        "coverage": round(len(all_rent) / len(test_rows), 3) if test_rows else 0.0,
+        "rent": errors(all_rent),
+        "yield": errors(all_yield),
+        "microseconds_per_prediction": round(elapsed / len(test_rows) * 1e6, 1) if test_rows else None,
+        "cities": cities,
+    }
+
+
+def print_report(report: dict):
+    print(f"Train rows: {report['train_rows']}  Test rows: {report['test_rows']}  "
+          f"Model cities: {report['model_cities']}  Coverage: {report['coverage']:.0%}")
+    print(f"Overall rent MAE {report['rent']['mae']} ILS ({report['rent']['mape']}%), "
+          f"yield MAE {report['yield']['mae']} pts  "
+          f"[{report['microseconds_per_prediction']} µs/prediction]")
+    print(f"{'city':<20}{'rows':>6}{'model':>7}{'rent MAE':>11}{'rent %':>8}{'yield MAE':>11}")
+    for city, s in report["cities"].items():
+        print(f"{city[:19]:<20}{s['rows']:>6}{s['covered']:>7}{str(s['rent']['mae']):>11}"
+              f"{str(s['rent']['mape']):>8}{str(s['yield']['mae']):>11}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local rent/yield model")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    train_parser = subparsers.add_parser("train", help="fit on the properties table and save the model")
+    train_parser.add_argument("--output", default=None, help="model path (default RENT_MODEL_PATH)")
+    train_parser.add_argument("--min-rows", type=int, default=None, help="listings needed to model a city")
+    evaluate_parser = subparsers.add_parser("evaluate", help="compare hold-out predictions with stored GPT values")
+    evaluate_parser.add_argument("--min-rows", type=int, default=None)
+    evaluate_parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.command == "train":
+            train(db, path=args.output, min_rows=args.min_rows)
+        else:
+            report = evaluate(load_training_rows(db), min_rows=args.min_rows)
+            if args.json:
+                print(json.dumps(report, ensure_ascii=False, indent=2))
+            else:
+                print_report(report)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
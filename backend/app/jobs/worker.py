@@ -0,0 +1,126 @@
+# app/jobs/worker.py
+"""
+Estimate worker.
+
+    python -m app.jobs.worker                 # process queued estimates
+    python -m app.jobs.worker reestimate      # queue every property with a missing estimate
+"""
+import argparse
+import time
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.config import Config
+from app.database import SessionLocal
+from app.jobs.estimate_queue import EstimateQueue
+from app.models.agent import Agent  # noqa: F401 - registers the agents table for the FK
+from app.models.property import Property
+from app.services.property_service import needs_estimate, run_estimate
+from app.utils.redis_client import get_redis_client
+
+
+def process_estimate_job(db: Session, property_id: str) -> str:
+    """
+    Runs one queued estimate and schedules a retry if it failed.
+
+    Returns:
+        The property's estimate_status afterwards ("skipped" if there was nothing to do)
+    """
+    property = db.query(Property).filter_by(id=property_id).first()
+    if not property:
+        return "skipped"  # deleted while waiting
+
+    if not needs_estimate(property):
+        property.estimate_status = "done"
+        db.commit()
+        return "skipped"
+
+    # Requeued after its worker died mid-run - a job that keeps killing workers stops here
+    if property.estimate_attempts >= Config.ESTIMATE_MAX_ATTEMPTS:
+        property.estimate_status = "failed"
+        property.estimate_error = property.estimate_error or "worker stopped during the estimate"
+        db.commit()
+        return "failed"
+
+    error = run_estimate(db, property)
+    if error and property.estimate_attempts < Config.ESTIMATE_MAX_ATTEMPTS:
+        property.estimate_status = "pending"
+        db.commit()
+        EstimateQueue.schedule_retry(property.id, property.estimate_attempts)
+        print(f"🔁 Estimate retry {property.estimate_attempts}/{Config.ESTIMATE_MAX_ATTEMPTS} "
+              f"for {property.id} in {EstimateQueue.retry_delay(property.estimate_attempts):.0f}s")
+
+    return property.estimate_status
+
+
+def run_worker():
+    print("👷 Estimate worker started")
+    while True:
+        if not get_redis_client():
+            time.sleep(Config.ESTIMATE_WORKER_POLL_SECONDS)
+            continue
+
+        property_id = EstimateQueue.dequeue(timeout=Config.ESTIMATE_WORKER_POLL_SECONDS)
+        if not property_id:
+            continue
+
+        db = SessionLocal()
+        try:
+            status = process_estimate_job(db, property_id)
+            print(f"✅ Estimate job {property_id}: {status}")
+        except Exception as e:
+            print(f"❌ Estimate job {property_id} crashed: {e}")
+        finally:
+            db.close()
+            EstimateQueue.ack(property_id)
+
+
+def reestimate_missing(db: Session, limit: int = None, include_failed: bool = True) -> int:
+    """Queues every property whose rental_estimate or yield_percent is NULL"""
+    query = db.query(Property).filter(
+        or_(Property.rental_estimate.is_(None), Property.yield_percent.is_(None))
+    )
+    if not include_failed:
+        query = query.filter(or_(Property.estimate_status.is_(None), Property.estimate_status != "failed"))
+    if limit:
+        query = query.limit(limit)
+
+    if not get_redis_client():
+        print("❌ Redis unavailable - nothing was queued")
+        return 0
+
+    properties = query.all()
+    for property in properties:
+        property.estimate_status = "pending"
+        property.estimate_attempts = 0
+        property.estimate_error = None
+    # Commit before queueing so a fast worker can't have its result overwritten
+    db.commit()
+
+    queued = sum(1 for property in properties if EstimateQueue.enqueue(property.id))
+    print(f"📬 Queued {queued} properties for estimation")
+    return queued
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GPT rental/yield estimate worker")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.add_parser("run", help="process queued estimates (default)")
+    reestimate = subparsers.add_parser("reestimate", help="queue properties with missing estimates")
+    reestimate.add_argument("--limit", type=int, default=None)
+    reestimate.add_argument("--skip-failed", action="store_true", help="leave properties that already failed")
+    args = parser.parse_args()
+
+    if args.command == "reestimate":
+        db = SessionLocal()
+        try:
+            reestimate_missing(db, limit=args.limit, include_failed=not args.skip_failed)
+        finally:
+            db.close()
+    else:
+        run_worker()
+
+
+if __name__ == "__main__":
+    main()
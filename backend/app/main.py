@@ -2,8 +2,14 @@ from fastapi import FastAPI
 from fastapi.security import OAuth2PasswordBearer
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
+from app.config import Config
 from app.database import create_tables
-from app.telegram.webhook import router as telegram_router
+from app.services.cache_service import CacheService
+from app.services.gpt_service import close_async_client
+from app.services.property_index import start_property_index, stop_property_index
+from app.services.image_variants import shutdown_image_pool
+from app.telegram.client import get_telegram_client, close_telegram_client
+from app.telegram.webhook import router as telegram_router, update_queue
 from app.routes import agents, properties, auth, public_properties, gpt, dashboard_insights
 
 app = FastAPI(title="InvestMateAI")
@@ -35,3 +41,22 @@ app.add_middleware(
 @app.on_event("startup")
 def on_startup():
     create_tables()
+    CacheService.migrate_legacy_keys()
+    CacheService.rebuild_semantic_index()
+    start_property_index()  # no-op unless PROPERTY_INDEX_ENABLED
+
+
+@app.on_event("startup")
+async def start_telegram_workers():
+    get_telegram_client()  # one pooled client for every Bot API call
+    if Config.TELEGRAM_INGEST_MODE == "queue":
+        update_queue.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    stop_property_index()
+    await update_queue.stop()  # finish what Telegram was already told is handled
+    await close_async_client()
+    await close_telegram_client()
+    shutdown_image_pool()
@@ -1,16 +1,33 @@
-from sqlalchemy import Column, String, Integer, DateTime, Numeric, Text, Enum, ForeignKey
+from sqlalchemy import Column, String, Integer, DateTime, Numeric, Text, Enum, ForeignKey, Index, DDL, JSON, event
+from sqlalchemy.orm import relationship, validates
 from app.database import Base
+from app.utils.city_names import city_key
 import uuid
 from datetime import datetime
 
 
 class Property(Base):
     __tablename__ = 'properties'
+    __table_args__ = (
+        # Match the filter shapes of search_properties_by_criteria
+        Index('ix_properties_agent_city_price', 'agent_id', 'city_canonical', 'price'),
+        Index('ix_properties_agent_type_rooms', 'agent_id', 'property_type', 'rooms'),
+        Index('ix_properties_city_type_rooms', 'city_canonical', 'property_type', 'rooms'),
+        Index('ix_properties_price', 'price'),
+        Index('ix_properties_rental_estimate', 'rental_estimate'),
+        Index('ix_properties_yield_percent', 'yield_percent'),
+        # Newest-first keyset pagination
+        Index('ix_properties_agent_created', 'agent_id', 'created_at', 'id'),
+        Index('ix_properties_created', 'created_at', 'id'),
+        # Incremental public feed (updated_since)
+        Index('ix_properties_updated', 'updated_at', 'id'),
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     agent_id = Column(String(36), ForeignKey('agents.id', ondelete='CASCADE'), nullable=False)
 
     city = Column(String(100), nullable=False)
+    city_canonical = Column(String(100), nullable=True)  # city_key(city) - exact-city searches use this
     address = Column(String(200), nullable=False)
     price = Column(Numeric, nullable=False)
     yield_percent = Column(Numeric, nullable=True)
@@ -20,7 +37,48 @@ class Property(Base):
     description = Column(Text)
     rental_estimate = Column(Numeric, nullable=True)
     image_url = Column(String, nullable=True)
+    image_variants = Column(JSON, nullable=True)  # {"card": {"webp": key, "jpeg": key}, ...}
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # GPT estimate job: None (agent supplied values) / pending / running / done / failed
+    estimate_status = Column(String(20), nullable=True)
+    estimate_attempts = Column(Integer, default=0, nullable=False)
+    estimate_error = Column(Text, nullable=True)
+    # Where rental_estimate / yield_percent came from: agent / gpt / model (the local rent model).
+    # The rent model trains only on agent and gpt values - never on its own predictions.
+    estimate_source = Column(String(10), nullable=True)
+
+    # Lazy by default - queries serialized with PropertyOut load it via app.utils.loading
+    agent = relationship("Agent", back_populates="properties")
+
+    @validates("city")
+    def _set_city_canonical(self, key, city):
+        self.city_canonical = city_key(city)
+        return city
 
     def __repr__(self):
         return f"<Property in {self.city}, {self.price}>"
+
+
+# Full-text search over description and trigram indexes for city/address
+# (Postgres only - SQLite falls back to ILIKE / Python matching).
+# 'english' stems plurals, 'simple' keeps Hebrew words as they are.
+DESCRIPTION_TSV = "description_tsv"
+TSV_CONFIGS = ("english", "simple")
+POSTGRES_SEARCH_DDL = f"""
+ALTER TABLE properties ADD COLUMN IF NOT EXISTS {DESCRIPTION_TSV} tsvector
+    GENERATED ALWAYS AS (
+        to_tsvector('english', coalesce(description, '')) || to_tsvector('simple', coalesce(description, ''))
+    ) STORED;
+CREATE INDEX IF NOT EXISTS ix_properties_description_tsv ON properties USING GIN ({DESCRIPTION_TSV});
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS ix_properties_city_trgm ON properties USING GIN (city gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_properties_address_trgm ON properties USING GIN (address gin_trgm_ops);
+"""
+# Created by the DDL above, not in Base.metadata - alembic autogenerate must leave them alone
+POSTGRES_SEARCH_OBJECTS = {
+    DESCRIPTION_TSV, "ix_properties_description_tsv", "ix_properties_city_trgm", "ix_properties_address_trgm",
+}
+
+event.listen(Property.__table__, "after_create", DDL(POSTGRES_SEARCH_DDL).execute_if(dialect="postgresql"))
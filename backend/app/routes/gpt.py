@@ -3,6 +3,9 @@ from sqlalchemy.orm import Session
 from app.database import get_db
 from app.services.chat_service import process_chat_question
 from app.services.cache_service import CacheService
+from app.services.criteria_flight import CriteriaSingleFlight
+from app.services.search_cache import SearchCache
+from app.services.presign_cache import PresignCache
 from app.services.conversation_cache import ConversationCache
 
 router = APIRouter(prefix="/gpt", tags=["GPT"])
@@ -16,15 +19,22 @@ from uuid import UUID
 def chat_with_gpt(
         question: str = Body(..., embed=True),
         agent_id: Optional[UUID] = Body(None, embed=True),
+        limit: Optional[int] = Body(None, embed=True, ge=1),  # capped at SEARCH_MAX_PAGE_SIZE by the search
+        cursor: Optional[str] = Body(None, embed=True),
         db: Session = Depends(get_db),
 ):
-    return process_chat_question(question, db, agent_id)
+    """Results come a page at a time - pass back next_cursor (with the same question) for more"""
+    return process_chat_question(question, db, agent_id, limit, cursor)
 
 
 @router.get("/cache/stats")
 def get_cache_stats():
     """Returns cache statistics"""
-    return CacheService.get_cache_stats()
+    stats = CacheService.get_cache_stats()
+    stats["single_flight"] = CriteriaSingleFlight.get_stats()  # this worker only
+    stats["search"] = SearchCache.get_stats()
+    stats["presigned_urls"] = PresignCache.get_stats()  # this worker only
+    return stats
 
 
 @router.get("/conversations/{agent_id}")
@@ -1,9 +1,14 @@
 # app/routes/properties.py
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from typing import Literal
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.schemas.property import PropertyCreate, PropertyOut, PropertyUpdate
+from app.schemas.property import (
+    PropertyCreate, PropertyOut, PropertyUpdate, PropertyImageUrlsRequest, PropertyImageUrlsOut
+)
 from app.services.property_service import (
     create_property,
     get_properties_for_agent,
@@ -12,11 +17,15 @@ from app.services.property_service import (
     delete_property,
     delete_all_properties_for_agent
 )
+from app.services.image_service import resolve_image_urls
+from app.services.presign_cache import PresignCache
+from app.services.image_variants import delete_image_objects, generate_image_variants, pick_image_key, upload_key
 from app.utils.auth_deps import get_current_agent
 from app.models.agent import Agent
-from app.utils.aws_s3 import generate_presigned_view_url, upload_file_to_s3
+from app.config import Config
+from app.utils.aws_s3 import UploadTooLarge, upload_stream_to_s3
+from app.utils.image_files import SNIFF_BYTES, sniff_image_type
 from app.models.property import Property
-import os
 
 router = APIRouter()
 
@@ -70,6 +79,7 @@ def delete_property_route(
 @router.post("/{property_id}/upload-image")
 async def upload_property_image(
         property_id: str,
+        background_tasks: BackgroundTasks,
         file: UploadFile = File(...),
         db: Session = Depends(get_db),
         current_agent: Agent = Depends(get_current_agent)
@@ -78,27 +88,47 @@ async def upload_property_image(
     if not property_obj:
         raise HTTPException(status_code=404, detail="Property not found or unauthorized")
 
-    # דינמית לפי סיומת הקובץ
-    extension = os.path.splitext(file.filename)[-1] or ".jpg"
-    key = f"property_images/{property_id}{extension}"
-
-    content = await file.read()
-    content_type = file.content_type or "image/jpeg"
-
-    success = upload_file_to_s3(key, content, content_type)
+    max_bytes = Config.IMAGE_UPLOAD_MAX_MB * 2**20
+    if file.size is not None and file.size > max_bytes:
+        raise HTTPException(status_code=413, detail=f"Image is larger than {Config.IMAGE_UPLOAD_MAX_MB} MB")
+
+    # סוג הקובץ לפי התוכן, לא לפי השם או ה-Content-Type של הלקוח
+    image_type = sniff_image_type(await file.read(SNIFF_BYTES))
+    if not image_type:
+        raise HTTPException(status_code=415, detail="Unsupported image type (JPEG, PNG, WebP or GIF)")
+    content_type, extension = image_type
+    key = upload_key(property_id, extension)
+
+    # Streams the spooled upload to S3 part by part, off the event loop
+    await file.seek(0)
+    try:
+        success = await run_in_threadpool(
+            upload_stream_to_s3, key, file.file, content_type, max_bytes, Config.IMAGE_UPLOAD_PART_MB * 2**20
+        )
+    except UploadTooLarge:
+        raise HTTPException(status_code=413, detail=f"Image is larger than {Config.IMAGE_UPLOAD_MAX_MB} MB")
     if not success:
         raise HTTPException(status_code=500, detail="Failed to upload image")
 
+    old_url, old_variants = property_obj.image_url, property_obj.image_variants
     property_obj.image_url = key
+    property_obj.image_variants = None  # the original is served until the new sizes are ready
     db.commit()
     db.refresh(property_obj)
 
+    # Thumbnail/card/full sizes, resized in a process pool after the response
+    background_tasks.add_task(generate_image_variants, property_id, key)
+    if old_url or old_variants:
+        background_tasks.add_task(delete_image_objects, old_url, old_variants)
+
     return {"message": "Image uploaded successfully", "file_key": key}
 
 
 @router.get("/{property_id}/image-url")
 def get_property_image_url(
         property_id: str,
+        size: Literal["original", "thumbnail", "card", "full"] = "original",
+        format: Literal["jpeg", "webp"] = "jpeg",
         db: Session = Depends(get_db)
 ):
     property_obj = db.query(Property).filter_by(id=property_id).first()
@@ -109,11 +139,22 @@ def get_property_image_url(
     if not property_obj or not property_obj.image_url:
         raise HTTPException(status_code=404, detail="Image not found")
 
-    url = generate_presigned_view_url(property_obj.image_url)
+    key = pick_image_key(property_obj.image_url, property_obj.image_variants, size, format)
+    url = PresignCache.get_url(key)
     if not url:
         raise HTTPException(status_code=500, detail="Failed to generate image URL")
 
-    return {"image_url": url}
+    # size: what was served - the original until the variants are ready
+    return {"image_url": url, "size": size if key != property_obj.image_url else "original"}
+
+
+@router.post("/image-urls", response_model=PropertyImageUrlsOut)
+def get_property_image_urls(
+        data: PropertyImageUrlsRequest,
+        db: Session = Depends(get_db)
+):
+    """Image URLs of many properties in one request (unknown ids are left out)"""
+    return {"image_urls": resolve_image_urls(db, data.property_ids, data.size, data.format)}
 
 
 @router.delete("/", response_model=dict)
@@ -1,20 +1,56 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.models.property import Property
 from app.schemas.property import PublicPropertyOut
+from app.services.property_service import get_public_property_rows, get_public_property_row, get_public_listing_version
+from app.services.export_service import export_response
+from app.utils.http_cache import cache_headers, is_not_modified, make_etag
 
 router = APIRouter(prefix="/public", tags=["Public"])
 
 
 @router.get("/properties", response_model=list[PublicPropertyOut])
-def get_public_properties(db: Session = Depends(get_db)):
-    return db.query(Property).all()
+def get_public_properties(
+        request: Request,
+        response: Response,
+        format: Optional[Literal["ndjson", "json"]] = Query(None, description="stream the feed instead of one list"),
+        updated_since: Optional[datetime] = Query(None, description="only properties changed since (incremental pulls)"),
+        db: Session = Depends(get_db),
+):
+    """
+    format=ndjson (one property per line) or format=json streams the whole table with flat memory,
+    gzip-compressed when the client accepts it. Rows come oldest change first with updated_at -
+    pass the last one back as updated_since to pull only what changed.
+    Send If-None-Match with the last ETag to get 304 when nothing changed. If-Modified-Since
+    works too, but only sees edits - a delete doesn't move max(updated_at), the ETag catches it.
+    """
+    count, last_modified = get_public_listing_version(db, updated_since)
+    headers = cache_headers(make_etag("list", format, updated_since, count, last_modified), last_modified)
+    if is_not_modified(request, headers["ETag"], last_modified):
+        return Response(status_code=304, headers=headers)
+
+    if format:
+        gzip = "gzip" in request.headers.get("accept-encoding", "")
+        streamed = export_response(db.get_bind(), format, updated_since, gzip)
+        streamed.headers.update(headers)
+        return streamed
+
+    response.headers.update(headers)
+    return get_public_property_rows(db, updated_since)
 
 
 @router.get("/properties/{property_id}", response_model=PublicPropertyOut)
-def get_public_property(property_id: str, db: Session = Depends(get_db)):
-    property_obj = db.query(Property).filter_by(id=property_id).first()
+def get_public_property(property_id: str, request: Request, response: Response, db: Session = Depends(get_db)):
+    property_obj = get_public_property_row(db, property_id)
     if not property_obj:
         raise HTTPException(status_code=404, detail="Property not found")
+
+    headers = cache_headers(make_etag(property_id, property_obj["updated_at"]), property_obj["updated_at"])
+    if is_not_modified(request, headers["ETag"], property_obj["updated_at"]):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
     return property_obj
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import Dict, List, Literal, Optional
 from uuid import UUID
 from decimal import Decimal
 from enum import Enum
@@ -39,6 +39,8 @@ class PropertyUpdate(BaseModel):
 class PropertyOut(PropertyCreate):
     id: UUID
     image_url: Optional[str] = None
+    image_variants: Optional[Dict[str, Dict[str, str]]] = None
+    estimate_status: Optional[str] = None
     agent: Optional[AgentPublic] = None
 
     class Config:
@@ -57,3 +59,13 @@ class PublicPropertyOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class PropertyImageUrlsRequest(BaseModel):
+    property_ids: List[UUID] = Field(min_length=1, max_length=100)
+    size: Literal["original", "thumbnail", "card", "full"] = "original"
+    format: Literal["jpeg", "webp"] = "jpeg"
+
+
+class PropertyImageUrlsOut(BaseModel):
+    image_urls: Dict[str, Optional[str]]  # property id -> presigned URL, None when it has no image
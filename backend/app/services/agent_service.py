@@ -1,9 +1,12 @@
 from sqlalchemy.orm import Session
 from app.models.agent import Agent
+from app.models.property import Property
 from app.schemas.agent import AgentCreate, AgentUpdate
 from werkzeug.security import generate_password_hash
 from fastapi import HTTPException
 from app.services.auth_service import hash_password
+from app.services.search_cache import SearchCache
+from app.services import property_index
 import uuid
 
 
@@ -58,5 +61,9 @@ def update_agent(agent_id: str, updates: AgentUpdate, db: Session):
 
 def delete_agent(agent_id: str, db: Session):
     agent = get_agent(agent_id, db)
+    cities = [city for city, in db.query(Property.city).filter(Property.agent_id == agent.id).distinct()]
     db.delete(agent)
     db.commit()
+    # Properties go with the agent (cascade)
+    SearchCache.invalidate(str(agent.id), cities)
+    property_index.on_agent_deleted(agent.id)
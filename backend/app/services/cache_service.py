@@ -1,8 +1,13 @@
 import json
+import re
 from typing import Optional
 from app.utils.redis_client import get_redis_client
+from app.utils.text_normalization import question_key, raw_question_key, normalize_question, KEY_LENGTH
+from app.services.semantic_cache import get_semantic_index
 from app.config import Config
 
+HASHED_KEY = re.compile(rf"^[0-9a-f]{{{KEY_LENGTH}}}$")
+
 
 class CacheService:
     """
@@ -19,6 +24,8 @@ class CacheService:
     def get_search_criteria(question: str) -> Optional[dict]:
         """
         Returns cached criteria for a question.
+        Lookup is by a hash of the normalized question, so casing,
+        punctuation and number formatting don't cause extra GPT calls.
 
         Args:
             question: User's search question
@@ -31,13 +38,19 @@ class CacheService:
             return None
 
         try:
-            key = f"criteria:{question}"
-            data = client.get(key)
+            key_hash = question_key(question)
+            data = client.get(f"criteria:{key_hash}")
 
             if data:
+                CacheService._record_hit(client, key_hash, question)
                 print(f"✅ Cache HIT: {question[:50]}...")
                 return json.loads(data)
 
+            criteria = CacheService._get_similar_criteria(client, question)
+            if criteria is not None:
+                return criteria
+
+            client.hincrby("criteria_stats", "misses", 1)
             print(f"❌ Cache MISS: {question[:50]}...")
             return None
 
@@ -62,19 +75,30 @@ class CacheService:
             return False
 
         try:
-            key = f"criteria:{question}"
+            key_hash = question_key(question)
             ttl = Config.CRITERIA_TTL_DAYS * 86400  # days to seconds
 
             # Save with TTL
             client.setex(
-                key,
+                f"criteria:{key_hash}",
                 ttl,
                 json.dumps(criteria, ensure_ascii=False)
             )
 
+            # Remember the exact wording, so later hits can tell if only normalization matched
+            pipe = client.pipeline()
+            pipe.sadd(f"criteria_variants:{key_hash}", raw_question_key(question))
+            pipe.expire(f"criteria_variants:{key_hash}", ttl)
+            pipe.hset("criteria_questions", key_hash, normalize_question(question))
+            pipe.execute()
+
             # Track by timestamp (for LRU cleanup)
             timestamp = client.time()[0]
-            client.zadd("criteria_keys", {question: timestamp})
+            client.zadd("criteria_keys", {key_hash: timestamp})
+
+            index = get_semantic_index()
+            if index is not None:
+                index.add(key_hash, question, timestamp)
 
             # Cleanup if exceeded maximum
             CacheService._cleanup_old_entries(client)
@@ -99,15 +123,127 @@ class CacheService:
                 old_keys = client.zrange("criteria_keys", 0, overflow - 1)
 
                 for key in old_keys:
-                    client.delete(f"criteria:{key}")
+                    client.delete(f"criteria:{key}", f"criteria_variants:{key}")
+                if old_keys:
+                    client.hdel("criteria_questions", *old_keys)
 
                 client.zremrangebyrank("criteria_keys", 0, overflow - 1)
 
+                index = get_semantic_index()
+                if index is not None:
+                    index.remove(old_keys)
+
                 print(f"🧹 Cleaned {len(old_keys)} old cache entries")
 
         except Exception as e:
             print(f"⚠️ Cleanup error: {e}")
 
+    @staticmethod
+    def _get_similar_criteria(client, question: str) -> Optional[dict]:
+        """Second tier: reuse criteria of the nearest cached paraphrase"""
+        index = get_semantic_index()
+        if index is None:
+            return None
+
+        match = index.nearest(question, Config.SEMANTIC_CACHE_THRESHOLD)
+        if not match:
+            return None
+
+        neighbour, similarity = match
+        data = client.get(f"criteria:{neighbour}")
+        if not data:
+            # Expired or evicted by another worker
+            index.remove([neighbour])
+            return None
+
+        client.hincrby("criteria_stats", "semantic_hits", 1)
+        print(f"✅ Semantic cache HIT ({similarity:.2f}): {question[:50]}...")
+        return json.loads(data)
+
+    @staticmethod
+    def rebuild_semantic_index() -> int:
+        """Loads the in-process similarity index from the questions tracked in Redis"""
+        index = get_semantic_index()
+        client = CacheService._get_client()
+        if index is None or not client:
+            return 0
+
+        try:
+            entries = client.zrange("criteria_keys", 0, -1, withscores=True)
+            if not entries:
+                return 0
+
+            questions = client.hmget("criteria_questions", [key for key, _ in entries])
+            index.clear()
+            for (key_hash, timestamp), question in zip(entries, questions):
+                if question:
+                    index.add(key_hash, question, timestamp)
+
+            print(f"🧭 Semantic index rebuilt with {len(index)} questions")
+            return len(index)
+
+        except Exception as e:
+            print(f"⚠️ Semantic index rebuild error: {e}")
+            return 0
+
+    @staticmethod
+    def _record_hit(client, key_hash: str, question: str):
+        """Counts a hit, and whether it only matched thanks to normalization"""
+        variants_key = f"criteria_variants:{key_hash}"
+        raw_hash = raw_question_key(question)
+
+        pipe = client.pipeline()
+        pipe.hincrby("criteria_stats", "hits", 1)
+        if not client.sismember(variants_key, raw_hash):
+            pipe.hincrby("criteria_stats", "normalized_hits", 1)
+            pipe.sadd(variants_key, raw_hash)
+        pipe.execute()
+
+    @staticmethod
+    def migrate_legacy_keys() -> int:
+        """
+        Moves entries cached under the old raw-question keys (criteria:{question})
+        to hashed keys, keeping their TTL and LRU timestamp.
+
+        Returns:
+            Number of migrated entries
+        """
+        client = CacheService._get_client()
+        if not client:
+            return 0
+
+        migrated = 0
+        try:
+            for question, timestamp in client.zrange("criteria_keys", 0, -1, withscores=True):
+                if HASHED_KEY.match(question):
+                    continue
+
+                old_key = f"criteria:{question}"
+                data = client.get(old_key)
+                ttl = client.ttl(old_key)
+                key_hash = question_key(question)
+
+                pipe = client.pipeline()
+                if data and ttl > 0:
+                    pipe.set(f"criteria:{key_hash}", data, ex=ttl, nx=True)
+                    pipe.sadd(f"criteria_variants:{key_hash}", raw_question_key(question))
+                    pipe.expire(f"criteria_variants:{key_hash}", ttl)
+                    pipe.hset("criteria_questions", key_hash, normalize_question(question))
+                    pipe.zadd("criteria_keys", {key_hash: timestamp}, gt=True)
+                    migrated += 1
+                pipe.delete(old_key)
+                pipe.zrem("criteria_keys", question)
+                pipe.execute()
+
+            if migrated:
+                print(f"🔁 Migrated {migrated} legacy cache entries")
+                CacheService._cleanup_old_entries(client)
+            return migrated
+
+        except Exception as e:
+            print(f"⚠️ Migration error: {e}")
+            return migrated
+
     @staticmethod
     def clear_all_criteria():
         """Clears all cache (for testing)"""
@@ -116,10 +252,14 @@ class CacheService:
             return
 
         try:
-            keys = client.keys("criteria:*")
+            keys = client.keys("criteria:*") + client.keys("criteria_variants:*")
             if keys:
                 client.delete(*keys)
-            client.delete("criteria_keys")
+            client.delete("criteria_keys", "criteria_stats", "criteria_questions")
+
+            index = get_semantic_index()
+            if index is not None:
+                index.clear()
             print(f"🧹 Cleared {len(keys)} cache entries")
         except Exception as e:
             print(f"⚠️ Clear error: {e}")
@@ -135,11 +275,34 @@ class CacheService:
             count = client.zcard("criteria_keys")
             memory = client.info("memory").get("used_memory_human", "N/A")
 
+            stats = client.hgetall("criteria_stats")
+            hits = int(stats.get("hits", 0))
+            misses = int(stats.get("misses", 0))
+            normalized_hits = int(stats.get("normalized_hits", 0))
+            semantic_hits = int(stats.get("semantic_hits", 0))
+            lookups = hits + semantic_hits + misses
+            index = get_semantic_index()
+
             return {
                 "status": "connected",
                 "cached_items": count,
                 "max_items": Config.MAX_CACHED_CRITERIA,
-                "memory_used": memory
+                "memory_used": memory,
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round((hits + semantic_hits) / lookups, 3) if lookups else 0.0,
+                # hits that would have been misses with raw-question keys
+                "normalized_hits": normalized_hits,
+                "hit_rate_gain": round(normalized_hits / lookups, 3) if lookups else 0.0,
+                # paraphrases answered from the similarity index
+                "semantic_hits": semantic_hits,
+                "semantic_index_size": len(index) if index is not None else 0,
+                # callers that waited for another caller's GPT extraction
+                "coalesced_local": int(stats.get("coalesced_local", 0)),
+                "coalesced_remote": int(stats.get("coalesced_remote", 0)),
+                "gpt_extractions": int(stats.get("leaders", 0)),
+                # waiters that gave up and asked GPT themselves
+                "fallback_calls": int(stats.get("fallback_calls", 0)),
             }
         except Exception as e:
-            return {"status": "error", "error": str(e)}
\ No newline at end of file
+            return {"status": "error", "error": str(e)}
@@ -1,31 +1,56 @@
 from datetime import datetime
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from typing import Optional
 from uuid import UUID
 
 # Updated import
 from app.services.cache_service import CacheService
-from app.services.gpt_service import GPTService, detect_language, build_response_message
-from app.services.property_service import search_properties_by_criteria
+from app.services.criteria_parser import parse_search_criteria
+from app.services.criteria_flight import CriteriaSingleFlight
+from app.services.gpt_service import GPTService, AsyncGPTService, detect_language, build_response_message
+from app.services.property_service import search_properties_page
+from app.services.search_cache import SearchCache
 from app.models import Agent
 from app.schemas.property import PropertyOut
 from app.services.conversation_cache import ConversationCache
+from app.config import Config
 from uuid import uuid4
 
 
-def process_chat_question(question: str, db: Session, agent_id: Optional[UUID] = None):
-    question = question.strip()
-    lang = detect_language(question)
-    print("User ask question:\n", question)
+def _get_agent(db: Session, agent_id: Optional[UUID]) -> Optional[Agent]:
+    return db.query(Agent).filter(Agent.id == str(agent_id)).first() if agent_id else None
 
-    agent = db.query(Agent).filter(Agent.id == str(agent_id)).first() if agent_id else None
 
+def _resolve_criteria(question: str) -> dict:
     # Get criteria (already using Redis cache)
     criteria = CacheService.get_search_criteria(question)
     if not criteria:
-        criteria = GPTService.extract_search_criteria(question)
-        CacheService.save_search_criteria(question, criteria)
+        # Simple questions are parsed locally - GPT only for ambiguous ones
+        criteria, confidence = parse_search_criteria(question)
+        if confidence < Config.RULE_PARSER_MIN_CONFIDENCE:
+            print(f"🤖 Rule parser confidence {confidence:.2f} - using GPT")
+            # One GPT call per question even when many users ask it at once (caches the result)
+            criteria = CriteriaSingleFlight.extract(question, GPTService.extract_search_criteria)
+        else:
+            CacheService.save_search_criteria(question, criteria)
+    return criteria
+
+
+async def _aresolve_criteria(question: str) -> dict:
+    criteria = await run_in_threadpool(CacheService.get_search_criteria, question)
+    if not criteria:
+        criteria, confidence = parse_search_criteria(question)
+        if confidence < Config.RULE_PARSER_MIN_CONFIDENCE:
+            print(f"🤖 Rule parser confidence {confidence:.2f} - using GPT")
+            criteria = await CriteriaSingleFlight.aextract(question, AsyncGPTService.extract_search_criteria)
+        else:
+            await run_in_threadpool(CacheService.save_search_criteria, question, criteria)
+    return criteria
+
 
+def _build_chat_result(question: str, lang: str, criteria: dict, db: Session, agent: Optional[Agent],
+                       limit: Optional[int] = None, cursor: Optional[str] = None) -> dict:
     filters = {
         k: v for k, v in criteria.items()
         if k in {
@@ -37,24 +62,59 @@ def process_chat_question(question: str, db: Session, agent_id: Optional[UUID] =
     if agent:
         filters["agent_id"] = str(agent.id)
 
-    properties = search_properties_by_criteria(filters, db)
-    reply = build_response_message(criteria, properties, lang)
+    # Many questions resolve to the same filters - reuse the page of ids
+    page, cache_token = SearchCache.lookup(filters, limit, cursor, db)
+    if page is None:
+        page = search_properties_page(filters, db, limit, cursor)
+        SearchCache.store(cache_token, page)
+    properties = page["items"]
+    reply = build_response_message(criteria, properties, lang, total=page["total"])
     print("response: ", reply)
 
     # Save to Redis instead of PostgreSQL
     conversation_id = str(uuid4())
 
     if agent:
-        ConversationCache.save_message(str(agent.id), conversation_id, "user", question)
+        if not cursor:  # "show more" is the same question
+            ConversationCache.save_message(str(agent.id), conversation_id, "user", question)
         # ConversationCache.save_message(str(agent.id), conversation_id, "assistant", reply)
 
-    for prop in properties:
-        ConversationCache.track_property_mention(str(agent.id), prop.address)
+        for prop in properties:
+            ConversationCache.track_property_mention(str(agent.id), prop.address)
 
     return {
         "conversation_id": conversation_id,
         "message": reply,
         "filters": filters,
         "results": [PropertyOut.model_validate(p).model_dump() for p in properties],
+        "total": page["total"],
+        "next_cursor": page["next_cursor"],
         "source": "redis_cache"
     }
+
+
+def process_chat_question(question: str, db: Session, agent_id: Optional[UUID] = None,
+                          limit: Optional[int] = None, cursor: Optional[str] = None):
+    question = question.strip()
+    lang = detect_language(question)
+    print("User ask question:\n", question)
+
+    agent = _get_agent(db, agent_id)
+    criteria = _resolve_criteria(question)
+    return _build_chat_result(question, lang, criteria, db, agent, limit, cursor)
+
+
+async def aprocess_chat_question(question: str, db: Session, agent_id: Optional[UUID] = None,
+                                 limit: Optional[int] = None, cursor: Optional[str] = None):
+    """
+    Async variant of process_chat_question.
+    GPT goes through the pooled async client; Redis and DB work runs in the threadpool,
+    so one worker can serve many concurrent chats.
+    """
+    question = question.strip()
+    lang = detect_language(question)
+    print("User ask question:\n", question)
+
+    agent = await run_in_threadpool(_get_agent, db, agent_id)
+    criteria = await _aresolve_criteria(question)
+    return await run_in_threadpool(_build_chat_result, question, lang, criteria, db, agent, limit, cursor)
@@ -0,0 +1,242 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+from typing import Awaitable, Callable
+from uuid import uuid4
+
+from starlette.concurrency import run_in_threadpool
+
+from app.config import Config
+from app.services.cache_service import CacheService
+from app.utils.redis_client import get_redis_client
+from app.utils.text_normalization import question_key
+
+# מוחק את המנעול רק אם הוא עדיין שלנו
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def _lock_ttl() -> float:
+    """How long a leader holds the lock - its GPT call plus a margin"""
+    return Config.CRITERIA_GPT_TIMEOUT_SECONDS + Config.SINGLE_FLIGHT_LOCK_MARGIN_SECONDS
+
+
+def _wait_timeout() -> float:
+    """How long a waiter waits - a little past the lock, so it doesn't give up on a leader still inside it"""
+    return _lock_ttl() + Config.SINGLE_FLIGHT_WAIT_MARGIN_SECONDS
+
+
+class CriteriaSingleFlight:
+    """
+    Coalesces concurrent extractions of the same (normalized) question,
+    so exactly one GPT call is made while everyone else waits for its result.
+    In-process callers share a Future; other workers wait on a Redis lock.
+    """
+
+    _lock = threading.Lock()
+    _inflight = {}  # key hash -> Future
+    _async_inflight = {}  # key hash -> asyncio.Future (event-loop callers)
+    _stats = {"leaders": 0, "coalesced_local": 0, "coalesced_remote": 0, "fallback_calls": 0}
+
+    @staticmethod
+    def _count(name: str):
+        """Bumps a counter for this worker and, when Redis is up, for all workers"""
+        with CriteriaSingleFlight._lock:
+            CriteriaSingleFlight._stats[name] += 1
+
+        client = get_redis_client()
+        if client:
+            try:
+                client.hincrby("criteria_stats", name, 1)
+            except Exception as e:
+                print(f"⚠️ Single-flight stats error: {e}")
+
+    @staticmethod
+    def get_stats() -> dict:
+        """Counters for this worker"""
+        with CriteriaSingleFlight._lock:
+            inflight = len(CriteriaSingleFlight._inflight) + len(CriteriaSingleFlight._async_inflight)
+            return dict(CriteriaSingleFlight._stats, inflight=inflight)
+
+    @staticmethod
+    def extract(question: str, extractor: Callable[[str], dict]) -> dict:
+        """
+        Runs extractor(question) once per question across concurrent callers
+        and stores the result in the criteria cache.
+
+        Args:
+            question: User's search question
+            extractor: The expensive call, e.g. GPTService.extract_search_criteria
+
+        Returns:
+            Extracted criteria
+        """
+        key_hash = question_key(question)
+
+        with CriteriaSingleFlight._lock:
+            future = CriteriaSingleFlight._inflight.get(key_hash)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                CriteriaSingleFlight._inflight[key_hash] = future
+
+        CriteriaSingleFlight._count("leaders" if is_leader else "coalesced_local")
+
+        if not is_leader:
+            try:
+                return future.result(timeout=_wait_timeout())
+            except TimeoutError:
+                CriteriaSingleFlight._count("fallback_calls")
+                print(f"⏱️ Single-flight wait timed out: {question[:50]}...")
+                return extractor(question)
+
+        try:
+            criteria = CriteriaSingleFlight._extract_across_workers(question, key_hash, extractor)
+            future.set_result(criteria)
+            return criteria
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with CriteriaSingleFlight._lock:
+                CriteriaSingleFlight._inflight.pop(key_hash, None)
+
+    @staticmethod
+    def _extract_across_workers(question: str, key_hash: str, extractor) -> dict:
+        client = get_redis_client()
+        if not client:
+            criteria = extractor(question)
+            CacheService.save_search_criteria(question, criteria)
+            return criteria
+
+        lock_key = f"criteria_lock:{key_hash}"
+        token = uuid4().hex
+
+        try:
+            acquired = client.set(lock_key, token, nx=True, px=int(_lock_ttl() * 1000))
+        except Exception as e:
+            print(f"⚠️ Single-flight lock error: {e}")
+            acquired = True
+
+        if acquired:
+            try:
+                # A leader that finished just before us may already have cached it
+                data = client.get(f"criteria:{key_hash}")
+                if data:
+                    return json.loads(data)
+
+                criteria = extractor(question)
+                CacheService.save_search_criteria(question, criteria)
+                return criteria
+            finally:
+                try:
+                    client.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+                except Exception as e:
+                    print(f"⚠️ Single-flight unlock error: {e}")
+
+        # Another worker is already asking GPT - wait for its cached result
+        CriteriaSingleFlight._count("coalesced_remote")
+        try:
+            deadline = time.monotonic() + _wait_timeout()
+            while time.monotonic() < deadline:
+                time.sleep(Config.SINGLE_FLIGHT_POLL_SECONDS)
+                data = client.get(f"criteria:{key_hash}")
+                if data:
+                    return json.loads(data)
+                if not client.exists(lock_key):
+                    break  # leader finished without caching (e.g. failed)
+        except Exception as e:
+            print(f"⚠️ Single-flight wait error: {e}")
+
+        CriteriaSingleFlight._count("fallback_calls")
+        criteria = extractor(question)
+        CacheService.save_search_criteria(question, criteria)
+        return criteria
+
+    @staticmethod
+    async def aextract(question: str, extractor: Callable[[str], Awaitable[dict]]) -> dict:
+        """Async variant of extract() - waits without blocking the event loop."""
+        key_hash = question_key(question)
+
+        future = CriteriaSingleFlight._async_inflight.get(key_hash)
+        if future is not None:
+            await run_in_threadpool(CriteriaSingleFlight._count, "coalesced_local")
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), _wait_timeout())
+            except asyncio.TimeoutError:
+                await run_in_threadpool(CriteriaSingleFlight._count, "fallback_calls")
+                print(f"⏱️ Single-flight wait timed out: {question[:50]}...")
+                return await extractor(question)
+
+        future = asyncio.get_running_loop().create_future()
+        CriteriaSingleFlight._async_inflight[key_hash] = future
+        await run_in_threadpool(CriteriaSingleFlight._count, "leaders")
+
+        try:
+            criteria = await CriteriaSingleFlight._aextract_across_workers(question, key_hash, extractor)
+            future.set_result(criteria)
+            return criteria
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark as retrieved when nobody else is waiting
+            raise
+        finally:
+            CriteriaSingleFlight._async_inflight.pop(key_hash, None)
+
+    @staticmethod
+    async def _aextract_across_workers(question: str, key_hash: str, extractor) -> dict:
+        client = get_redis_client()
+        if not client:
+            criteria = await extractor(question)
+            await run_in_threadpool(CacheService.save_search_criteria, question, criteria)
+            return criteria
+
+        lock_key = f"criteria_lock:{key_hash}"
+        token = uuid4().hex
+
+        try:
+            acquired = await run_in_threadpool(client.set, lock_key, token, nx=True, px=int(_lock_ttl() * 1000))
+        except Exception as e:
+            print(f"⚠️ Single-flight lock error: {e}")
+            acquired = True
+
+        if acquired:
+            try:
+                # A leader that finished just before us may already have cached it
+                data = await run_in_threadpool(client.get, f"criteria:{key_hash}")
+                if data:
+                    return json.loads(data)
+
+                criteria = await extractor(question)
+                await run_in_threadpool(CacheService.save_search_criteria, question, criteria)
+                return criteria
+            finally:
+                try:
+                    await run_in_threadpool(client.eval, RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+                except Exception as e:
+                    print(f"⚠️ Single-flight unlock error: {e}")
+
+        # Another worker is already asking GPT - wait for its cached result
+        await run_in_threadpool(CriteriaSingleFlight._count, "coalesced_remote")
+        try:
+            deadline = time.monotonic() + _wait_timeout()
+            while time.monotonic() < deadline:
+                await asyncio.sleep(Config.SINGLE_FLIGHT_POLL_SECONDS)
+                data = await run_in_threadpool(client.get, f"criteria:{key_hash}")
+                if data:
+                    return json.loads(data)
+                if not await run_in_threadpool(client.exists, lock_key):
+                    break
+        except Exception as e:
+            print(f"⚠️ Single-flight wait error: {e}")
+
+        await run_in_threadpool(CriteriaSingleFlight._count, "fallback_calls")
+        criteria = await extractor(question)
+        await run_in_threadpool(CacheService.save_search_criteria, question, criteria)
+        return criteria
@@ -0,0 +1,332 @@
+# app/services/criteria_parser.py
+"""
+Deterministic Hebrew/English parser for simple search questions.
+
+Produces the same criteria dict as GPTService.extract_search_criteria plus a
+confidence score, so the chat flow only calls GPT for ambiguous questions.
+"""
+import re
+from typing import Optional, Tuple
+
+from app.utils.city_names import CITY_ALIASES
+from app.utils.description_filters import FILTER_SYNONYMS
+
+CRITERIA_KEYS = (
+    "city", "address", "min_price", "max_price", "min_rooms", "max_rooms",
+    "min_floor", "max_floor", "property_type", "rental_estimate_max", "yield_percent",
+)
+
+# אותיות שימוש שמודבקות לתחילת מילה בעברית (ב, ל, ה, ו, מ, ש, כ)
+HEBREW_PREFIX = "[ובלהמשכ]{0,2}"
+
+PROPERTY_TYPE_WORDS = {
+    "apartment": [
+        "apartment", "apartments", "flat", "flats", "penthouse", "penthouses", "studio", "studios",
+        "דירה", "דירות", "דירת", "פנטהאוז", "פנטהאוזים", "סטודיו",
+    ],
+    "house": ["house", "houses", "villa", "villas", "cottage", "cottages", "בית", "בתים", "וילה", "וילות", "קוטג'"],
+    "vacation": ["vacation", "holiday", "נופש", "צימר"],
+}
+
+RENT_WORDS = ["monthly rent", "for rent", "rental", "renting", "rent", "שכר דירה", "שכ\"ד", "שכירות", "להשכרה"]
+PURCHASE_WORDS = ["for sale", "purchase", "buying", "buy", "sale", "לקנייה", "לקניה", "קנייה", "קניה", "למכירה", "מכירה"]
+STREET_WORDS = ["street", "st.", "st", "road", "rd", "avenue", "ave", "blvd", "boulevard", "רחוב", "רח'", "שדרות", "שד'"]
+
+FILLER_WORDS = {
+    # English
+    "i", "im", "i'm", "am", "looking", "look", "search", "searching", "find", "show", "me", "give", "get",
+    "want", "need", "would", "like", "to", "for", "a", "an", "the", "in", "at", "on", "of", "with", "and",
+    "or", "any", "some", "please", "properties", "property", "listings", "listing", "home", "homes", "real",
+    "estate", "that", "has", "have", "is", "are", "all", "near", "close", "nice", "available", "there",
+    "nis", "ils", "shekel", "shekels", "price", "priced", "budget", "my", "area", "neighborhood",
+    # עברית
+    "אני", "מחפש", "מחפשת", "מחפשים", "רוצה", "רוצים", "צריך", "צריכה", "תמצא", "תראה", "הראה", "לי",
+    "של", "עם", "את", "יש", "נכס", "נכסים", "בבקשה", "שח", "ש\"ח", "שקל", "שקלים", "ליד", "קרוב", "או",
+    "גם", "כל", "מחיר", "במחיר", "תקציב", "אזור", "באזור", "שכונה", "עיר", "בעיר",
+}
+
+AMOUNT = (
+    r"(?:\d+(?:\.\d+)?(?:\s*(?:million|mil|thousand|מיליון|מליון|אלף|אלפים)|[mk])?|million|מיליון|מליון)"
+    r"(?:\s*(?:₪|ש\"ח|שח|nis|ils|shekels?|שקלים|שקל))?"
+)
+NUMBER = r"\d+(?:\.\d+)?"
+
+MIN_WORDS = (
+    r"(?:at least|more than|above|over|from|min(?:imum)?|starting (?:at|from)|"
+    r"לפחות|מעל|החל מ-?|יותר מ-?|מינימום|מ-)"
+)
+MAX_WORDS = (
+    r"(?:up to|upto|under|below|less than|no more than|max(?:imum)?|until|"
+    r"עד|מתחת ל-?|פחות מ-?|מקסימום|לא יותר מ-?)"
+)
+RANGE_SEP = r"(?:-|to|and|עד|ל-?)"
+# "3 or 4 rooms" means either - read it as the range
+ALTERNATIVE_SEP = r"(?:or|או)"
+
+# Left after parsing, these change what a parsed value means ("without elevator",
+# "not on the ground floor", "Haifa or Eilat") - the question goes to GPT
+NEGATION_WORDS = (
+    r"(?<!\w)(?:no|not|without|except|excluding|"
+    r"ו?בלי|ו?ללא|[וש]?לא|ו?חוץ|ו?מלבד|ו?אין)(?!\w)"
+)
+ALTERNATIVE_WORDS = r"(?<!\w)(?:or|ו?או)(?!\w)"
+
+ROOMS = r"(?:bedrooms?|rooms?|חדרים|חדר|חד'?)"
+FLOOR = r"(?:floors?|קומות|קומה)"
+PERCENT = r"(?:%|percent|אחוזים|אחוז)"
+YIELD = r"(?:yield|return|roi|תשואה)"
+
+_MAGNITUDES = {
+    "million": 1_000_000, "mil": 1_000_000, "m": 1_000_000, "מיליון": 1_000_000, "מליון": 1_000_000,
+    "thousand": 1_000, "k": 1_000, "אלף": 1_000, "אלפים": 1_000,
+}
+
+
+def _phrase_pattern(phrase: str) -> str:
+    """Word-bounded regex for a phrase, allowing Hebrew prefixes or English plurals."""
+    escaped = re.escape(phrase)
+    if re.search(r"[֐-׿]", phrase):
+        return rf"(?<!\w){HEBREW_PREFIX}{escaped}(?!\w)"
+    plural = rf"{escaped[:-1]}ies" if phrase.endswith("y") else rf"{escaped}s"
+    return rf"(?<!\w)(?:{plural}|{escaped})(?!\w)"
+
+
+def _bounded(pattern: str) -> str:
+    return rf"(?<![\w.]){pattern}(?![\w])"
+
+
+def _to_number(value: float):
+    return int(value) if float(value).is_integer() else round(value, 2)
+
+
+def _parse_amount(text: str, default_magnitude: Optional[int] = None):
+    """'2.5 million' -> 2500000, '800k' -> 800000, 'מיליון' -> 1000000"""
+    match = re.match(rf"({NUMBER})?\s*([^\W\d_]+)?", text.strip())
+    number, unit = match.group(1), match.group(2)
+    value = float(number) if number else 1.0
+    magnitude = _MAGNITUDES.get(unit or "")
+    if magnitude is None and default_magnitude and value < 1000:
+        # "1-2 million" - the unit of the upper bound applies to both
+        value *= default_magnitude
+    return _to_number(value * (magnitude or 1)), magnitude
+
+
+def _normalize(question: str) -> str:
+    text = question.lower().replace("–", "-").replace("—", "-")
+    text = re.sub(r"(?<=\d),(?=\d{3}(?!\d))", "", text)  # 2,000,000 -> 2000000
+    text = re.sub(r"(?<=[^\W\d])-(?=[^\W\d])", " ", text)  # tel-aviv -> tel aviv
+    text = re.sub(r"[?!,;()]", " ", text)
+    return f" {text} "
+
+
+def _contains(text: str, phrases) -> bool:
+    return any(re.search(_phrase_pattern(p), text) for p in phrases)
+
+
+def _consume(text: str, pattern: str, handler) -> str:
+    """Runs handler on every match and blanks the matched span out of the text."""
+    def _replace(match):
+        handler(match)
+        return " " * len(match.group(0))
+
+    return re.sub(pattern, _replace, text)
+
+
+def _content_words(text: str) -> list:
+    words = []
+    for word in re.findall(r"[\w'\"]+", text):
+        word = word.strip("'\"")
+        if not word or word in FILLER_WORDS:
+            continue
+        stripped = re.sub(rf"^{HEBREW_PREFIX}", "", word)
+        if stripped != word and stripped in FILLER_WORDS:
+            continue
+        words.append(word)
+    return words
+
+
+def parse_search_criteria(question: str) -> Tuple[dict, float]:
+    """
+    Parses a free-text search question without calling GPT.
+
+    Returns:
+        (criteria, confidence) - criteria in the GPT output format and a score
+        between 0 and 1. A low score means the question should go to GPT.
+    """
+    criteria = {key: None for key in CRITERIA_KEYS}
+    criteria["description_filters"] = []
+    criteria["_source"] = "rules"
+
+    text = _normalize(question)
+    total_words = len(_content_words(text))
+    if not total_words:
+        return criteria, 0.0
+
+    # כתובות דורשות תרגום שם הרחוב - נשאיר ל-GPT
+    if _contains(text, STREET_WORDS):
+        return criteria, 0.0
+
+    rent_context = _contains(text, RENT_WORDS)
+    if rent_context and _contains(text, PURCHASE_WORDS):
+        return criteria, 0.0
+
+    ambiguous = []
+    cities, types = set(), set()
+
+    for alias in sorted(CITY_ALIASES, key=len, reverse=True):
+        text = _consume(text, _phrase_pattern(alias), lambda m, a=alias: cities.add(CITY_ALIASES[a]))
+
+    synonyms = {syn: keyword for keyword, syns in FILTER_SYNONYMS.items() for syn in syns}
+    for syn in sorted(synonyms, key=len, reverse=True):
+        keyword = synonyms[syn]
+
+        def _add_filter(m, keyword=keyword):
+            if keyword not in criteria["description_filters"]:
+                criteria["description_filters"].append(keyword)
+
+        text = _consume(text, _phrase_pattern(syn), _add_filter)
+
+    for property_type, words in PROPERTY_TYPE_WORDS.items():
+        for word in sorted(words, key=len, reverse=True):
+            text = _consume(text, _phrase_pattern(word), lambda m, t=property_type: types.add(t))
+
+    for word in sorted(RENT_WORDS + PURCHASE_WORDS, key=len, reverse=True):
+        text = _consume(text, _phrase_pattern(word), lambda m: None)
+
+    # --- חדרים ---
+    def _rooms_range(m):
+        criteria["min_rooms"] = _to_number(float(m.group(1)))
+        criteria["max_rooms"] = _to_number(float(m.group(2)))
+
+    def _rooms_bound(m):
+        bound, value, plus = m.group(1), _to_number(float(m.group(2))), m.group(3)
+        if plus or (bound and re.fullmatch(MIN_WORDS, bound)):
+            criteria["min_rooms"] = value
+        elif bound:
+            criteria["max_rooms"] = value
+        else:
+            criteria["min_rooms"] = criteria["max_rooms"] = value
+
+    text = _consume(
+        text,
+        _bounded(rf"(?:between |בין )?({NUMBER})\s*(?:{RANGE_SEP}|{ALTERNATIVE_SEP})\s*({NUMBER})\s*{ROOMS}"),
+        _rooms_range,
+    )
+    text = _consume(text, _bounded(rf"(?:({MIN_WORDS}|{MAX_WORDS})\s*)?({NUMBER})\s*(\+)?\s*{ROOMS}"), _rooms_bound)
+
+    # --- קומות ---
+    def _floor_range(m):
+        criteria["min_floor"] = int(float(m.group(1)))
+        criteria["max_floor"] = int(float(m.group(2)))
+
+    def _floor_bound(m):
+        bound, value, upwards = m.group(1), int(float(m.group(2))), m.group(3)
+        if upwards or (bound and re.fullmatch(MIN_WORDS, bound)):
+            criteria["min_floor"] = value
+        elif bound:
+            criteria["max_floor"] = value
+        else:
+            criteria["min_floor"] = criteria["max_floor"] = value
+
+    def _ground_floor(m):
+        criteria["min_floor"] = criteria["max_floor"] = 0
+
+    upwards = r"(?:\s*(and up|or higher|and above|ומעלה))?"
+    text = _consume(text, _bounded(rf"(?:ground floor|קומת קרקע)"), _ground_floor)
+    text = _consume(
+        text, _bounded(rf"{FLOOR}\s*({NUMBER})\s*(?:{RANGE_SEP}|{ALTERNATIVE_SEP})\s*({NUMBER})"), _floor_range
+    )
+    text = _consume(
+        text,
+        _bounded(rf"(?:({MIN_WORDS}|{MAX_WORDS})\s*)?{HEBREW_PREFIX}{FLOOR}\s*({NUMBER}){upwards}"),
+        _floor_bound,
+    )
+    text = _consume(
+        text,
+        _bounded(rf"(?:({MIN_WORDS}|{MAX_WORDS})\s*)?({NUMBER})(?:st|nd|rd|th)?\s*{FLOOR}{upwards}"),
+        _floor_bound,
+    )
+
+    # --- תשואה ---
+    def _yield(m):
+        criteria["yield_percent"] = _to_number(float(m.group(1) or m.group(2)))
+
+    text = _consume(
+        text,
+        _bounded(
+            rf"(?:{HEBREW_PREFIX}{YIELD}\s*(?:of |של )?(?:{MIN_WORDS}\s*)?(?:of |של )?({NUMBER})\s*{PERCENT}?"
+            rf"|({NUMBER})\s*{PERCENT}\s*{HEBREW_PREFIX}{YIELD})"
+        ),
+        _yield,
+    )
+
+    # --- מחיר ---
+    prices = {}
+
+    def _price_range(m):
+        high, magnitude = _parse_amount(m.group(2))
+        low, _ = _parse_amount(m.group(1), default_magnitude=magnitude)
+        prices["min"], prices["max"] = low, high
+
+    def _price_bound(m):
+        value, _ = _parse_amount(m.group(2))
+        prices["min" if re.fullmatch(MIN_WORDS, m.group(1)) else "max"] = value
+
+    text = _consume(
+        text,
+        _bounded(rf"(?:between |from |בין |מ-?\s*)?({AMOUNT})\s*{RANGE_SEP}\s*({AMOUNT})"),
+        _price_range,
+    )
+    text = _consume(text, _bounded(rf"({MAX_WORDS}|{MIN_WORDS})\s*({AMOUNT})"), _price_bound)
+
+    if rent_context:
+        if "min" in prices or "max" not in prices:
+            return criteria, 0.0
+        criteria["rental_estimate_max"] = prices["max"]
+    else:
+        # מחיר רכישה נמוך מדי הוא כנראה שכירות או טעות - לא מנחשים
+        if any(v < 100_000 for v in prices.values()):
+            ambiguous.append("price")
+        criteria["min_price"] = prices.get("min")
+        criteria["max_price"] = prices.get("max")
+
+    if len(cities) > 1 or len(types) > 1:
+        ambiguous.append("multiple values")
+    criteria["city"] = next(iter(cities)) if len(cities) == 1 else None
+    criteria["property_type"] = next(iter(types)) if len(types) == 1 else None
+
+    if re.search(NEGATION_WORDS, text):
+        ambiguous.append("negation")
+    if re.search(ALTERNATIVE_WORDS, text):
+        ambiguous.append("alternatives")
+
+    found_anything = any(criteria[k] is not None for k in CRITERIA_KEYS) or criteria["description_filters"]
+    if ambiguous or not found_anything:
+        return criteria, 0.0
+
+    unknown_words = _content_words(text)
+    confidence = round(1 - len(unknown_words) / total_words, 2)
+    return criteria, max(confidence, 0.0)
+
+
+def canonical_terms(question: str) -> list:
+    """
+    Question as a list of canonical tokens for similarity matching: city, type and
+    description synonyms are unified ("flat" -> "type_apartment") and filler words dropped.
+    """
+    text = _normalize(question)
+
+    for alias in sorted(CITY_ALIASES, key=len, reverse=True):
+        token = "city_" + CITY_ALIASES[alias].lower().replace(" ", "_")
+        text = re.sub(_phrase_pattern(alias), f" {token} ", text)
+
+    synonyms = {syn: keyword for keyword, syns in FILTER_SYNONYMS.items() for syn in syns}
+    for syn in sorted(synonyms, key=len, reverse=True):
+        token = "filter_" + synonyms[syn].replace(" ", "_")
+        text = re.sub(_phrase_pattern(syn), f" {token} ", text)
+
+    for property_type, words in PROPERTY_TYPE_WORDS.items():
+        for word in sorted(words, key=len, reverse=True):
+            text = re.sub(_phrase_pattern(word), f" type_{property_type} ", text)
+
+    return _content_words(text)
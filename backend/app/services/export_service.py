@@ -0,0 +1,84 @@
+# app/services/export_service.py
+import json
+import zlib
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterator, Optional
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.config import Config
+from app.models.property import Property
+from app.services.property_service import PUBLIC_COLUMNS
+
+# Public fields plus the watermark partners pass back as updated_since
+EXPORT_COLUMNS = PUBLIC_COLUMNS + (Property.updated_at,)
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "json": "application/json"}
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Can't encode {type(value).__name__}")
+
+
+def _dumps(row) -> str:
+    return json.dumps(dict(row), default=_json_default, ensure_ascii=False, separators=(",", ":"))
+
+
+def iter_export_batches(bind: Engine, updated_since: Optional[datetime] = None,
+                        batch_size: int = None) -> Iterator[list]:
+    """
+    Public rows oldest change first, in batches read through a server-side cursor.
+    Uses its own session - the request's one is closed before a streamed body is sent.
+    """
+    query = select(*EXPORT_COLUMNS).order_by(Property.updated_at, Property.id)
+    if updated_since:
+        # >= - a row changed in the same instant as the last one seen is sent again, never skipped
+        query = query.where(Property.updated_at >= updated_since)
+
+    with Session(bind=bind) as db:
+        result = db.execute(query.execution_options(yield_per=batch_size or Config.EXPORT_BATCH_SIZE))
+        for batch in result.mappings().partitions():
+            yield batch
+
+
+def encode_ndjson(batches: Iterator[list]) -> Iterator[bytes]:
+    for batch in batches:
+        yield "".join(_dumps(row) + "\n" for row in batch).encode("utf-8")
+
+
+def encode_json_array(batches: Iterator[list]) -> Iterator[bytes]:
+    yield b"["
+    first = True
+    for batch in batches:
+        chunk = ",".join(_dumps(row) for row in batch)
+        yield (chunk if first else "," + chunk).encode("utf-8")
+        first = False
+    yield b"]"
+
+
+def gzip_chunks(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31 - gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_response(bind: Engine, format: str, updated_since: Optional[datetime] = None,
+                    gzip: bool = False) -> StreamingResponse:
+    encode = encode_ndjson if format == "ndjson" else encode_json_array
+    body = encode(iter_export_batches(bind, updated_since))
+    headers = {}
+    if gzip:
+        body = gzip_chunks(body)
+        headers["Content-Encoding"] = "gzip"
+        headers["Vary"] = "Accept-Encoding"
+    return StreamingResponse(body, media_type=MEDIA_TYPES[format], headers=headers)
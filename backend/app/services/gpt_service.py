@@ -1,18 +1,23 @@
 import os
 import openai
+import httpx
 import json
 import re
+from typing import Optional
 from dotenv import load_dotenv
+from app.config import Config
 
 
 load_dotenv()
 openai.api_key = os.getenv("OPENAI_API_KEY")
 
+GPT_MODEL = "gpt-5-mini"
+CRITERIA_SYSTEM_PROMPT = "You are an AI assistant that extracts real estate search filters from user questions in English or Hebrew."
+INSIGHTS_SYSTEM_PROMPT = "You are a dashboard assistant."
 
-class GPTService:
-    @staticmethod
-    def extract_search_criteria(question: str) -> dict:
-        prompt = f"""
+
+def _criteria_prompt(question: str) -> str:
+    return f"""
 You are a real estate assistant. A user asked: "{question}"
 
 Extract a JSON object with the following keys:
@@ -121,39 +126,9 @@ Output all values in English. Do not explain or include translations in the outp
 
 """
 
-        try:
-            response = openai.ChatCompletion.create(
-                model="gpt-5-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an AI assistant that extracts real estate search filters from user questions in English or Hebrew.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                timeout=10
-            )
-
-            content = response["choices"][0]["message"]["content"]
-            print("🧠 GPT Raw Output:\n", content)
-
-            match = re.search(r"\{.*\}", content, re.DOTALL)
-            if match:
-                criteria = json.loads(match.group(0))
-                criteria["_raw"] = content.strip()
-                if "description_filters" not in criteria:
-                    criteria["description_filters"] = []
-                return criteria
-            else:
-                return {"_raw": content.strip()}
-
-        except Exception as e:
-            print(f"❌ GPT Error: {e}")
-            return {"_error": str(e)}
 
-    @staticmethod
-    def generate_gpt_insights(agent_id: str, text: str) -> dict:
-        prompt = f"""
+def _insights_prompt(text: str) -> str:
+    return f"""
 You are a business analyst specialized in real estate. Analyze the following client messages and return dashboard insights for a real estate agent.
 
 Messages:
@@ -170,50 +145,9 @@ Output must be a valid JSON with the following format:
 Output only the JSON. No explanations.
 """
 
-        try:
-            response = openai.ChatCompletion.create(
-                model="gpt-5-mini",
-                messages=[
-                    {"role": "system", "content": "You are a dashboard assistant."},
-                    {"role": "user", "content": prompt},
-                ],
-                timeout=15
-            )
 
-            content = response["choices"][0]["message"]["content"]
-            print("📊 GPT Dashboard Output:\n", content)
-
-            # Remove markdown block if it exists
-            content = content.strip()
-            if content.startswith("```json"):
-                content = content.replace("```json", "").replace("```", "").strip()
-            elif content.startswith("```"):
-                content = content.replace("```", "").strip()
-
-            # Extract JSON
-            match = re.search(r"\{.*\}", content, re.DOTALL)
-            if match:
-                parsed = json.loads(match.group(0))
-                if isinstance(parsed, dict):
-                    return {
-                        "summary": str(parsed.get("summary", "")),
-                        "frequent_needs": [str(x) for x in parsed.get("frequent_needs", [])],
-                        "potential_opportunities": [str(x) for x in parsed.get("potential_opportunities", [])],
-                        "recommended_actions": [str(x) for x in parsed.get("recommended_actions", [])],
-                    }
-
-        except Exception as e:
-            print("❌ GPT error:", e)
-            return {
-                "summary": "GPT error occurred",
-                "frequent_needs": [],
-                "potential_opportunities": [],
-                "recommended_actions": [],
-                "_error": str(e)
-            }
-
-    def estimate_property_metrics(self, price, city, address, rooms=None, floor=None, description=None):
-        prompt = f"""
+def _estimate_prompt(price, city, address, rooms=None, floor=None, description=None) -> str:
+    return f"""
         A real estate property is listed for {price} ILS. It is located in the city of {city}, on {address}.
         {f"It has {rooms} rooms." if rooms else ""}
         {f"It is on the {floor} floor." if floor else ""}
@@ -233,30 +167,203 @@ Output only the JSON. No explanations.
         }}
         """
 
+
+def _parse_criteria(content: str) -> dict:
+    print("🧠 GPT Raw Output:\n", content)
+
+    match = re.search(r"\{.*\}", content, re.DOTALL)
+    if match:
+        criteria = json.loads(match.group(0))
+        criteria["_raw"] = content.strip()
+        if "description_filters" not in criteria:
+            criteria["description_filters"] = []
+        return criteria
+    else:
+        return {"_raw": content.strip()}
+
+
+def _parse_insights(content: str) -> Optional[dict]:
+    print("📊 GPT Dashboard Output:\n", content)
+
+    # Remove markdown block if it exists
+    content = content.strip()
+    if content.startswith("```json"):
+        content = content.replace("```json", "").replace("```", "").strip()
+    elif content.startswith("```"):
+        content = content.replace("```", "").strip()
+
+    # Extract JSON
+    match = re.search(r"\{.*\}", content, re.DOTALL)
+    if match:
+        parsed = json.loads(match.group(0))
+        if isinstance(parsed, dict):
+            return {
+                "summary": str(parsed.get("summary", "")),
+                "frequent_needs": [str(x) for x in parsed.get("frequent_needs", [])],
+                "potential_opportunities": [str(x) for x in parsed.get("potential_opportunities", [])],
+                "recommended_actions": [str(x) for x in parsed.get("recommended_actions", [])],
+            }
+    return None
+
+
+def _insights_error(e: Exception) -> dict:
+    print("❌ GPT error:", e)
+    return {
+        "summary": "GPT error occurred",
+        "frequent_needs": [],
+        "potential_opportunities": [],
+        "recommended_actions": [],
+        "_error": str(e)
+    }
+
+
+def _parse_estimate(content: str) -> dict:
+    content = content.strip()
+
+    # הסר עטיפת markdown אם קיימת (```json ... ```)
+    if content.startswith("```json"):
+        content = content.removeprefix("```json").removesuffix("```").strip()
+
+    print("🔍 GPT response content:\n", content)
+
+    try:
+        parsed = json.loads(content)
+        return parsed
+    except Exception as e:
+        print("❌ Failed to parse GPT content:", e)
+        return {"rental_estimate": None, "yield_percent": None}
+
+
+class GPTService:
+    @staticmethod
+    def extract_search_criteria(question: str) -> dict:
+        try:
+            response = openai.ChatCompletion.create(
+                model=GPT_MODEL,
+                messages=[
+                    {"role": "system", "content": CRITERIA_SYSTEM_PROMPT},
+                    {"role": "user", "content": _criteria_prompt(question)},
+                ],
+                timeout=Config.CRITERIA_GPT_TIMEOUT_SECONDS
+            )
+
+            return _parse_criteria(response["choices"][0]["message"]["content"])
+
+        except Exception as e:
+            print(f"❌ GPT Error: {e}")
+            return {"_error": str(e)}
+
+    @staticmethod
+    def generate_gpt_insights(agent_id: str, text: str) -> dict:
+        try:
+            response = openai.ChatCompletion.create(
+                model=GPT_MODEL,
+                messages=[
+                    {"role": "system", "content": INSIGHTS_SYSTEM_PROMPT},
+                    {"role": "user", "content": _insights_prompt(text)},
+                ],
+                timeout=15
+            )
+
+            return _parse_insights(response["choices"][0]["message"]["content"])
+
+        except Exception as e:
+            return _insights_error(e)
+
+    def estimate_property_metrics(self, price, city, address, rooms=None, floor=None, description=None):
         response = openai.ChatCompletion.create(
-            model="gpt-5-mini",
-            messages=[{"role": "user", "content": prompt}]
+            model=GPT_MODEL,
+            messages=[{"role": "user", "content": _estimate_prompt(price, city, address, rooms, floor, description)}],
+            request_timeout=Config.ESTIMATE_GPT_TIMEOUT_SECONDS
+        )
+
+        return _parse_estimate(response.choices[0].message.content)
 
+
+# ===== Async client - doesn't block the event loop, reuses pooled connections =====
+
+_async_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    global _async_client
+
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            base_url=openai.api_base,
+            timeout=httpx.Timeout(Config.OPENAI_ASYNC_TIMEOUT_SECONDS, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=Config.OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=Config.OPENAI_MAX_CONNECTIONS,
+            ),
         )
+    return _async_client
+
+
+async def close_async_client():
+    """Close pooled connections (called on shutdown)"""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
 
-        content = response.choices[0].message.content.strip()
 
-        # הסר עטיפת markdown אם קיימת (```json ... ```)
-        if content.startswith("```json"):
-            content = content.removeprefix("```json").removesuffix("```").strip()
+async def _achat(messages: list, timeout: Optional[float] = None) -> str:
+    response = await _get_async_client().post(
+        "/chat/completions",
+        json={"model": GPT_MODEL, "messages": messages},
+        headers={"Authorization": f"Bearer {openai.api_key}"},
+        timeout=timeout or httpx.USE_CLIENT_DEFAULT,
+    )
+    response.raise_for_status()
+    return response.json()["choices"][0]["message"]["content"]
 
-        print("🔍 GPT response content:\n", content)
 
+class AsyncGPTService:
+    """Same prompts and parsing as GPTService, for async callers."""
+
+    @staticmethod
+    async def extract_search_criteria(question: str) -> dict:
         try:
-            parsed = json.loads(content)
-            return parsed
+            content = await _achat(
+                [
+                    {"role": "system", "content": CRITERIA_SYSTEM_PROMPT},
+                    {"role": "user", "content": _criteria_prompt(question)},
+                ],
+                timeout=Config.CRITERIA_GPT_TIMEOUT_SECONDS
+            )
+            return _parse_criteria(content)
+
         except Exception as e:
-            print("❌ Failed to parse GPT content:", e)
-            return {"rental_estimate": None, "yield_percent": None}
+            print(f"❌ GPT Error: {e}")
+            return {"_error": str(e)}
+
+    @staticmethod
+    async def generate_gpt_insights(agent_id: str, text: str) -> dict:
+        try:
+            content = await _achat(
+                [
+                    {"role": "system", "content": INSIGHTS_SYSTEM_PROMPT},
+                    {"role": "user", "content": _insights_prompt(text)},
+                ],
+                timeout=15
+            )
+            return _parse_insights(content)
+
+        except Exception as e:
+            return _insights_error(e)
+
+    @staticmethod
+    async def estimate_property_metrics(price, city, address, rooms=None, floor=None, description=None):
+        content = await _achat(
+            [{"role": "user", "content": _estimate_prompt(price, city, address, rooms, floor, description)}],
+            timeout=Config.ESTIMATE_GPT_TIMEOUT_SECONDS
+        )
+        return _parse_estimate(content)
 
 
-def build_response_message(criteria: dict, results: list, lang: str = "en") -> str:
-    n = len(results)
+def build_response_message(criteria: dict, results: list, lang: str = "en", total: Optional[int] = None) -> str:
+    n = len(results) if total is None else total
     city = criteria.get("city")
     address = criteria.get("address")
     floor = criteria.get("floor")
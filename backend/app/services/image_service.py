@@ -0,0 +1,37 @@
+# app/services/image_service.py
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.property import Property
+from app.services.image_variants import pick_image_key
+from app.services.presign_cache import PresignCache
+
+
+def presign_image_keys(keys_by_id: Dict[str, Optional[str]]) -> Dict[str, Optional[str]]:
+    """
+    Presigned URLs for S3 keys that are already loaded (e.g. image_url of search results).
+    Each distinct key is looked up once, and only signed when PresignCache has no fresh URL.
+
+    Returns:
+        property id -> URL (None when the property has no image or signing failed)
+    """
+    signed = {}
+    for key in set(k for k in keys_by_id.values() if k):
+        signed[key] = PresignCache.get_url(key)
+    return {str(pid): signed.get(key) if key else None for pid, key in keys_by_id.items()}
+
+
+def resolve_image_urls(db: Session, property_ids: Iterable, size: str = "original", fmt: str = "jpeg",
+                       chunk: int = 500) -> Dict[str, Optional[str]]:
+    """
+    Presigned URLs for many properties: image keys in one query per chunk (only the image columns),
+    then presign_image_keys. Ids that don't exist are left out; a missing variant falls back to the original.
+    """
+    ids = list(dict.fromkeys(str(i) for i in property_ids))
+    keys_by_id = {}
+    for start in range(0, len(ids), chunk):
+        rows = db.query(Property.id, Property.image_url, Property.image_variants).filter(
+            Property.id.in_(ids[start:start + chunk]))
+        keys_by_id.update((pid, pick_image_key(url, variants, size, fmt)) for pid, url, variants in rows)
+    return presign_image_keys(keys_by_id)
@@ -0,0 +1,140 @@
+# app/services/image_variants.py
+import asyncio
+import io
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.config import Config
+from app.database import SessionLocal
+from app.models.property import Property
+from app.services.presign_cache import PresignCache
+from app.utils.aws_s3 import delete_s3_object, download_s3_object, upload_file_to_s3
+
+# Longest edge in pixels - smaller images are not enlarged
+VARIANT_SIZES = {"thumbnail": 320, "card": 800, "full": 1600}
+FORMATS = {"webp": ("WEBP", "image/webp"), "jpeg": ("JPEG", "image/jpeg")}
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def upload_key(property_id: str, extension: str) -> str:
+    """
+    A new key for every upload (property_images/{id}/{token}.{ext}), so a variants job
+    still running for a replaced image can't be taken for the current one's.
+    """
+    return f"property_images/{property_id}/{uuid.uuid4().hex[:12]}{extension}"
+
+
+def variant_key(original_key: str, size: str, fmt: str) -> str:
+    """Under the original's key without extension: .../{token}/card.webp"""
+    return f"{original_key.rsplit('.', 1)[0]}/{size}.{'jpg' if fmt == 'jpeg' else fmt}"
+
+
+def render_variants(original: bytes, quality: int) -> Dict[tuple, bytes]:
+    """
+    Resized WebP and JPEG of every size in VARIANT_SIZES. CPU-bound - runs in the process pool.
+
+    Returns:
+        (size, format) -> encoded image
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(original)) as image:
+        image = ImageOps.exif_transpose(image)  # phones store the rotation in EXIF
+        image = image.convert("RGB")
+
+    rendered = {}
+    for size, edge in VARIANT_SIZES.items():
+        resized = image.copy()
+        resized.thumbnail((edge, edge), Image.LANCZOS)
+        for fmt, (pil_format, _) in FORMATS.items():
+            out = io.BytesIO()
+            if pil_format == "JPEG":
+                resized.save(out, pil_format, quality=quality, optimize=True, progressive=True)
+            else:
+                resized.save(out, pil_format, quality=quality, method=4)
+            rendered[(size, fmt)] = out.getvalue()
+    return rendered
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=Config.IMAGE_VARIANT_WORKERS)
+    return _pool
+
+
+def shutdown_image_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _record_variants(property_id: str, original_key: str, variants: dict) -> bool:
+    db = SessionLocal()
+    try:
+        property_obj = db.query(Property).filter_by(id=property_id).first()
+        # Replaced by another upload meanwhile - its key differs, and its own job records its variants
+        if not property_obj or property_obj.image_url != original_key:
+            return False
+        property_obj.image_variants = variants
+        db.commit()
+        return True
+    finally:
+        db.close()
+
+
+async def generate_image_variants(property_id: str, original_key: str) -> Optional[dict]:
+    """
+    After an upload: renders the variants in the process pool, uploads them and records
+    their keys on the property ({"card": {"webp": key, "jpeg": key}, ...}).
+    Runs as a background task - failures are logged and the original keeps being served.
+    """
+    try:
+        original = await run_in_threadpool(download_s3_object, original_key)
+        if original is None:
+            return None
+
+        loop = asyncio.get_running_loop()
+        rendered = await loop.run_in_executor(_get_pool(), render_variants, original,
+                                              Config.IMAGE_VARIANT_QUALITY)
+
+        variants = {}
+        for (size, fmt), data in rendered.items():
+            key = variant_key(original_key, size, fmt)
+            variants.setdefault(size, {})[fmt] = key
+            if not await run_in_threadpool(upload_file_to_s3, key, data, FORMATS[fmt][1]):
+                await run_in_threadpool(delete_image_objects, None, variants)
+                return None
+
+        if not await run_in_threadpool(_record_variants, property_id, original_key, variants):
+            await run_in_threadpool(delete_image_objects, None, variants)
+            return None
+        print(f"🖼️ Image variants ready for property {property_id}")
+        return variants
+    except Exception as e:
+        print(f"❌ Image variants failed for property {property_id}: {e}")
+        return None
+
+
+def delete_image_objects(image_url: Optional[str], image_variants: Optional[dict]):
+    """Removes a replaced image and its variants from S3 (and their cached URLs)"""
+    keys = [image_url] if image_url else []
+    keys += [key for formats in (image_variants or {}).values() for key in formats.values()]
+    for key in keys:
+        delete_s3_object(key)
+        PresignCache.invalidate(key)
+
+
+def pick_image_key(image_url: Optional[str], image_variants: Optional[dict], size: str = "original",
+                   fmt: str = "jpeg") -> Optional[str]:
+    """The variant asked for, or the original while variants are missing (old uploads, still processing)"""
+    if size != "original":
+        key = ((image_variants or {}).get(size) or {}).get(fmt)
+        if key:
+            return key
+    return image_url
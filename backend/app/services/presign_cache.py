@@ -0,0 +1,103 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from app.config import Config
+from app.utils.aws_s3 import generate_presigned_view_url
+from app.utils.redis_client import get_redis_client
+
+
+class PresignCache:
+    """
+    Presigned GET URLs by S3 key, reused until PRESIGNED_URL_REFRESH_SECONDS before they expire.
+    The same image keeps the same URL for most of an hour, so browsers and Telegram can cache
+    it, and hot listings aren't signed again on every request.
+    In-process LRU first, then Redis (shared by the workers), then a new signature.
+    """
+
+    _lock = threading.Lock()
+    _lru = OrderedDict()  # key -> (url, expires_at)
+    _stats = {"local_hits": 0, "redis_hits": 0, "misses": 0}
+
+    @staticmethod
+    def _fresh(expires_at: float) -> bool:
+        return expires_at - Config.PRESIGNED_URL_REFRESH_SECONDS > time.time()
+
+    @staticmethod
+    def _lru_get(key: str) -> Optional[tuple]:
+        with PresignCache._lock:
+            entry = PresignCache._lru.get(key)
+            if entry is not None:
+                PresignCache._lru.move_to_end(key)
+            return entry
+
+    @staticmethod
+    def _lru_put(key: str, entry: tuple):
+        with PresignCache._lock:
+            PresignCache._lru[key] = entry
+            PresignCache._lru.move_to_end(key)
+            while len(PresignCache._lru) > Config.PRESIGNED_URL_LRU_SIZE:
+                PresignCache._lru.popitem(last=False)
+
+    @staticmethod
+    def get_url(key: str) -> Optional[str]:
+        entry = PresignCache._lru_get(key)
+        if entry and PresignCache._fresh(entry[1]):
+            PresignCache._stats["local_hits"] += 1
+            return entry[0]
+
+        client = get_redis_client()
+        if client:
+            try:
+                data = client.get(f"presign:{key}")
+                if data:
+                    url, expires_at = json.loads(data)
+                    if PresignCache._fresh(expires_at):
+                        PresignCache._lru_put(key, (url, expires_at))
+                        PresignCache._stats["redis_hits"] += 1
+                        return url
+            except Exception as e:
+                print(f"⚠️ Presign cache read error: {e}")
+
+        PresignCache._stats["misses"] += 1
+        expires_in = Config.PRESIGNED_URL_TTL_SECONDS
+        expires_at = time.time() + expires_in
+        url = generate_presigned_view_url(key, expires_in)
+        if not url:
+            return None
+
+        PresignCache._lru_put(key, (url, expires_at))
+        reusable_for = int(expires_in - Config.PRESIGNED_URL_REFRESH_SECONDS)
+        if client and reusable_for > 0:
+            try:
+                client.setex(f"presign:{key}", reusable_for, json.dumps([url, expires_at]))
+            except Exception as e:
+                print(f"⚠️ Presign cache save error: {e}")
+        return url
+
+    @staticmethod
+    def invalidate(key: str):
+        """The object under key was replaced - hand out a new URL so cached copies of the old image aren't used"""
+        with PresignCache._lock:
+            PresignCache._lru.pop(key, None)
+        client = get_redis_client()
+        if client:
+            try:
+                client.delete(f"presign:{key}")
+            except Exception as e:
+                print(f"⚠️ Presign cache delete error: {e}")
+
+    @staticmethod
+    def clear_local():
+        with PresignCache._lock:
+            PresignCache._lru.clear()
+
+    @staticmethod
+    def get_stats() -> dict:
+        """This worker only"""
+        stats = PresignCache._stats
+        total = sum(stats.values())
+        hits = stats["local_hits"] + stats["redis_hits"]
+        return {**stats, "hit_rate": round(hits / total, 3) if total else 0.0, "cached_locally": len(PresignCache._lru)}
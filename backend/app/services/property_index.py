@@ -0,0 +1,269 @@
+# app/services/property_index.py
+import threading
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.config import Config
+from app.database import SessionLocal
+from app.models.property import Property
+from app.utils.city_names import city_key
+
+NUMERIC = ("price", "rooms", "floor", "rental_estimate", "yield_percent")
+CODED = ("agent_id", "city_canonical", "property_type")
+MISSING = -1  # code for NULL
+UNKNOWN = -2  # code for a value no row has - matches nothing
+NO_DATE = np.iinfo(np.int64).min
+
+# criteria key -> (column, comparison) - same semantics as _search_query
+RANGES = (
+    ("min_price", "price", np.greater_equal),
+    ("max_price", "price", np.less_equal),
+    ("min_rooms", "rooms", np.greater_equal),
+    ("max_rooms", "rooms", np.less_equal),
+    ("min_floor", "floor", np.greater_equal),
+    ("max_floor", "floor", np.less_equal),
+    ("rental_estimate_max", "rental_estimate", np.less_equal),
+    ("yield_percent", "yield_percent", np.greater_equal),
+)
+PRICE_FILTERS = ("min_price", "max_price")  # applied when truthy, the rest when not None
+
+
+def property_row(property: Property) -> dict:
+    return {
+        "id": property.id,
+        "agent_id": property.agent_id,
+        "city_canonical": property.city_canonical or city_key(property.city),
+        "property_type": property.property_type,
+        "created_at": property.created_at,
+        **{name: getattr(property, name) for name in NUMERIC},
+    }
+
+
+def _timestamp(value: Optional[datetime]) -> int:
+    return NO_DATE if value is None else int(np.datetime64(value, "ns").astype(np.int64))
+
+
+def _number(value) -> float:
+    return np.nan if value is None else float(value)
+
+
+class PropertyIndex:
+    """
+    Column arrays over the properties table for the numeric/categorical part of a search.
+    Strings (agent, city, type) are dictionary-encoded to int codes; NULL numbers are NaN,
+    so comparisons on them are False exactly like SQL. Rows are tombstoned on delete and
+    dropped at the next rebuild. search() returns ids newest first - the DB only hydrates.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._lock = threading.RLock()
+        self._size = 0
+        self._slots = {}  # property id -> position in the arrays
+        self._ids = np.empty(capacity, dtype="S36")  # ASCII uuids - a quarter of the size of U36
+        self._created = np.full(capacity, NO_DATE, dtype=np.int64)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._numeric = {name: np.full(capacity, np.nan) for name in NUMERIC}
+        self._codes = {name: np.full(capacity, MISSING, dtype=np.int32) for name in CODED}
+        self._dictionaries = {name: {} for name in CODED}
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def _code(self, name: str, value, add: bool = False) -> int:
+        if value is None:
+            return MISSING
+        dictionary = self._dictionaries[name]
+        code = dictionary.get(value)
+        if code is None:
+            if not add:
+                return UNKNOWN
+            code = dictionary[value] = len(dictionary)
+        return code
+
+    @classmethod
+    def build(cls, rows: Iterable[dict]) -> "PropertyIndex":
+        rows = list(rows)
+        index = cls(capacity=max(len(rows), 1024))
+        n = len(rows)
+        index._size = n
+        index._slots = {row["id"]: slot for slot, row in enumerate(rows)}
+        index._ids[:n] = [row["id"] for row in rows]
+        index._created[:n] = [_timestamp(row["created_at"]) for row in rows]
+        index._alive[:n] = True
+        for name in NUMERIC:
+            index._numeric[name][:n] = [_number(row[name]) for row in rows]
+        for name in CODED:
+            index._codes[name][:n] = [index._code(name, row[name], add=True) for row in rows]
+        return index
+
+    def _grow(self):
+        capacity = len(self._ids) * 2
+
+        def grown(array, fill):
+            bigger = np.full(capacity, fill, dtype=array.dtype)
+            bigger[:len(array)] = array
+            return bigger
+
+        self._ids = grown(self._ids, b"")
+        self._created = grown(self._created, NO_DATE)
+        self._alive = grown(self._alive, False)
+        self._numeric = {name: grown(array, np.nan) for name, array in self._numeric.items()}
+        self._codes = {name: grown(array, MISSING) for name, array in self._codes.items()}
+
+    def upsert(self, row: dict):
+        with self._lock:
+            slot = self._slots.get(row["id"])
+            if slot is None:
+                if self._size == len(self._ids):
+                    self._grow()
+                slot = self._slots[row["id"]] = self._size
+                self._size += 1
+
+            self._ids[slot] = row["id"]
+            self._created[slot] = _timestamp(row["created_at"])
+            self._alive[slot] = True
+            for name in NUMERIC:
+                self._numeric[name][slot] = _number(row[name])
+            for name in CODED:
+                self._codes[name][slot] = self._code(name, row[name], add=True)
+
+    def remove(self, property_id: str):
+        with self._lock:
+            slot = self._slots.pop(property_id, None)
+            if slot is not None:
+                self._alive[slot] = False
+
+    def remove_agent(self, agent_id: str):
+        with self._lock:
+            n = self._size
+            slots = np.flatnonzero(self._alive[:n] & (self._codes["agent_id"][:n] == self._code("agent_id", agent_id)))
+            for property_id in self._ids[slots].astype("U36").tolist():
+                del self._slots[property_id]
+            self._alive[slots] = False
+
+    @staticmethod
+    def supports(criteria: dict) -> bool:
+        """Address and description need text matching - those searches stay in SQL"""
+        return not criteria.get("address") and not criteria.get("description_filters")
+
+    def search(self, criteria: dict) -> Optional[List[str]]:
+        """
+        Returns:
+            Matching ids ordered like the SQL search (created_at, id descending),
+            or None if the criteria need the SQL path.
+        """
+        if not self.supports(criteria):
+            return None
+
+        with self._lock:
+            n = self._size
+            mask = self._alive[:n].copy()
+
+            if criteria.get("agent_id"):
+                mask &= self._codes["agent_id"][:n] == self._code("agent_id", str(criteria["agent_id"]))
+            if criteria.get("city"):
+                mask &= self._codes["city_canonical"][:n] == self._code("city_canonical", city_key(criteria["city"]))
+            if criteria.get("property_type"):
+                property_type = criteria["property_type"].lower().strip()
+                mask &= self._codes["property_type"][:n] == self._code("property_type", property_type)
+
+            for key, column, compare in RANGES:
+                value = criteria.get(key)
+                if value is None or (key in PRICE_FILTERS and not value):
+                    continue
+                mask &= compare(self._numeric[column][:n], float(value))
+
+            slots = np.flatnonzero(mask)
+            order = np.lexsort((self._ids[slots], self._created[slots]))[::-1]
+            return self._ids[slots[order]].astype("U36").tolist()
+
+
+_swap_lock = threading.Lock()
+_rebuild_lock = threading.Lock()
+_index: Optional[PropertyIndex] = None
+_replay: Optional[list] = None  # writes that arrive while a rebuild is loading rows
+_stop = threading.Event()
+
+
+def get_property_index() -> Optional[PropertyIndex]:
+    """The loaded index, or None if disabled or not built yet (callers use SQL)"""
+    return _index if Config.PROPERTY_INDEX_ENABLED else None
+
+
+def load_rows(db: Session) -> list:
+    query = db.query(
+        Property.id, Property.agent_id, Property.city_canonical, Property.property_type, Property.created_at,
+        *[getattr(Property, name) for name in NUMERIC],
+    )
+    return [row._asdict() for row in query.yield_per(10_000)]
+
+
+def rebuild_property_index(db: Session) -> PropertyIndex:
+    """Full resync from the DB. Writes made meanwhile are replayed onto the new index."""
+    global _index, _replay
+
+    with _rebuild_lock:
+        with _swap_lock:
+            _replay = []
+        try:
+            index = PropertyIndex.build(load_rows(db))
+        except Exception:
+            with _swap_lock:
+                _replay = None
+            raise
+
+        with _swap_lock:
+            for method, argument in _replay:
+                getattr(index, method)(argument)
+            _index, _replay = index, None
+
+    print(f"✅ Property index loaded ({len(index)} properties)")
+    return index
+
+
+def _apply(method: str, argument):
+    with _swap_lock:
+        if _index is not None:
+            getattr(_index, method)(argument)
+        if _replay is not None:
+            _replay.append((method, argument))
+
+
+# Write hooks - called by property_service after commit
+def on_property_saved(property: Property):
+    _apply("upsert", property_row(property))
+
+
+def on_property_deleted(property_id: str):
+    _apply("remove", property_id)
+
+
+def on_agent_deleted(agent_id: str):
+    _apply("remove_agent", str(agent_id))
+
+
+def _resync_loop():
+    while not _stop.is_set():
+        db = SessionLocal()
+        try:
+            rebuild_property_index(db)
+        except Exception as e:
+            print(f"⚠️ Property index resync failed: {e}")
+        finally:
+            db.close()
+        # Catches writes made by other processes (workers, other app instances)
+        _stop.wait(Config.PROPERTY_INDEX_RESYNC_SECONDS)
+
+
+def start_property_index():
+    if not Config.PROPERTY_INDEX_ENABLED:
+        return
+    _stop.clear()
+    threading.Thread(target=_resync_loop, name="property-index-resync", daemon=True).start()
+
+
+def stop_property_index():
+    _stop.set()
@@ -1,61 +1,163 @@
 # app/services/property_service.py
+import base64
+import hashlib
+import json
+from datetime import datetime
 from decimal import Decimal
-from functools import reduce
-from operator import or_
+from difflib import SequenceMatcher
+from typing import Optional
 from uuid import UUID
 
-from sqlalchemy import func
+from sqlalchemy import func, select, tuple_
 from sqlalchemy.orm import Session
 from app.models.property import Property
 from app.models.agent import Agent
-from app.schemas.property import PropertyCreate, PropertyUpdate
+from app.schemas.property import PropertyCreate, PropertyUpdate, PublicPropertyOut
 from fastapi import HTTPException, Depends
 from app.database import get_db
+from app.config import Config
 from app.services.gpt_service import GPTService
-from app.utils.description_filters import build_description_filters
-from sqlalchemy.sql.elements import BinaryExpression
+from app.services.rent_estimator import get_rent_estimator
+from app.jobs.estimate_queue import EstimateQueue
+from app.services.search_cache import SearchCache, canonical_filters
+from app.services import property_index
+from app.services.property_index import get_property_index
+from app.utils.description_filters import description_match
+from app.utils.city_names import city_key
+from app.utils.loading import PROPERTY_WITH_AGENT
 
 
-def create_property(db: Session, property_data: PropertyCreate, agent_id: UUID):
-    data = property_data.dict()
+ESTIMATE_FIELDS = ("rental_estimate", "yield_percent")
+
+
+def needs_estimate(property: Property) -> bool:
+    return any(getattr(property, field) is None for field in ESTIMATE_FIELDS)
+
 
-    # אם לא סופק מחיר שכירות או תשואה – נבצע הערכה
-    if not data.get("rental_estimate") or not data.get("yield_percent"):
+def estimate_missing_metrics(property: Property):
+    """Fills rental_estimate / yield_percent that the agent didn't provide (no commit)"""
+    # Local model first - GPT only for cities it has too little data on
+    estimator = get_rent_estimator()
+    estimated = estimator.predict(property.price, property.city, property.rooms, property.floor) if estimator else None
+
+    source = "model"
+    if estimated:
+        print("📐 Estimated values from local model:", estimated)
+    else:
+        source = "gpt"
         gpt = GPTService()
         estimated = gpt.estimate_property_metrics(
-            price=data["price"],
-            city=data["city"],
-            address=data["address"],
-            rooms=data.get("rooms"),
-            floor=data.get("floor"),
-            description=data.get("description"),
+            price=property.price,
+            city=property.city,
+            address=property.address,
+            rooms=property.rooms,
+            floor=property.floor,
+            description=property.description,
         )
 
         print("💬 Estimated values from GPT:", estimated)
 
-        if data.get("rental_estimate") is None and estimated.get("rental_estimate") is not None:
+    missing = [field for field in ESTIMATE_FIELDS if getattr(property, field) is None]
+    filled = []
+    for field in missing:
+        if estimated.get(field) is not None:
             try:
-                data["rental_estimate"] = Decimal(str(estimated["rental_estimate"]))
+                setattr(property, field, Decimal(str(estimated[field])))
+                filled.append(field)
             except Exception as e:
-                print("❌ rental_estimate conversion failed:", e)
+                print(f"❌ {field} conversion failed:", e)
+
+    # A source only when it produced both values - a pair half typed by the agent is left untagged
+    if missing:
+        property.estimate_source = source if filled == list(ESTIMATE_FIELDS) else None
 
-        if data.get("yield_percent") is None and estimated.get("yield_percent") is not None:
-            try:
-                data["yield_percent"] = Decimal(str(estimated["yield_percent"]))
-            except Exception as e:
-                print("❌ yield_percent conversion failed:", e)
-        print("📦 Final property data before save:", data)
+
+def run_estimate(db: Session, property: Property):
+    """
+    Estimates one property and records the outcome on it.
+    Returns the error message, or None on success.
+    """
+    property.estimate_status = "running"
+    property.estimate_attempts = (property.estimate_attempts or 0) + 1
+    db.commit()
+
+    try:
+        estimate_missing_metrics(property)
+        property.estimate_status = "done"
+        property.estimate_error = None
+        error = None
+    except Exception as e:
+        print(f"❌ Estimate failed for {property.id}: {e}")
+        property.estimate_status = "failed"
+        property.estimate_error = str(e)[:500]
+        error = str(e)
+
+    db.commit()
+    db.refresh(property)
+    # rental_estimate / yield_percent are search filters
+    SearchCache.invalidate(property.agent_id, [property.city])
+    property_index.on_property_saved(property)
+    return error
+
+
+def create_property(db: Session, property_data: PropertyCreate, agent_id: UUID):
+    data = property_data.dict()
 
     # יצירת המודל עם השדות
     new_property = Property(**data, agent_id=agent_id)
+
+    # אם לא סופק מחיר שכירות או תשואה – ההערכה תרוץ ברקע
+    if needs_estimate(new_property):
+        new_property.estimate_status = "pending"
+    else:
+        new_property.estimate_source = "agent"
+
     db.add(new_property)
     db.commit()
     db.refresh(new_property)
+    SearchCache.invalidate(new_property.agent_id, [new_property.city])
+    property_index.on_property_saved(new_property)
+
+    if new_property.estimate_status == "pending" and not EstimateQueue.enqueue(new_property.id):
+        # No Redis - estimate inline like before
+        run_estimate(db, new_property)
+
     return new_property
 
 
 def get_properties_for_agent(db: Session, agent: Agent):
-    return db.query(Property).filter_by(agent_id=agent.id).all()
+    return db.query(Property).options(*PROPERTY_WITH_AGENT).filter_by(agent_id=agent.id).all()
+
+
+# Only what PublicPropertyOut returns - no description/image_url, no ORM objects
+PUBLIC_COLUMNS = tuple(getattr(Property, name) for name in PublicPropertyOut.model_fields)
+
+
+def get_public_property_rows(db: Session, updated_since: Optional[datetime] = None) -> list:
+    query = select(*PUBLIC_COLUMNS)
+    if updated_since:
+        query = query.where(Property.updated_at >= updated_since)
+    return [dict(row) for row in db.execute(query).mappings()]
+
+
+def get_public_listing_version(db: Session, updated_since: Optional[datetime] = None) -> tuple:
+    """
+    (row count, last change) - changes whenever the public list does: edits move
+    max(updated_at), deletes change the count. Used for ETag / Last-Modified.
+    """
+    query = select(func.count(Property.id), func.max(Property.updated_at))
+    if updated_since:
+        query = query.where(Property.updated_at >= updated_since)
+    count, last_modified = db.execute(query).one()
+    return count, last_modified
+
+
+def get_public_property_row(db: Session, property_id: str) -> Optional[dict]:
+    """Public columns plus updated_at (for the ETag - the response model drops it)"""
+    row = db.execute(
+        select(*PUBLIC_COLUMNS, Property.updated_at).where(Property.id == property_id)
+    ).mappings().first()
+    return dict(row) if row else None
 
 
 def get_property_by_id_for_agent(property_id: str, db: Session, agent: Agent):
@@ -70,11 +172,21 @@ def update_property(property_id: str, updates: PropertyUpdate, db: Session, agen
     if not property:
         raise HTTPException(status_code=404, detail="Not found or unauthorized")
 
-    for field, value in updates.dict(exclude_unset=True).items():
+    old_city = property.city
+    changes = updates.dict(exclude_unset=True)
+    for field, value in changes.items():
         setattr(property, field, value)
+    # The agent's own numbers replace the estimates only when both are given;
+    # changing one estimated value leaves a mixed pair, which isn't tagged
+    if all(changes.get(field) is not None for field in ESTIMATE_FIELDS):
+        property.estimate_source = "agent"
+    elif any(field in changes for field in ESTIMATE_FIELDS) and property.estimate_source != "agent":
+        property.estimate_source = None
 
     db.commit()
     db.refresh(property)
+    SearchCache.invalidate(property.agent_id, [old_city, property.city])
+    property_index.on_property_saved(property)
     return property
 
 
@@ -85,18 +197,33 @@ def delete_property(property_id: str, db: Session, agent: Agent):
 
     db.delete(property)
     db.commit()
+    SearchCache.invalidate(property.agent_id, [property.city])
+    property_index.on_property_deleted(property.id)
 
 
-def search_properties_by_criteria(criteria: dict, db: Session = Depends(get_db)):
+def _search_query(criteria: dict, db: Session, fuzzy: bool = False):
+    """
+    Filtered query plus its sort keys (all descending): relevance first when there is one,
+    then newest first, with id as the tie-breaker so keyset pagination is stable.
+    """
     query = db.query(Property)
+    keys = []
 
     if criteria.get("agent_id"):
         query = query.filter(Property.agent_id == str(criteria["agent_id"]))
     if criteria.get("city"):
-        query = query.filter(Property.city.ilike(f"%{criteria['city'].lower().strip()}%"))
+        if fuzzy:
+            # city %> 'tel aviv' - word similarity, served by the trigram index
+            query = query.filter(Property.city.op("%>")(criteria["city"].strip()))
+        else:
+            query = query.filter(Property.city_canonical == city_key(criteria["city"]))
     if criteria.get("address"):
         address = criteria["address"].strip().lower()
-        query = query.filter(func.lower(Property.address).ilike(f"%{address}%"))
+        if fuzzy:
+            query = query.filter(Property.address.op("%>")(address))
+            keys.append(func.word_similarity(address, Property.address))
+        else:
+            query = query.filter(Property.address.ilike(f"%{address}%"))
     if criteria.get("min_price"):
         query = query.filter(Property.price >= criteria["min_price"])
     if criteria.get("max_price"):
@@ -116,23 +243,212 @@ def search_properties_by_criteria(criteria: dict, db: Session = Depends(get_db))
     if criteria.get("yield_percent") is not None:
         query = query.filter(Property.yield_percent >= criteria["yield_percent"])
 
-    # 💡 חדש: תיאור חכם עם נרדפות
-    desc_conditions = build_description_filters(criteria.get("description_filters", []))
-    desc_conditions = [cond for cond in desc_conditions if isinstance(cond, BinaryExpression)]
+    # 💡 תיאור חכם עם נרדפות - full-text ב-Postgres, ILIKE בשאר
+    description_filters = criteria.get("description_filters") or []
+    match = description_match(description_filters, db.get_bind().dialect.name)
+    if match is not None:
+        print("✅ Description filters:", description_filters)
+        condition, rank = match
+        query = query.filter(condition)
+        keys.insert(0, rank)
+
+    keys += [Property.created_at, Property.id]
+    return query.order_by(*[key.desc() for key in keys]), keys
+
+
+def build_search_query(criteria: dict, db: Session, fuzzy: bool = False):
+    """
+    Query for the given criteria, best matches first.
+    fuzzy=True (Postgres only) matches city/address by trigram similarity instead of exactly.
+    """
+    return _search_query(criteria, db, fuzzy)[0]
 
-    print("✅ Safe description conditions:", desc_conditions)
 
-    if desc_conditions:
-        or_expression = reduce(lambda a, b: or_(a, b), desc_conditions)
-        query = query.filter(or_expression)
-    return query.all()
+def search_fingerprint(criteria: dict) -> str:
+    """Short hash of the normalized criteria - a cursor only continues the search it came from"""
+    data = json.dumps(canonical_filters(criteria), sort_keys=True, ensure_ascii=False)
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def encode_cursor(values: list, criteria: dict, fuzzy: bool = False, total: int = None) -> str:
+    values = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    data = json.dumps({"k": values, "s": search_fingerprint(criteria), "f": fuzzy, "t": total},
+                      separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, criteria: dict) -> dict:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        values = data["k"]
+        if values[-2] is not None:
+            values[-2] = datetime.fromisoformat(values[-2])  # created_at
+        search = data.get("s")
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # Sort keys alone would fit another search's cursor and page it wrongly, with its total
+    if search != search_fingerprint(criteria):
+        raise HTTPException(status_code=400, detail="Cursor doesn't match this search")
+    return {"values": values, "fuzzy": bool(data.get("f")), "total": data.get("t")}
+
+
+def _page(criteria: dict, db: Session, limit: Optional[int], after: list = None, fuzzy: bool = False) -> list:
+    """Up to limit+1 (property, sort key values) rows after the given key values (limit=None - all)"""
+    query, keys = _search_query(criteria, db, fuzzy)
+    if after is not None:
+        if len(after) != len(keys):
+            raise HTTPException(status_code=400, detail="Cursor doesn't match this search")
+        query = query.filter(tuple_(*keys) < tuple_(*after))
+
+    query = query.options(*PROPERTY_WITH_AGENT).add_columns(*[key.label(f"sort_key_{i}") for i, key in enumerate(keys)])
+    if limit is not None:
+        query = query.limit(limit + 1)
+    return [(row[0], list(row[1:])) for row in query]
+
+
+def _fuzzy_page(criteria: dict, db: Session, limit: Optional[int], after: list = None) -> list:
+    threshold = Config.FUZZY_MATCH_THRESHOLD
+
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(select(func.set_config("pg_trgm.word_similarity_threshold", str(threshold), True)))
+        return _page(criteria, db, limit, after, fuzzy=True)
+
+    # No pg_trgm - filter the other criteria in SQL and compare names in Python
+    rest = {k: v for k, v in criteria.items() if k not in ("city", "address")}
+    query, keys = _search_query(rest, db)
+    if after is not None:
+        query = query.filter(tuple_(*keys) < tuple_(*after))
+    query = query.options(*PROPERTY_WITH_AGENT).add_columns(*[key.label(f"sort_key_{i}") for i, key in enumerate(keys)])
+
+    matches = []
+    for row in query.yield_per(200):
+        prop = row[0]
+        if criteria.get("city") and word_similarity(criteria["city"], prop.city) < threshold:
+            continue
+        if criteria.get("address") and word_similarity(criteria["address"], prop.address) < threshold:
+            continue
+        matches.append((prop, list(row[1:])))
+        if limit is not None and len(matches) > limit:
+            break
+    return matches
+
+
+def _fuzzy_eligible(criteria: dict) -> bool:
+    return Config.FUZZY_MATCH_ENABLED and bool(criteria.get("city") or criteria.get("address"))
+
+
+def hydrate(db: Session, ids: list, chunk: int = 1000) -> list:
+    """Loads properties by id, in the given order (ids deleted meanwhile are skipped)"""
+    by_id = {}
+    for start in range(0, len(ids), chunk):
+        batch = db.query(Property).options(*PROPERTY_WITH_AGENT).filter(Property.id.in_(ids[start:start + chunk]))
+        by_id.update((p.id, p) for p in batch)
+    return [by_id[i] for i in ids if i in by_id]
+
+
+def _indexed_page(criteria: dict, db: Session, limit: int, state: Optional[dict]) -> Optional[dict]:
+    """
+    search_properties_page from the in-memory index, or None to use SQL
+    (index off, text criteria, nothing found but fuzzy matching may help, or the cursor row is gone).
+    Cursors are the same as the SQL path's, so paging can move between the two.
+    """
+    index = get_property_index()
+    ids = index.search(criteria) if index else None
+    if ids is None or (not ids and not state and _fuzzy_eligible(criteria)):
+        return None
+
+    start = 0
+    if state:
+        try:
+            start = ids.index(state["values"][-1]) + 1
+        except ValueError:
+            return None
+
+    items = hydrate(db, ids[start:start + limit])
+    total = state["total"] if state else len(ids)
+    more = start + limit < len(ids)
+    next_cursor = None
+    if more and items:
+        next_cursor = encode_cursor([items[-1].created_at, items[-1].id], criteria, False, total)
+    return {"items": items, "next_cursor": next_cursor, "total": total, "fuzzy": False}
+
+
+def _count(criteria: dict, db: Session, fuzzy: bool = False) -> int:
+    query = _search_query(criteria, db, fuzzy)[0].order_by(None)
+    return query.with_entities(func.count(Property.id)).scalar()
+
+
+def search_properties_page(criteria: dict, db: Session, limit: int = None, cursor: str = None) -> dict:
+    """
+    One page of search results, ordered by relevance then newest first.
+
+    Returns:
+        {"items": [...], "next_cursor": str or None, "total": int or None, "fuzzy": bool}
+        total is counted on the first page and carried in the cursor.
+    """
+    limit = min(limit or Config.SEARCH_PAGE_SIZE, Config.SEARCH_MAX_PAGE_SIZE)
+    state = decode_cursor(cursor, criteria) if cursor else None
+
+    if not (state and state["fuzzy"]):
+        page = _indexed_page(criteria, db, limit, state)
+        if page is not None:
+            return page
+
+    if state:
+        after, fuzzy, total = state["values"], state["fuzzy"], state["total"]
+        rows = _fuzzy_page(criteria, db, limit, after) if fuzzy else _page(criteria, db, limit, after)
+    else:
+        fuzzy = False
+        rows = _page(criteria, db, limit)
+        # Nothing under the exact city/address - try spelling variants
+        if not rows and _fuzzy_eligible(criteria):
+            fuzzy = True
+            rows = _fuzzy_page(criteria, db, limit)
+            if rows:
+                print("🔎 Fuzzy match found properties")
+
+        if len(rows) <= limit:
+            total = len(rows)  # everything fits on this page - no need to count
+        elif fuzzy and db.get_bind().dialect.name != "postgresql":
+            total = None  # Python-side matching can't be counted in SQL
+        else:
+            total = _count(criteria, db, fuzzy)
+
+    next_cursor = encode_cursor(rows[limit - 1][1], criteria, fuzzy, total) if len(rows) > limit else None
+    return {"items": [prop for prop, _ in rows[:limit]], "next_cursor": next_cursor, "total": total, "fuzzy": fuzzy}
+
+
+def word_similarity(needle: str, text: str) -> float:
+    """Best match of needle against any run of words in text, 0..1 (like pg_trgm word_similarity)"""
+    needle_words = " ".join(needle.casefold().replace("-", " ").split())
+    words = (text or "").casefold().replace("-", " ").split()
+    size = max(len(needle_words.split()), 1)
+    windows = [" ".join(words[i:i + size]) for i in range(max(len(words) - size + 1, 1))]
+    return max(SequenceMatcher(None, needle_words, window).ratio() for window in windows)
+
+
+def search_properties_by_criteria(criteria: dict, db: Session = Depends(get_db)):
+    """All matches (no paging) - see search_properties_page for chat results"""
+    index = get_property_index()
+    ids = index.search(criteria) if index else None
+    if ids is not None:
+        results = hydrate(db, ids)
+    else:
+        results = build_search_query(criteria, db).options(*PROPERTY_WITH_AGENT).all()
+
+    if not results and _fuzzy_eligible(criteria):
+        results = [prop for prop, _ in _fuzzy_page(criteria, db, limit=None)]
+    return results
 
 
 def delete_all_properties_for_agent(db: Session, agent_id: UUID) -> int:
+    cities = [city for city, in db.query(Property.city).filter(Property.agent_id == agent_id).distinct()]
     deleted_count = (
         db.query(Property)
             .filter(Property.agent_id == agent_id)
             .delete(synchronize_session=False)
     )
     db.commit()
+    SearchCache.invalidate(str(agent_id), cities)
+    property_index.on_agent_deleted(agent_id)
     return deleted_count
@@ -0,0 +1,176 @@
+# app/services/rent_estimator.py
+import json
+import os
+import threading
+from typing import Iterable, Optional
+
+import numpy as np
+
+from app.config import Config
+from app.utils.city_names import city_key
+
+TARGETS = ("rental_estimate", "yield_percent")
+RIDGE = 1e-3  # keeps the fit stable when e.g. every listing in a city has the same floor
+
+
+def _design(price, rooms, floor, rooms_default, floor_default) -> np.ndarray:
+    """[1, log(price), rooms, floor] per row, missing rooms/floor replaced by the city median"""
+    price = np.asarray(price, dtype=np.float64)
+    rooms = np.asarray(rooms, dtype=np.float64)
+    floor = np.asarray(floor, dtype=np.float64)
+    rooms = np.where(np.isnan(rooms), rooms_default, rooms)
+    floor = np.where(np.isnan(floor), floor_default, floor)
+    return np.column_stack([np.ones_like(price), np.log(price), rooms, floor])
+
+
+class RentEstimator:
+    """
+    Per-city log-linear regression of monthly rent and yield on price, rooms and floor.
+    Trained from the properties table; cities with fewer than min_rows listings are left
+    out, so the caller falls back to GPT for them.
+    """
+
+    def __init__(self, min_rows: int = None):
+        self.min_rows = min_rows or Config.RENT_MODEL_MIN_ROWS
+        self.cities = {}  # city key -> row in the arrays below
+        self.coefficients = np.zeros((0, 4, len(TARGETS)))
+        self.defaults = np.zeros((0, 2))  # median rooms, median floor
+        self.row_counts = np.zeros(0, dtype=np.int64)
+
+    def __contains__(self, city: str) -> bool:
+        return city_key(city) in self.cities
+
+    def fit(self, rows: Iterable[dict]) -> "RentEstimator":
+        """
+        Args:
+            rows: dicts with city, price, rooms, floor, rental_estimate, yield_percent
+        """
+        by_city = {}
+        for row in rows:
+            try:
+                price = float(row["price"])
+                rent = float(row["rental_estimate"])
+                yield_percent = float(row["yield_percent"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if price <= 0 or rent <= 0 or yield_percent <= 0:
+                continue
+            by_city.setdefault(city_key(row.get("city")), []).append((
+                price,
+                np.nan if row.get("rooms") is None else float(row["rooms"]),
+                np.nan if row.get("floor") is None else float(row["floor"]),
+                rent,
+                yield_percent,
+            ))
+
+        cities, coefficients, defaults, counts = {}, [], [], []
+        for city, city_rows in sorted(by_city.items()):
+            if not city or len(city_rows) < self.min_rows:
+                continue
+
+            data = np.array(city_rows)
+            rooms_default = np.nanmedian(data[:, 1]) if not np.isnan(data[:, 1]).all() else 0.0
+            floor_default = np.nanmedian(data[:, 2]) if not np.isnan(data[:, 2]).all() else 0.0
+
+            X = _design(data[:, 0], data[:, 1], data[:, 2], rooms_default, floor_default)
+            Y = np.log(data[:, 3:5])
+
+            # Ridge normal equations - both targets solved in one call
+            penalty = RIDGE * len(X) * np.eye(X.shape[1])
+            penalty[0, 0] = 0  # don't shrink the intercept
+            beta = np.linalg.solve(X.T @ X + penalty, X.T @ Y)
+
+            cities[city] = len(coefficients)
+            coefficients.append(beta)
+            defaults.append((rooms_default, floor_default))
+            counts.append(len(city_rows))
+
+        self.cities = cities
+        self.coefficients = np.array(coefficients).reshape(-1, 4, len(TARGETS))
+        self.defaults = np.array(defaults, dtype=np.float64).reshape(-1, 2)
+        self.row_counts = np.array(counts, dtype=np.int64)
+        return self
+
+    def predict(self, price, city, rooms=None, floor=None) -> Optional[dict]:
+        """
+        Returns:
+            {"rental_estimate", "yield_percent"} or None if the city has too little data
+        """
+        slot = self.cities.get(city_key(city))
+        if slot is None or not price or float(price) <= 0:
+            return None
+
+        rooms_default, floor_default = self.defaults[slot]
+        x = np.array([
+            1.0,
+            np.log(float(price)),
+            rooms_default if rooms is None else float(rooms),
+            floor_default if floor is None else float(floor),
+        ])
+        rent, yield_percent = np.exp(x @ self.coefficients[slot])
+        return {"rental_estimate": round(float(rent)), "yield_percent": round(float(yield_percent), 2)}
+
+    def to_dict(self) -> dict:
+        return {
+            "min_rows": self.min_rows,
+            "cities": {
+                city: {
+                    "coefficients": self.coefficients[slot].tolist(),
+                    "defaults": self.defaults[slot].tolist(),
+                    "rows": int(self.row_counts[slot]),
+                }
+                for city, slot in self.cities.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RentEstimator":
+        estimator = cls(min_rows=data.get("min_rows"))
+        cities = data.get("cities", {})
+        estimator.cities = {city: slot for slot, city in enumerate(cities)}
+        estimator.coefficients = np.array([c["coefficients"] for c in cities.values()]).reshape(-1, 4, len(TARGETS))
+        estimator.defaults = np.array([c["defaults"] for c in cities.values()], dtype=np.float64).reshape(-1, 2)
+        estimator.row_counts = np.array([c["rows"] for c in cities.values()], dtype=np.int64)
+        return estimator
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "RentEstimator":
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+_lock = threading.Lock()
+_estimator: Optional[RentEstimator] = None
+_loaded_mtime: Optional[float] = None
+
+
+def get_rent_estimator() -> Optional[RentEstimator]:
+    """
+    Trained model from RENT_MODEL_PATH, reloaded when the file changes
+    (None if disabled or not trained yet).
+    """
+    global _estimator, _loaded_mtime
+
+    if not Config.RENT_MODEL_ENABLED:
+        return None
+
+    try:
+        mtime = os.path.getmtime(Config.RENT_MODEL_PATH)
+    except OSError:
+        return None
+
+    if mtime != _loaded_mtime:
+        with _lock:
+            if mtime != _loaded_mtime:
+                try:
+                    _estimator = RentEstimator.load(Config.RENT_MODEL_PATH)
+                    print(f"✅ Rent model loaded ({len(_estimator.cities)} cities)")
+                except Exception as e:
+                    print(f"⚠️ Rent model load error: {e}")
+                    _estimator = None
+                _loaded_mtime = mtime
+    return _estimator
@@ -0,0 +1,216 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import Config
+from app.models.property import Property
+from app.utils.city_names import city_key
+from app.utils.loading import PROPERTY_WITH_AGENT
+from app.utils.redis_client import get_redis_client
+
+GLOBAL_GENERATION = "search_gen:global"
+
+
+def _canonical_value(value):
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        return " ".join(value.casefold().split())
+    if isinstance(value, (list, tuple, set)):
+        return sorted({_canonical_value(v) for v in value}, key=str)
+    return value
+
+
+def canonical_filters(filters: dict) -> dict:
+    """Same search -> same dict: empty values dropped, city canonical, numbers as floats"""
+    canonical = {}
+    for key, value in filters.items():
+        if value is None or value == [] or value == "":
+            continue
+        canonical[key] = city_key(value) if key == "city" else _canonical_value(value)
+    return canonical
+
+
+def _dependencies(filters: dict) -> list:
+    """
+    Generation counters a cached page depends on. The narrowest one is enough: every write
+    bumps its agent, its cities and the global counter. The global counter is always read
+    as well - fuzzy pages match cities other than the one asked for, so they depend on it.
+    """
+    if filters.get("agent_id"):
+        return [f"search_gen:agent:{filters['agent_id']}", GLOBAL_GENERATION]
+    if filters.get("city"):
+        return [f"search_gen:city:{city_key(filters['city'])}", GLOBAL_GENERATION]
+    return [GLOBAL_GENERATION]
+
+
+class SearchCache:
+    """
+    Caches search result pages (property ids) by a hash of the normalized filters.
+    Redis is the source of truth; a small in-process LRU saves the payload round-trip.
+    Entries remember the generation counters they were built under and are ignored
+    once any of them moves - writes never have to find and delete entries.
+    """
+
+    _lock = threading.Lock()
+    _lru = OrderedDict()  # key -> entry
+
+    @staticmethod
+    def _key(filters: dict, limit: Optional[int], cursor: Optional[str]) -> str:
+        data = json.dumps([canonical_filters(filters), limit, cursor], sort_keys=True, ensure_ascii=False)
+        return "search:" + hashlib.blake2b(data.encode("utf-8"), digest_size=16).hexdigest()
+
+    @staticmethod
+    def _lru_get(key: str) -> Optional[dict]:
+        with SearchCache._lock:
+            entry = SearchCache._lru.get(key)
+            if entry is not None:
+                SearchCache._lru.move_to_end(key)
+            return entry
+
+    @staticmethod
+    def _lru_put(key: str, entry: dict):
+        with SearchCache._lock:
+            SearchCache._lru[key] = entry
+            SearchCache._lru.move_to_end(key)
+            while len(SearchCache._lru) > Config.SEARCH_CACHE_LRU_SIZE:
+                SearchCache._lru.popitem(last=False)
+
+    @staticmethod
+    def lookup(filters: dict, limit: Optional[int], cursor: Optional[str], db: Session) -> Tuple[Optional[dict], Optional[dict]]:
+        """
+        Returns:
+            (page or None, token) - pass the token to store() after a miss.
+            The generations are read here, before the search runs, so a write that
+            lands during the search makes the stored page stale instead of wrong.
+        """
+        client = get_redis_client()
+        if not client or not Config.SEARCH_CACHE_ENABLED:
+            return None, None
+
+        try:
+            key = SearchCache._key(filters, limit, cursor)
+            dependencies = _dependencies(filters)
+            entry = SearchCache._lru_get(key)
+
+            pipe = client.pipeline()
+            for name in dependencies:
+                # Missing counter (never bumped or evicted) - start from a value never used before
+                pipe.set(name, time.time_ns(), nx=True)
+            pipe.mget(dependencies)
+            if entry is None:
+                pipe.get(key)
+            replies = pipe.execute()
+
+            generations = dict(zip(dependencies, replies[len(dependencies)]))
+            token = {"key": key, "generations": generations}
+
+            if entry is None and replies[-1]:
+                entry = json.loads(replies[-1])
+                SearchCache._lru_put(key, entry)
+
+            stale = entry is None or any(generations.get(k) != v for k, v in entry["generations"].items())
+            if stale:
+                client.hincrby("search_cache_stats", "misses", 1)
+                return None, token
+
+            page = SearchCache._load(entry, db)
+            if page is None:
+                client.hincrby("search_cache_stats", "misses", 1)
+                return None, token
+
+            client.hincrby("search_cache_stats", "hits", 1)
+            print(f"✅ Search cache HIT ({len(page['items'])} properties)")
+            return page, token
+
+        except Exception as e:
+            print(f"⚠️ Search cache read error: {e}")
+            return None, None
+
+    @staticmethod
+    def _load(entry: dict, db: Session) -> Optional[dict]:
+        ids = entry["ids"]
+        query = db.query(Property).options(*PROPERTY_WITH_AGENT).filter(Property.id.in_(ids))
+        by_id = {p.id: p for p in query} if ids else {}
+        if len(by_id) != len(ids):
+            return None  # deleted behind our back (e.g. agent cascade) - rebuild
+        return {
+            "items": [by_id[i] for i in ids],
+            "next_cursor": entry["next_cursor"],
+            "total": entry["total"],
+            "fuzzy": entry.get("fuzzy", False),
+        }
+
+    @staticmethod
+    def store(token: Optional[dict], page: dict) -> bool:
+        client = get_redis_client()
+        if not client or not token:
+            return False
+
+        try:
+            generations = token["generations"]
+            if not page.get("fuzzy"):
+                # Exact matches only change with the narrowest counter
+                generations = dict(list(generations.items())[:1])
+            entry = {
+                "ids": [p.id for p in page["items"]],
+                "next_cursor": page["next_cursor"],
+                "total": page["total"],
+                "fuzzy": page.get("fuzzy", False),
+                "generations": generations,
+            }
+            client.setex(token["key"], Config.SEARCH_CACHE_TTL_SECONDS, json.dumps(entry))
+            SearchCache._lru_put(token["key"], entry)
+            return True
+        except Exception as e:
+            print(f"⚠️ Search cache write error: {e}")
+            return False
+
+    @staticmethod
+    def invalidate(agent_id: Optional[str], cities: Iterable[Optional[str]] = ()):
+        """Called after a property write commits - moves every counter the write could affect"""
+        client = get_redis_client()
+        if not client:
+            return
+
+        try:
+            pipe = client.pipeline()
+            pipe.incr(GLOBAL_GENERATION)
+            if agent_id:
+                pipe.incr(f"search_gen:agent:{agent_id}")
+            for city in {city_key(c) for c in cities if c}:
+                pipe.incr(f"search_gen:city:{city}")
+            pipe.execute()
+        except Exception as e:
+            print(f"⚠️ Search cache invalidation error: {e}")
+
+    @staticmethod
+    def clear_local():
+        with SearchCache._lock:
+            SearchCache._lru.clear()
+
+    @staticmethod
+    def get_stats() -> dict:
+        client = get_redis_client()
+        if not client:
+            return {"status": "unavailable"}
+
+        try:
+            stats = client.hgetall("search_cache_stats")
+            hits = int(stats.get("hits", 0))
+            misses = int(stats.get("misses", 0))
+            return {
+                "status": "connected",
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+                "local_entries": len(SearchCache._lru),
+            }
+        except Exception as e:
+            return {"status": "error", "error": str(e)}
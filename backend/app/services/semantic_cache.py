@@ -0,0 +1,153 @@
+import re
+import threading
+import zlib
+from typing import Optional, Tuple
+
+import numpy as np
+
+from app.config import Config
+from app.services.criteria_parser import NEGATION_WORDS, canonical_terms
+from app.utils.text_normalization import normalize_question
+
+# מילים שהופכות את משמעות המספר - שתי שאלות חייבות להסכים עליהן
+BOUND_WORDS = {
+    "up", "under", "below", "less", "max", "maximum", "until", "above", "over", "from", "least",
+    "more", "min", "minimum", "עד", "מעל", "מתחת", "פחות", "יותר", "לפחות", "החל", "מינימום", "מקסימום",
+}
+# Tokens from canonical_terms that are search criteria on their own (city_haifa, filter_garden)
+STRUCTURED_PREFIXES = ("city_", "type_", "filter_")
+
+
+def _signature(terms: list) -> tuple:
+    """
+    Terms that must match exactly: numbers, bound words, city/type/filter tokens and
+    negations - one extra amenity barely moves the vector but changes the results.
+    A negation is kept with the term after it, so "without balcony, with parking"
+    and "with balcony, without parking" differ.
+    """
+    signature = []
+    for i, term in enumerate(terms):
+        if re.fullmatch(NEGATION_WORDS, term):
+            following = terms[i + 1] if i + 1 < len(terms) else ""
+            signature.append(f"not:{following}")
+        elif re.search(r"\d", term) or term in BOUND_WORDS or term.startswith(STRUCTURED_PREFIXES):
+            signature.append(term)
+    return tuple(sorted(signature))
+
+
+def embed_question(question: str, dim: int) -> Tuple[np.ndarray, tuple]:
+    """
+    Hashed n-gram embedding of a question.
+
+    Returns:
+        (unit vector, signature) - the signature holds the numbers, bound words,
+        criteria tokens and negations, which must match exactly for a neighbour to be reused.
+    """
+    terms = canonical_terms(normalize_question(question))
+    vector = np.zeros(dim, dtype=np.float32)
+
+    features = []
+    for term in terms:
+        features.append((f"w:{term}", 2.0))
+        if "_" not in term and not term.isdigit():
+            padded = f" {term} "
+            features.extend((f"c:{padded[i:i + 3]}", 1.0) for i in range(len(padded) - 2))
+
+    for feature, weight in features:
+        h = zlib.crc32(feature.encode("utf-8"))
+        vector[h % dim] += weight if h & 0x80000000 else -weight
+
+    norm = np.linalg.norm(vector)
+    if norm:
+        vector /= norm
+
+    return vector, _signature(terms)
+
+
+class SemanticIndex:
+    """
+    In-process nearest-neighbour index over cached questions.
+    Holds only vectors and cache-key hashes - the criteria themselves stay in Redis.
+    """
+
+    def __init__(self, capacity: int, dim: int):
+        self.capacity = capacity
+        self.dim = dim
+        self._lock = threading.Lock()
+        self._vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self._timestamps = np.full(capacity, np.inf)
+        self._keys = [None] * capacity
+        self._signatures = [None] * capacity
+        self._slots = {}  # key hash -> row
+
+    def __len__(self):
+        return len(self._slots)
+
+    def add(self, key_hash: str, question: str, timestamp: float):
+        vector, signature = embed_question(question, self.dim)
+        with self._lock:
+            slot = self._slots.get(key_hash)
+            if slot is None:
+                if len(self._slots) < self.capacity:
+                    slot = self._keys.index(None)
+                else:
+                    # Same policy as CacheService._cleanup_old_entries - oldest goes first
+                    slot = int(np.argmin(self._timestamps))
+                    del self._slots[self._keys[slot]]
+                self._slots[key_hash] = slot
+
+            self._vectors[slot] = vector
+            self._timestamps[slot] = timestamp
+            self._keys[slot] = key_hash
+            self._signatures[slot] = signature
+
+    def remove(self, key_hashes):
+        with self._lock:
+            for key_hash in key_hashes:
+                slot = self._slots.pop(key_hash, None)
+                if slot is None:
+                    continue
+                self._vectors[slot] = 0
+                self._timestamps[slot] = np.inf
+                self._keys[slot] = None
+                self._signatures[slot] = None
+
+    def clear(self):
+        with self._lock:
+            self._vectors[:] = 0
+            self._timestamps[:] = np.inf
+            self._keys = [None] * self.capacity
+            self._signatures = [None] * self.capacity
+            self._slots.clear()
+
+    def nearest(self, question: str, threshold: float) -> Optional[Tuple[str, float]]:
+        """Returns (key hash, similarity) of the closest cached question above threshold"""
+        if not self._slots:
+            return None
+
+        vector, signature = embed_question(question, self.dim)
+        with self._lock:
+            # Only filled rows whose criteria could match - the best of those is the only candidate
+            rows = [slot for slot in self._slots.values() if self._signatures[slot] == signature]
+            if not rows:
+                return None
+            scores = self._vectors[rows] @ vector
+            best = int(np.argmax(scores))
+            score = float(scores[best])
+            if score < threshold:
+                return None
+            return self._keys[rows[best]], score
+
+
+_index: Optional[SemanticIndex] = None
+
+
+def get_semantic_index() -> Optional[SemanticIndex]:
+    """Process-wide index, sized to MAX_CACHED_CRITERIA (None when disabled)"""
+    global _index
+
+    if not Config.SEMANTIC_CACHE_ENABLED:
+        return None
+    if _index is None:
+        _index = SemanticIndex(Config.MAX_CACHED_CRITERIA, Config.SEMANTIC_CACHE_DIM)
+    return _index
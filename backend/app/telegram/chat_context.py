@@ -1,4 +1,11 @@
 # app/telegram/chat_context.py
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from app.config import Config
+from app.utils.redis_client import get_redis_client
 
 chat_to_agent = {}  # chat_id (int) -> agent_id (UUID str)
 
@@ -9,3 +16,57 @@ def set_agent_for_chat(chat_id: int, agent_id: str):
 
 def get_agent_for_chat(chat_id: int) -> str | None:
     return chat_to_agent.get(chat_id)
+
+
+# "show more" state: (question, next_cursor) per chat, in Redis so the button works on any worker,
+# expiring after TELEGRAM_SEARCH_TTL_SECONDS. Without Redis - a bounded in-process LRU.
+_search_lock = threading.Lock()
+_local_searches = OrderedDict()  # chat_id -> (question, cursor, expires_at)
+
+
+def _search_key(chat_id: int) -> str:
+    return f"telegram:search:{chat_id}"
+
+
+def _set_search_locally(chat_id: int, entry: tuple | None):
+    with _search_lock:
+        _local_searches.pop(chat_id, None)
+        if entry:
+            _local_searches[chat_id] = entry
+            while len(_local_searches) > Config.TELEGRAM_SEARCH_LRU_SIZE:
+                _local_searches.popitem(last=False)
+
+
+def set_search_for_chat(chat_id: int, question: str, cursor: str | None):
+    client = get_redis_client()
+    if client:
+        try:
+            if cursor:
+                client.setex(_search_key(chat_id), Config.TELEGRAM_SEARCH_TTL_SECONDS, json.dumps([question, cursor]))
+            else:
+                client.delete(_search_key(chat_id))
+            return
+        except Exception as e:
+            print(f"⚠️ Chat search save error: {e}")
+
+    entry = (question, cursor, time.time() + Config.TELEGRAM_SEARCH_TTL_SECONDS) if cursor else None
+    _set_search_locally(chat_id, entry)
+
+
+def get_search_for_chat(chat_id: int) -> tuple | None:
+    """(question, cursor) of the chat's last search with more pages, or None"""
+    client = get_redis_client()
+    if client:
+        try:
+            data = client.get(_search_key(chat_id))
+            return tuple(json.loads(data)) if data else None
+        except Exception as e:
+            print(f"⚠️ Chat search read error: {e}")
+
+    with _search_lock:
+        entry = _local_searches.get(chat_id)
+        if not entry or entry[2] < time.time():
+            _local_searches.pop(chat_id, None)
+            return None
+        _local_searches.move_to_end(chat_id)
+        return entry[0], entry[1]
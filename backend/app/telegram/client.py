@@ -0,0 +1,125 @@
+# app/telegram/client.py
+import os
+from typing import Optional, Union
+
+import httpx
+
+from app.config import Config
+from app.telegram.rate_limit import RateLimiter
+
+TELEGRAM_API = "https://api.telegram.org"
+
+ChatId = Union[int, str]
+
+
+class TelegramClient:
+    """
+    Bot API calls over one pooled httpx client - connections to api.telegram.org
+    are kept alive between updates instead of a new TLS handshake per update.
+    Every call waits for the rate limiter, and a 429 is retried after Telegram's retry_after.
+    """
+
+    def __init__(self, token: Optional[str] = None, http: Optional[httpx.AsyncClient] = None,
+                 limiter: Optional[RateLimiter] = None):
+        self.token = token or os.getenv("TELEGRAM_TOKEN")
+        self._http = http
+        self.limiter = limiter or RateLimiter()
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                base_url=TELEGRAM_API,
+                timeout=httpx.Timeout(Config.TELEGRAM_TIMEOUT_SECONDS, connect=5.0),
+                limits=httpx.Limits(
+                    max_connections=Config.TELEGRAM_MAX_CONNECTIONS,
+                    max_keepalive_connections=Config.TELEGRAM_MAX_CONNECTIONS,
+                    keepalive_expiry=60,
+                ),
+            )
+        return self._http
+
+    async def call(self, method: str, payload: dict) -> dict:
+        """
+        Returns:
+            Telegram's JSON reply ({"ok": ..., "result": ...}); failures are logged, not raised,
+            so one bad message doesn't stop the rest of a reply.
+        """
+        chat_id = payload.get("chat_id")
+        for attempt in range(Config.TELEGRAM_MAX_RETRIES + 1):
+            await self.limiter.acquire(chat_id)
+            try:
+                response = await self.http.post(f"/bot{self.token}/{method}", json=payload)
+                data = response.json()
+            except Exception as e:
+                print(f"❌ Telegram {method} failed: {e}")
+                return {"ok": False, "description": str(e)}
+
+            retry_after = (data.get("parameters") or {}).get("retry_after")
+            if data.get("error_code") != 429 or retry_after is None:
+                break
+            # Pauses the chat's bucket - the retry (and anything else for that chat) waits it out
+            self.limiter.throttled(chat_id, retry_after)
+            if attempt == Config.TELEGRAM_MAX_RETRIES or retry_after > Config.TELEGRAM_MAX_RETRY_AFTER:
+                break
+            print(f"⏳ Telegram {method} throttled - retrying in {retry_after}s")
+
+        if not data.get("ok"):
+            print(f"⚠️ Telegram {method} error: {data.get('description')}")
+        return data
+
+    async def send_message(self, chat_id: ChatId, text: str, reply_markup: Optional[dict] = None,
+                           parse_mode: Optional[str] = None) -> dict:
+        payload = {"chat_id": chat_id, "text": text}
+        if reply_markup is not None:
+            payload["reply_markup"] = reply_markup
+        if parse_mode:
+            payload["parse_mode"] = parse_mode
+        return await self.call("sendMessage", payload)
+
+    async def send_photo(self, chat_id: ChatId, photo: str, caption: Optional[str] = None) -> dict:
+        payload = {"chat_id": chat_id, "photo": photo}
+        if caption:
+            payload["caption"] = caption
+        return await self.call("sendPhoto", payload)
+
+    async def send_media_group(self, chat_id: ChatId, media: list) -> dict:
+        """media: InputMediaPhoto dicts ({"type": "photo", "media": url, "caption": ...}), 2-10 of them"""
+        return await self.call("sendMediaGroup", {"chat_id": chat_id, "media": media})
+
+    async def edit_message_reply_markup(self, chat_id: ChatId, message_id: int,
+                                        reply_markup: Optional[dict] = None) -> dict:
+        return await self.call("editMessageReplyMarkup", {
+            "chat_id": chat_id,
+            "message_id": message_id,
+            "reply_markup": reply_markup or {"inline_keyboard": []},
+        })
+
+    async def answer_callback_query(self, callback_query_id: str, text: Optional[str] = None) -> dict:
+        payload = {"callback_query_id": callback_query_id}
+        if text:
+            payload["text"] = text
+        return await self.call("answerCallbackQuery", payload)
+
+    async def aclose(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+
+_client: Optional[TelegramClient] = None
+
+
+def get_telegram_client() -> TelegramClient:
+    global _client
+    if _client is None:
+        _client = TelegramClient()
+    return _client
+
+
+async def close_telegram_client():
+    """Close pooled connections (called on shutdown)"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,71 @@
+# app/telegram/dedup.py
+import threading
+from collections import OrderedDict
+
+from app.config import Config
+from app.utils.redis_client import get_redis_client
+
+
+class UpdateDeduplicator:
+    """
+    Remembers which update_ids were already accepted, so Telegram retries and the same
+    update reaching several workers are handled once. Redis (SET NX EX) is shared by
+    all workers; the bounded in-process LRU answers repeats locally and is the only
+    record when Redis is down.
+    """
+
+    def __init__(self, lru_size: int = None, ttl_seconds: int = None):
+        self.lru_size = lru_size or Config.TELEGRAM_DEDUP_LRU_SIZE
+        self.ttl_seconds = ttl_seconds or Config.TELEGRAM_DEDUP_TTL_SECONDS
+        self._lock = threading.Lock()
+        self._seen = OrderedDict()
+        self._stats = {"checked": 0, "duplicates": 0}
+
+    def _seen_locally(self, update_id) -> bool:
+        with self._lock:
+            if update_id in self._seen:
+                self._seen.move_to_end(update_id)
+                return True
+            return False
+
+    def _remember_locally(self, update_id):
+        with self._lock:
+            self._seen[update_id] = True
+            while len(self._seen) > self.lru_size:
+                self._seen.popitem(last=False)
+
+    def first_time(self, update_id) -> bool:
+        """Records the update and returns False if it was seen before"""
+        self._stats["checked"] += 1
+
+        new = not self._seen_locally(update_id)
+        if new:
+            client = get_redis_client()
+            if client:
+                try:
+                    new = bool(client.set(f"telegram:update:{update_id}", 1, nx=True, ex=self.ttl_seconds))
+                except Exception as e:
+                    print(f"⚠️ Update dedup Redis error: {e}")
+            if new:
+                # Only ids this worker accepted - so forget() here is enough to let a retry through
+                self._remember_locally(update_id)
+
+        if not new:
+            self._stats["duplicates"] += 1
+            print(f"🔁 Duplicate Telegram update {update_id} - skipped")
+        return new
+
+    def forget(self, update_id):
+        """For updates we couldn't take after all - Telegram's redelivery must go through"""
+        with self._lock:
+            self._seen.pop(update_id, None)
+        client = get_redis_client()
+        if client:
+            try:
+                client.delete(f"telegram:update:{update_id}")
+            except Exception as e:
+                print(f"⚠️ Update dedup Redis error: {e}")
+
+    def get_stats(self) -> dict:
+        """This worker only"""
+        return {**self._stats, "tracked_locally": len(self._seen)}
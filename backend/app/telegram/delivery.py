@@ -0,0 +1,104 @@
+# app/telegram/delivery.py
+"""
+Sends result pages to Telegram chats.
+
+Within one chat the sends are strictly sequential - Telegram keeps a chat to about one
+message a second and albums must arrive in order - so a page is never parallelised.
+Concurrency is only across chats: the update workers deliver to different chats at once,
+and the client's rate limiter holds them all to the global and per-chat limits.
+"""
+from typing import Dict, List
+
+from app.telegram.client import TelegramClient
+
+CAPTION_LIMIT = 1024  # Telegram's limits
+TEXT_LIMIT = 4096
+ALBUM_SIZE = 10
+
+
+def format_property(p: dict) -> str:
+    return (
+        f"📍 {p['city']}, {p['address']}\n"
+        f"💰 Price: {p.get('price', 'N/A')}\n"
+        f"🛏 Rooms: {p.get('rooms', 'N/A')} | 🏢 Floor: {p.get('floor', 'N/A')}\n"
+        f"🏷 Type: {p.get('property_type', 'N/A')}\n"
+        f"🔁 Yield: {p.get('yield_percent', 'N/A')}%\n"
+        f"🪙 Rent: {p.get('rental_estimate', 'N/A')}₪\n"
+        f"📄 {p.get('description', 'No description.')}\n"
+        f"👤 Agent: {p.get('agent', {}).get('full_name', 'N/A')}\n"
+        f"📞 Phone: {p.get('agent', {}).get('phone_number', 'N/A')}"
+    )
+
+
+def _truncate(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+def _join_texts(texts: List[str]) -> List[str]:
+    """Packs property details into as few messages as fit TEXT_LIMIT"""
+    messages, current = [], ""
+    for text in texts:
+        text = _truncate(text, TEXT_LIMIT)
+        if current and len(current) + 2 + len(text) > TEXT_LIMIT:
+            messages.append(current)
+            current = ""
+        current = f"{current}\n\n{text}" if current else text
+    if current:
+        messages.append(current)
+    return messages
+
+
+def plan_messages(results: List[dict], image_urls: Dict[str, str]) -> List[tuple]:
+    """
+    Results with an image go out as albums (up to 10 photos, details as each photo's caption),
+    the rest packed into text messages - instead of a message plus a photo per result.
+    Returns ("album", media) / ("photo", url, caption) / ("text", text) in sending order.
+    """
+    with_image = [p for p in results if image_urls.get(str(p["id"]))]
+    without_image = [p for p in results if not image_urls.get(str(p["id"]))]
+
+    plan = []
+    for i in range(0, len(with_image), ALBUM_SIZE):
+        chunk = with_image[i:i + ALBUM_SIZE]
+        if len(chunk) == 1:  # sendMediaGroup needs at least two
+            p = chunk[0]
+            plan.append(("photo", image_urls[str(p["id"])], _truncate(format_property(p), CAPTION_LIMIT)))
+            continue
+        plan.append(("album", [
+            {"type": "photo", "media": image_urls[str(p["id"])],
+             "caption": _truncate(format_property(p), CAPTION_LIMIT)}
+            for p in chunk
+        ]))
+    plan.extend(("text", text) for text in _join_texts([format_property(p) for p in without_image]))
+    return plan
+
+
+async def deliver_property_results(client: TelegramClient, chat_id, result: dict,
+                                   image_urls: Dict[str, str]) -> int:
+    """
+    Sends one results page. A chat's messages go out one after another so they arrive
+    in order; other chats are sent concurrently by the update workers, and the client's
+    rate limiter keeps all of them within Telegram's limits.
+
+    Returns:
+        Number of Bot API calls made
+    """
+    calls = 0
+    for step in plan_messages(result.get("results", []), image_urls):
+        if step[0] == "album":
+            await client.send_media_group(chat_id, step[1])
+        elif step[0] == "photo":
+            await client.send_photo(chat_id, step[1], caption=step[2])
+        else:
+            await client.send_message(chat_id, step[1])
+        calls += 1
+
+    if result.get("next_cursor"):
+        total = result.get("total")
+        text = f"יש עוד נכסים ({total} בסך הכל)" if total else "יש עוד נכסים"
+        await client.send_message(
+            chat_id, text,
+            reply_markup={"inline_keyboard": [[{"text": "➕ הצג עוד", "callback_data": "show_more"}]]}
+        )
+        calls += 1
+    return calls
@@ -0,0 +1,90 @@
+# app/telegram/rate_limit.py
+import asyncio
+import time
+from collections import OrderedDict
+
+from app.config import Config
+
+
+class TokenBucket:
+    """
+    `rate` sends per second with bursts of up to `capacity`.
+    Only used from the event loop, so no lock - nothing awaits between checking and taking a token.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> float:
+        """Waits for a token; returns how long it waited"""
+        started = time.monotonic()
+        while True:
+            now = time.monotonic()
+            if now < self.blocked_until:
+                await asyncio.sleep(self.blocked_until - now)
+                continue
+            self._refill(now)
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return now - started
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float):
+        """Telegram answered 429 - nothing goes out before retry_after has passed"""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.tokens = 0
+
+
+class RateLimiter:
+    """
+    Telegram's limits: about 30 messages per second per bot, and about one per second
+    in a single chat (short bursts pass). One global bucket plus a bucket per chat;
+    chat buckets are kept LRU-bounded - a dropped one just starts full again.
+    """
+
+    def __init__(self, global_rate: float = None, chat_rate: float = None, chat_burst: float = None,
+                 max_chats: int = None):
+        global_rate = global_rate or Config.TELEGRAM_GLOBAL_RATE
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.chat_rate = chat_rate or Config.TELEGRAM_CHAT_RATE
+        self.chat_burst = chat_burst or Config.TELEGRAM_CHAT_BURST
+        self.max_chats = max_chats or Config.TELEGRAM_CHAT_BUCKETS
+        self._chats = OrderedDict()
+        self._stats = {"acquired": 0, "delayed": 0, "throttled": 0, "wait_seconds": 0.0}
+
+    def _chat_bucket(self, chat_id) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            bucket = self._chats[chat_id] = TokenBucket(self.chat_rate, self.chat_burst)
+            while len(self._chats) > self.max_chats:
+                self._chats.popitem(last=False)
+        else:
+            self._chats.move_to_end(chat_id)
+        return bucket
+
+    async def acquire(self, chat_id=None):
+        # Chat first - a chat waiting for its own turn shouldn't hold a global token
+        waited = await self._chat_bucket(chat_id).acquire() if chat_id is not None else 0.0
+        waited += await self.global_bucket.acquire()
+        self._stats["acquired"] += 1
+        if waited > 0.001:
+            self._stats["delayed"] += 1
+            self._stats["wait_seconds"] += waited
+
+    def throttled(self, chat_id, retry_after: float):
+        self._stats["throttled"] += 1
+        if chat_id is not None:
+            self._chat_bucket(chat_id).pause(retry_after)
+        else:
+            self.global_bucket.pause(retry_after)
+
+    def get_stats(self) -> dict:
+        return {**self._stats, "wait_seconds": round(self._stats["wait_seconds"], 3), "chats": len(self._chats)}
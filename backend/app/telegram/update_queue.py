@@ -0,0 +1,105 @@
+# app/telegram/update_queue.py
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+from app.config import Config
+
+
+def chat_key(update: dict):
+    """Chat the update belongs to - updates of one chat must be handled in order"""
+    message = update.get("message") or (update.get("callback_query") or {}).get("message") or {}
+    return message.get("chat", {}).get("id", update.get("update_id"))
+
+
+class UpdateQueue:
+    """
+    Bounded in-process queue between the webhook and the bot logic.
+    Sharded by chat: each worker task owns one shard, so a chat's updates run one
+    after another in arrival order while different chats run concurrently.
+    When a shard is full submit() returns False and the webhook answers 503,
+    so Telegram redelivers later instead of us piling up work.
+    """
+
+    def __init__(self, handler: Callable[[dict], Awaitable], workers: int = None, capacity: int = None):
+        self.handler = handler
+        self.workers = workers or Config.TELEGRAM_WORKERS
+        self.capacity = capacity or Config.TELEGRAM_QUEUE_SIZE
+        self._queues = []
+        self._tasks = []
+        self._loop = None  # workers live on the loop that started them
+        self._stats = {"enqueued": 0, "processed": 0, "failed": 0, "rejected": 0}
+        self._last_wait = 0.0
+        self._max_wait = 0.0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks) and not self._loop.is_closed()
+
+    def start(self):
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        per_shard = max(self.capacity // self.workers, 1)
+        self._queues = [asyncio.Queue(maxsize=per_shard) for _ in range(self.workers)]
+        self._tasks = [asyncio.create_task(self._work(queue)) for queue in self._queues]
+        print(f"✅ Telegram update queue started ({self.workers} workers, {per_shard} per shard)")
+
+    def submit(self, update: dict) -> bool:
+        if not self.running:
+            self.start()
+        queue = self._queues[hash(chat_key(update)) % self.workers]
+        try:
+            queue.put_nowait((update, time.monotonic()))
+        except asyncio.QueueFull:
+            self._stats["rejected"] += 1
+            print(f"⚠️ Telegram queue full - rejected update {update.get('update_id')}")
+            return False
+        self._stats["enqueued"] += 1
+        return True
+
+    async def _work(self, queue: asyncio.Queue):
+        while True:
+            update, enqueued_at = await queue.get()
+            wait = time.monotonic() - enqueued_at
+            self._last_wait, self._max_wait = wait, max(self._max_wait, wait)
+            try:
+                await self.handler(update)
+                self._stats["processed"] += 1
+            except Exception as e:
+                self._stats["failed"] += 1
+                print(f"❌ Telegram update {update.get('update_id')} failed: {e}")
+            finally:
+                queue.task_done()
+
+    async def stop(self, timeout: float = None):
+        """Lets queued updates finish (up to timeout), then cancels the workers"""
+        if not self.running or self._loop is not asyncio.get_running_loop():
+            return
+        try:
+            await asyncio.wait_for(asyncio.gather(*(q.join() for q in self._queues)),
+                                   timeout if timeout is not None else Config.TELEGRAM_DRAIN_SECONDS)
+        except asyncio.TimeoutError:
+            print(f"⚠️ Telegram queue stopped with {self.depth()} updates left")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks, self._queues = [], []
+
+    def depth(self) -> int:
+        return sum(q.qsize() for q in self._queues)
+
+    def get_stats(self) -> dict:
+        """Backpressure: how full the queue is and how long updates wait before a worker picks them up"""
+        depth = self.depth()
+        return {
+            "running": self.running,
+            "workers": self.workers,
+            "depth": depth,
+            "capacity": self.capacity,
+            "utilization": round(depth / self.capacity, 3) if self.capacity else 0.0,
+            "shard_depths": [q.qsize() for q in self._queues],
+            "last_wait_seconds": round(self._last_wait, 3),
+            "max_wait_seconds": round(self._max_wait, 3),
+            **self._stats,
+        }
@@ -1,36 +1,38 @@
-from fastapi import APIRouter, Request, Depends
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.telegram.handler import handle_telegram_message
-from app.telegram.chat_context import set_agent_for_chat, get_agent_for_chat
+from app.config import Config
+from app.database import SessionLocal
+from app.telegram.handler import ahandle_telegram_message
+from app.telegram.chat_context import set_agent_for_chat, get_agent_for_chat, set_search_for_chat, get_search_for_chat
 from app.models.agent import Agent
 from app.models.property import Property
-import httpx
-import os
+from app.telegram.update_queue import UpdateQueue
+from app.telegram.dedup import UpdateDeduplicator
+from app.telegram.client import TelegramClient, get_telegram_client
+from app.telegram.delivery import deliver_property_results
+from app.services.image_service import presign_image_keys
+from app.services.image_variants import pick_image_key
 
 router = APIRouter(prefix="/telegram", tags=["Telegram"])
-TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
-DOMAIN = os.getenv("DOMAIN", "localhost:8000")
 
 
-async def send_agent_selection_menu(client, chat_id, db: Session):
+async def send_agent_selection_menu(client: TelegramClient, chat_id, db: Session):
     """שולח רשימה של סוכנים זמינים לבחירה"""
     agents = db.query(Agent).all()
 
     if not agents:
-        await client.post(
-            f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage",
-            json={
-                "chat_id": chat_id,
-                "text": "❌ אין סוכנים זמינים כרגע. אנא נסה שוב מאוחר יותר."
-            }
-        )
+        await client.send_message(chat_id, "❌ אין סוכנים זמינים כרגע. אנא נסה שוב מאוחר יותר.")
         return
 
     # יצירת כפתורים inline לבחירת סוכן
+    # All counts in one GROUP BY instead of a COUNT per agent
+    counts = dict(db.query(Property.agent_id, func.count(Property.id)).group_by(Property.agent_id).all())
     buttons = []
     for agent in agents:
-        property_count = db.query(Property).filter(Property.agent_id == agent.id).count()
+        property_count = counts.get(agent.id, 0)
         buttons.append([{
             "text": f"{agent.full_name} ({property_count} נכסים)",
             "callback_data": f"select_agent:{agent.id}"
@@ -42,20 +44,15 @@ async def send_agent_selection_menu(client, chat_id, db: Session):
         "callback_data": "select_agent:all"
     }])
 
-    await client.post(
-        f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage",
-        json={
-            "chat_id": chat_id,
-            "text": "🏡 ברוכים הבאים ל-InvestMateAI!\n\n"
-                    "אנא בחרו סוכן נדל\"ן מהרשימה למטה כדי לראות את הנכסים שלו:",
-            "reply_markup": {
-                "inline_keyboard": buttons
-            }
-        }
+    await client.send_message(
+        chat_id,
+        "🏡 ברוכים הבאים ל-InvestMateAI!\n\n"
+        "אנא בחרו סוכן נדל\"ן מהרשימה למטה כדי לראות את הנכסים שלו:",
+        reply_markup={"inline_keyboard": buttons},
     )
 
 
-async def send_agent_welcome_message(client, chat_id, db: Session, agent_id: str):
+async def send_agent_welcome_message(client: TelegramClient, chat_id, db: Session, agent_id: str):
     """שולח הודעת ברכה עם פרטי הסוכן והנכסים"""
     if agent_id == "all":
         # כל הנכסים
@@ -66,13 +63,7 @@ async def send_agent_welcome_message(client, chat_id, db: Session, agent_id: str
         # סוכן ספציפי
         agent = db.query(Agent).filter(Agent.id == agent_id).first()
         if not agent:
-            await client.post(
-                f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage",
-                json={
-                    "chat_id": chat_id,
-                    "text": "❌ סוכן לא נמצא. אנא התחילו מחדש עם /start"
-                }
-            )
+            await client.send_message(chat_id, "❌ סוכן לא נמצא. אנא התחילו מחדש עם /start")
             return
 
         properties = db.query(Property).filter(Property.agent_id == agent_id).all()
@@ -104,20 +95,72 @@ async def send_agent_welcome_message(client, chat_id, db: Session, agent_id: str
         welcome_text += f"😔 לא נמצאו נכסים עבור {agent_name}.\n"
         welcome_text += "אנא בחרו סוכן אחר או נסו שוב מאוחר יותר."
 
-    await client.post(
-        f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage",
-        json={
-            "chat_id": chat_id,
-            "text": welcome_text,
-            "parse_mode": "Markdown"
-        }
-    )
+    await client.send_message(chat_id, welcome_text, parse_mode="Markdown")
+
+
+async def send_property_results(client: TelegramClient, chat_id, result: dict):
+    """שולח את הנכסים של עמוד התוצאות (באלבומים), וכפתור "הצג עוד" אם יש עוד"""
+    # The results already carry their image keys - sign them here, no request per property
+    # The 1600px JPEG when it's ready - Telegram recompresses photos anyway
+    keys = {str(p["id"]): pick_image_key(p.get("image_url"), p.get("image_variants"), "full", "jpeg")
+            for p in result.get("results", [])}
+    image_urls = await run_in_threadpool(presign_image_keys, keys)
+    await deliver_property_results(client, chat_id, result, image_urls)
 
 
 @router.post("/webhook")
-async def telegram_webhook(req: Request, db: Session = Depends(get_db)):
+async def telegram_webhook(req: Request):
     data = await req.json()
 
+    # Retries and other workers may deliver the same update - acknowledge without redoing it
+    update_id = data.get("update_id")
+    if update_id is not None and not await run_in_threadpool(update_dedup.first_time, update_id):
+        return {"ok": True, "duplicate": True}
+
+    if Config.TELEGRAM_INGEST_MODE != "queue":
+        # Only the inline path needs a session - queued updates open their own in the worker
+        db = SessionLocal()
+        try:
+            return await process_update(data, db)
+        except Exception:
+            if update_id is not None:
+                update_dedup.forget(update_id)  # Telegram will retry it
+            raise
+        finally:
+            db.close()
+
+    # Acknowledge right away - Telegram redelivers updates that are answered slowly
+    if not update_queue.submit(data):
+        if update_id is not None:
+            update_dedup.forget(update_id)
+        return JSONResponse(status_code=503, content={"ok": False, "reason": "busy"}, headers={"Retry-After": "1"})
+    return {"ok": True}
+
+
+@router.get("/stats")
+def telegram_stats():
+    return {
+        "mode": Config.TELEGRAM_INGEST_MODE,
+        "queue": update_queue.get_stats(),
+        "dedup": update_dedup.get_stats(),
+        "rate_limit": get_telegram_client().limiter.get_stats(),
+    }
+
+
+async def _process_queued_update(data: dict):
+    db = SessionLocal()
+    try:
+        await process_update(data, db)
+    finally:
+        db.close()
+
+
+update_queue = UpdateQueue(_process_queued_update)
+update_dedup = UpdateDeduplicator()
+
+
+async def process_update(data: dict, db: Session):
+    """The bot logic for one update (inline or from the queue workers)"""
     # בדיקת callback query (לחיצה על כפתור)
     callback_query = data.get("callback_query")
     if callback_query:
@@ -130,72 +173,38 @@ async def telegram_webhook(req: Request, db: Session = Depends(get_db)):
     if not text or not chat_id:
         return {"ok": False, "reason": "Missing data"}
 
-    async with httpx.AsyncClient() as client:
-        print(f"🔵 Received message: '{text}' from chat_id: {chat_id}")  # לוג לבדיקה
-
-        # אם זה /start
-        if text.startswith("/start"):
-            parts = text.split()
-            if len(parts) > 1:
-                # /start עם agent_id ישירות (מלינק)
-                agent_id = parts[1]
-                set_agent_for_chat(chat_id, agent_id)
-                await send_agent_welcome_message(client, chat_id, db, agent_id)
-                return {"ok": True}
-            else:
-                # /start רגיל - הצג תפריט בחירת סוכן
-                await send_agent_selection_menu(client, chat_id, db)
-                return {"ok": True}
-
-        # בדיקה אם יש סוכן מוגדר
-        agent_id = get_agent_for_chat(chat_id)
-        if not agent_id:
-            # אין סוכן מוגדר - הצג תפריט בחירה
+    client = get_telegram_client()
+    print(f"🔵 Received message: '{text}' from chat_id: {chat_id}")  # לוג לבדיקה
+
+    # אם זה /start
+    if text.startswith("/start"):
+        parts = text.split()
+        if len(parts) > 1:
+            # /start עם agent_id ישירות (מלינק)
+            agent_id = parts[1]
+            set_agent_for_chat(chat_id, agent_id)
+            await send_agent_welcome_message(client, chat_id, db, agent_id)
+            return {"ok": True}
+        else:
+            # /start רגיל - הצג תפריט בחירת סוכן
             await send_agent_selection_menu(client, chat_id, db)
             return {"ok": True}
 
-        # טיפול בהודעות חיפוש רגילות
-        result = handle_telegram_message(text, db, agent_id)
-
-        # שולח הודעה ראשית עם התקציר
-        await client.post(
-            f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage",
-            json={"chat_id": chat_id, "text": result["message"]}
-        )
-
-        # עבור כל נכס – שולח הודעה נפרדת עם פרטים
-        for p in result.get("results", []):
-            details = (
-                f"📍 {p['city']}, {p['address']}\n"
-                f"💰 Price: {p.get('price', 'N/A')}\n"
-                f"🛏 Rooms: {p.get('rooms', 'N/A')} | 🏢 Floor: {p.get('floor', 'N/A')}\n"
-                f"🏷 Type: {p.get('property_type', 'N/A')}\n"
-                f"🔁 Yield: {p.get('yield_percent', 'N/A')}%\n"
-                f"🪙 Rent: {p.get('rental_estimate', 'N/A')}₪\n"
-                f"📄 {p.get('description', 'No description.')}\n"
-                f"👤 Agent: {p.get('agent', {}).get('full_name', 'N/A')}\n"
-                f"📞 Phone: {p.get('agent', {}).get('phone_number', 'N/A')}"
-            )
-
-            # שולח טקסט מפורט
-            await client.post(
-                f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage",
-                json={"chat_id": chat_id, "text": details}
-            )
-
-            # ניסיון לשלוח גם תמונה (אם קיים image-url)
-            try:
-                img_res = await client.get(f"http://{DOMAIN}/properties/{p['id']}/image-url")
-                if img_res.status_code == 200:
-                    img_data = img_res.json()
-                    image_url = img_data.get("image_url")
-                    if image_url:
-                        await client.post(
-                            f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendPhoto",
-                            json={"chat_id": chat_id, "photo": image_url}
-                        )
-            except Exception as e:
-                print(f"Failed to fetch/send image for property {p['id']}: {e}")
+    # בדיקה אם יש סוכן מוגדר
+    agent_id = get_agent_for_chat(chat_id)
+    if not agent_id:
+        # אין סוכן מוגדר - הצג תפריט בחירה
+        await send_agent_selection_menu(client, chat_id, db)
+        return {"ok": True}
+
+    # טיפול בהודעות חיפוש רגילות
+    result = await ahandle_telegram_message(text, db, agent_id)
+
+    # שולח הודעה ראשית עם התקציר
+    await client.send_message(chat_id, result["message"])
+
+    await run_in_threadpool(set_search_for_chat, chat_id, text, result.get("next_cursor"))
+    await send_property_results(client, chat_id, result)
 
     return {"ok": True}
 
@@ -206,30 +215,36 @@ async def handle_callback_query(callback_query, db: Session):
     chat_id = callback_query["message"]["chat"]["id"]
     data = callback_query["data"]
 
-    async with httpx.AsyncClient() as client:
-        if data.startswith("select_agent:"):
-            agent_id = data.split(":")[1]
+    client = get_telegram_client()
+    if data.startswith("select_agent:"):
+        agent_id = data.split(":")[1]
 
-            # שמירת הסוכן שנבחר
-            set_agent_for_chat(chat_id, agent_id)
+        # שמירת הסוכן שנבחר
+        set_agent_for_chat(chat_id, agent_id)
 
-            # מחיקת התפריט הישן
-            await client.post(
-                f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/editMessageReplyMarkup",
-                json={
-                    "chat_id": chat_id,
-                    "message_id": callback_query["message"]["message_id"],
-                    "reply_markup": {"inline_keyboard": []}
-                }
-            )
-
-            # שליחת הודעת ברכה עם הדרכה
-            await send_agent_welcome_message(client, chat_id, db, agent_id)
+        # מחיקת התפריט הישן
+        await client.edit_message_reply_markup(chat_id, callback_query["message"]["message_id"])
+
+        # שליחת הודעת ברכה עם הדרכה
+        await send_agent_welcome_message(client, chat_id, db, agent_id)
+
+        # אישור ל-Telegram שהcallback טופל
+        await client.answer_callback_query(query_id, "✅ סוכן נבחר!")
+
+    elif data == "show_more":
+        # הכפתור הישן כבר לא רלוונטי
+        await client.edit_message_reply_markup(chat_id, callback_query["message"]["message_id"])
+
+        search = await run_in_threadpool(get_search_for_chat, chat_id)
+        if not search:
+            await client.answer_callback_query(query_id, "אין עוד תוצאות")
+            return {"ok": True}
+
+        question, cursor = search
+        result = await ahandle_telegram_message(question, db, get_agent_for_chat(chat_id), cursor)
+        await run_in_threadpool(set_search_for_chat, chat_id, question, result.get("next_cursor"))
 
-            # אישור ל-Telegram שהcallback טופל
-            await client.post(
-                f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/answerCallbackQuery",
-                json={"callback_query_id": query_id, "text": "✅ סוכן נבחר!"}
-            )
+        await client.answer_callback_query(query_id)
+        await send_property_results(client, chat_id, result)
 
     return {"ok": True}
\ No newline at end of file
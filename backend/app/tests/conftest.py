@@ -1,8 +1,12 @@
+import io
+import os
+from contextlib import contextmanager
+from types import SimpleNamespace
 from unittest.mock import patch
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine, inspect
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
@@ -34,6 +38,7 @@ def clean_database():
 def mock_all_external_apis():
     """Mock all external APIs for all tests to avoid spending tokens"""
     with patch('app.services.gpt_service.openai.ChatCompletion.create') as mock_openai, \
+            patch('app.services.gpt_service._achat') as mock_achat, \
             patch('app.services.gpt_service.GPTService.estimate_property_metrics') as mock_estimate:
         # Mock OpenAI to return valid JSON
         mock_openai.return_value = {
@@ -41,6 +46,9 @@ def mock_all_external_apis():
                 "content": '{"city": "Tel Aviv", "description_filters": [], "rental_estimate": 5000, "yield_percent": 3.5}'}}]
         }
 
+        # Same answer for the async (httpx) client
+        mock_achat.return_value = mock_openai.return_value["choices"][0]["message"]["content"]
+
         # Mock property estimation
         mock_estimate.return_value = {
             "rental_estimate": 5000,
@@ -67,6 +75,197 @@ def override_get_db():
         db.close()
 
 
+@pytest.fixture
+def count_queries():
+    """
+    Counts SQL statements on the test engine, to pin query counts (N+1 checks):
+
+        with count_queries() as queries:
+            client.get("/properties/", headers=headers)
+        assert queries.count == 2, queries.statements
+    """
+    @contextmanager
+    def counting():
+        queries = SimpleNamespace(count=0, statements=[])
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            queries.count += 1
+            queries.statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield queries
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    return counting
+
+
+@pytest.fixture
+def explain():
+    """
+    Query plan of a SQLAlchemy query as text, for index checks (SQLite or Postgres):
+
+        assert "ix_properties_price" in explain(db, query), explain(db, query)
+    """
+    def plan(db, query) -> str:
+        sql = query.statement.compile(db.get_bind(), compile_kwargs={"literal_binds": True})
+        prefix = "EXPLAIN QUERY PLAN" if db.get_bind().dialect.name == "sqlite" else "EXPLAIN"
+        rows = db.execute(text(f"{prefix} {sql}")).fetchall()
+        return "\n".join(str(row[-1]) for row in rows)
+
+    return plan
+
+
+@pytest.fixture
+def postgres_db():
+    """Session on TEST_POSTGRES_URL with fresh tables - the test is skipped when it isn't set"""
+    url = os.getenv("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL not set")
+    pg_engine = create_engine(url)
+    Base.metadata.create_all(bind=pg_engine)
+    db = sessionmaker(bind=pg_engine)()
+    try:
+        yield db
+    finally:
+        db.close()
+        Base.metadata.drop_all(bind=pg_engine)
+
+
+@pytest.fixture
+def db():
+    """Session on the test database (the same one the client's requests use)"""
+    session = TestingSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def make_property():
+    """
+    Adds a property straight to the database - no API call, no estimate job:
+
+        prop = make_property(db, description="balcony", price=900000)
+    """
+    def make(db, **fields):
+        prop = Property(**{"agent_id": "agent-1", "city": "Haifa", "address": "1 Herzl St", "price": 1000000,
+                           **fields})
+        db.add(prop)
+        db.commit()
+        return prop
+
+    return make
+
+
+class FakeRedis:
+    """The string, list and sorted-set commands the app's Redis users call"""
+
+    def __init__(self):
+        self.data = {}
+        self.lists = {}
+        self.zsets = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def lpush(self, key, value):
+        self.lists.setdefault(key, []).insert(0, value)
+
+    def blmove(self, source, destination, timeout, src="LEFT", dest="RIGHT"):
+        items = self.lists.get(source)
+        if not items:
+            return None
+        value = items.pop() if src == "RIGHT" else items.pop(0)
+        target = self.lists.setdefault(destination, [])
+        target.insert(0 if dest == "LEFT" else len(target), value)
+        return value
+
+    def lrem(self, key, count, value):
+        if value in self.lists.get(key, []):
+            self.lists[key].remove(value)
+
+    def lrange(self, key, start, end):
+        return list(self.lists.get(key, []))
+
+    def llen(self, key):
+        return len(self.lists.get(key, []))
+
+    def zadd(self, key, mapping, nx=False):
+        zset = self.zsets.setdefault(key, {})
+        for member, score in mapping.items():
+            if not (nx and member in zset):
+                zset[member] = score
+
+    def zrem(self, key, member):
+        return self.zsets.get(key, {}).pop(member, None) is not None
+
+    def zrangebyscore(self, key, low, high):
+        return [m for m, score in self.zsets.get(key, {}).items() if low <= score <= high]
+
+    def zcard(self, key):
+        return len(self.zsets.get(key, {}))
+
+
+@pytest.fixture
+def fake_redis():
+    """
+    In-memory Redis - patch it in where the code under test looks it up:
+
+        with patch('app.jobs.estimate_queue.get_redis_client', return_value=fake_redis):
+    """
+    return FakeRedis()
+
+
+class FakeS3:
+    """Keeps the objects and records what was sent to S3"""
+
+    def __init__(self):
+        self.calls = []
+        self.objects = {}  # key -> (body, content type)
+
+    def put_object(self, **kwargs):
+        self.calls.append(("put_object", kwargs["Key"], kwargs["ContentType"], len(kwargs["Body"])))
+        self.objects[kwargs["Key"]] = (kwargs["Body"], kwargs["ContentType"])
+
+    def get_object(self, **kwargs):
+        return {"Body": io.BytesIO(self.objects[kwargs["Key"]][0])}
+
+    def delete_object(self, **kwargs):
+        self.calls.append(("delete", kwargs["Key"]))
+        self.objects.pop(kwargs["Key"], None)
+
+    def create_multipart_upload(self, **kwargs):
+        self.calls.append(("create", kwargs["Key"], kwargs["ContentType"]))
+        return {"UploadId": "u1"}
+
+    def upload_part(self, **kwargs):
+        self.calls.append(("part", kwargs["PartNumber"], len(kwargs["Body"])))
+        return {"ETag": f"e{kwargs['PartNumber']}"}
+
+    def complete_multipart_upload(self, **kwargs):
+        self.calls.append(("complete", [p["PartNumber"] for p in kwargs["MultipartUpload"]["Parts"]]))
+
+    def abort_multipart_upload(self, **kwargs):
+        self.calls.append(("abort",))
+
+
+@pytest.fixture
+def fake_s3():
+    """FakeS3 in place of app.utils.aws_s3's client for the whole test"""
+    s3 = FakeS3()
+    with patch('app.utils.aws_s3.s3_client', s3):
+        yield s3
+
+
 @pytest.fixture
 def flexible_client():
     """Test client where you can control GPT responses in individual tests"""
@@ -134,6 +333,11 @@ def auth_token(client):
     return login_response.json()["access_token"]
 
 
+@pytest.fixture
+def auth_headers(auth_token):
+    return {"Authorization": f"Bearer {auth_token}"}
+
+
 @pytest.fixture
 def sample_property(client, auth_token):
     headers = {"Authorization": f"Bearer {auth_token}"}
@@ -0,0 +1,130 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+from app.services.criteria_flight import CriteriaSingleFlight
+from app.services.semantic_cache import SemanticIndex
+from app.utils.text_normalization import normalize_question, question_key
+
+
+class TestCriteriaCacheKeys:
+    def test_variants_share_one_key(self):
+        """Test casing, whitespace and punctuation variants map to the same key"""
+        keys = {
+            question_key("Apartments in Tel Aviv"),
+            question_key("apartments in tel aviv "),
+            question_key("apartments in Tel-Aviv?"),
+        }
+        assert len(keys) == 1
+        assert len(keys.pop()) == 32
+
+    def test_hebrew_niqqud_and_numbers(self):
+        """Test niqqud stripping and number normalization"""
+        assert normalize_question("דִּירָה בְּתֵל אָבִיב עד 9 מיליון") == "דירה בתל אביב עד 9000000"
+        assert normalize_question("דירה בתל אביב עד 9,000,000") == "דירה בתל אביב עד 9000000"
+        assert normalize_question("Flat up to 2.5M") == "flat up to 2500000"
+
+    def test_different_questions_differ(self):
+        """Test normalization keeps meaningful differences"""
+        assert question_key("3 rooms in Haifa") != question_key("4 rooms in Haifa")
+
+    def test_meaningful_symbols_are_kept(self):
+        """Test +, <, > and a leading minus don't collapse into the plain question"""
+        for a, b in (("3+ rooms in Haifa", "3 rooms in Haifa"), ("apartment <2M", "apartment >2M"),
+                     ("apartment <2M", "apartment 2M"), ("floor -1", "floor 1")):
+            assert question_key(a) != question_key(b), (a, b)
+
+        assert normalize_question("3+ rooms, <2M") == "3 and up rooms under 2000000"
+        assert normalize_question("floor -1 in Tel-Aviv, 1-2M") == "floor minus 1 in tel aviv 1 2000000"
+
+
+class TestSemanticIndex:
+    def test_paraphrase_matches(self):
+        """Test paraphrases with synonyms resolve to the cached question"""
+        index = SemanticIndex(capacity=10, dim=1024)
+        index.add("netanya", "flat near the train in Netanya", 1)
+        index.add("haifa", "house with pool in Haifa", 2)
+
+        key, similarity = index.nearest("apartment in Netanya close to the railway", 0.9)
+        assert key == "netanya"
+        assert index.nearest("apartment in Netanya with a garden", 0.9) is None
+
+    def test_numbers_must_match(self):
+        """Test near-identical questions with different numbers are not reused"""
+        index = SemanticIndex(capacity=10, dim=1024)
+        index.add("three", "3 rooms in Haifa up to 2 million", 1)
+
+        assert index.nearest("4 rooms in Haifa up to 2 million", 0.5) is None
+        assert index.nearest("3 rooms in Haifa up to 2 million", 0.9)[0] == "three"
+
+    def test_criteria_must_match(self):
+        """Test one extra amenity, a different city or a negation is not reused despite high similarity"""
+        index = SemanticIndex(capacity=10, dim=1024)
+        index.add("tlv", "apartments in Tel Aviv with parking balcony elevator pool", 1)
+        index.add("haifa", "דירה בחיפה בלי מרפסת עם חניה", 2)
+
+        assert index.nearest("apartments in Tel Aviv with parking balcony elevator pool garden", 0.5) is None
+        assert index.nearest("apartments in Jerusalem with parking balcony elevator pool", 0.5) is None
+        assert index.nearest("flats in Tel Aviv with a parking spot, balcony, elevator and pool", 0.8)[0] == "tlv"
+        assert index.nearest("דירה בחיפה עם מרפסת בלי חניה", 0.5) is None
+        assert index.nearest("דירה בחיפה עם חניה בלי מרפסת", 0.8)[0] == "haifa"
+
+    def test_capacity_evicts_oldest(self):
+        """Test the index stays bounded and evicts the oldest entry"""
+        index = SemanticIndex(capacity=2, dim=256)
+        index.add("a", "apartment in Haifa", 1)
+        index.add("b", "apartment in Netanya", 2)
+        index.add("c", "apartment in Eilat", 3)
+
+        assert len(index) == 2
+        assert index.nearest("apartment in Haifa", 0.9) is None
+        assert index.nearest("apartment in Eilat", 0.9)[0] == "c"
+
+
+class TestSingleFlight:
+    def test_concurrent_callers_share_one_extraction(self):
+        """Test identical concurrent questions trigger a single upstream call"""
+        calls = []
+        release = threading.Event()
+
+        def slow_extractor(question):
+            calls.append(question)
+            release.wait(timeout=5)
+            return {"city": "Haifa", "description_filters": []}
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = [
+                pool.submit(CriteriaSingleFlight.extract, q, slow_extractor)
+                for q in ["Apartments in Haifa"] * 4 + ["apartments in haifa?"] * 4
+            ]
+            time.sleep(0.2)
+            release.set()
+            results = [f.result(timeout=5) for f in futures]
+
+        assert len(calls) == 1
+        assert all(r["city"] == "Haifa" for r in results)
+        assert CriteriaSingleFlight.get_stats()["coalesced_local"] >= 7
+
+    def test_waiter_outlasts_the_leader_lock(self):
+        """Test the lock covers the GPT call and a remote waiter only falls back after the lock would expire"""
+        client = MagicMock()
+        client.set.return_value = None  # another worker holds the lock
+        client.get.return_value = None
+        client.exists.return_value = True
+        before = CriteriaSingleFlight.get_stats()["fallback_calls"]
+
+        with patch('app.services.criteria_flight.get_redis_client', return_value=client), \
+                patch('app.services.criteria_flight.CacheService.save_search_criteria'), \
+                patch.multiple('app.services.criteria_flight.Config', CRITERIA_GPT_TIMEOUT_SECONDS=0.2,
+                               SINGLE_FLIGHT_LOCK_MARGIN_SECONDS=0.1, SINGLE_FLIGHT_WAIT_MARGIN_SECONDS=0.1,
+                               SINGLE_FLIGHT_POLL_SECONDS=0.02):
+            started = time.monotonic()
+            result = CriteriaSingleFlight.extract("houses in Eilat", lambda q: {"city": "Eilat"})
+            waited = time.monotonic() - started
+
+        assert client.set.call_args.kwargs["px"] == 300
+        assert waited >= 0.4
+        assert result == {"city": "Eilat"}
+        assert CriteriaSingleFlight.get_stats()["fallback_calls"] == before + 1
+        client.hincrby.assert_any_call("criteria_stats", "fallback_calls", 1)
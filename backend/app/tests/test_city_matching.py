@@ -0,0 +1,40 @@
+from app.models.agent import Agent
+from app.services.property_service import search_properties_by_criteria
+
+
+class TestCityMatching:
+    def test_city_aliases_match_exactly(self, db, make_property):
+        """Test Hebrew/English/dashed city names hit the same canonical city"""
+        tel_aviv = make_property(db, city="Tel-Aviv")
+        make_property(db, city="Haifa")
+
+        for city in ["Tel Aviv", "תל אביב", "TLV"]:
+            results = search_properties_by_criteria({"city": city}, db)
+            assert [p.id for p in results] == [tel_aviv.id]
+
+    def test_city_canonical_follows_updates(self, db, make_property):
+        """Test the canonical city is kept in sync when the city changes"""
+        prop = make_property(db, city="Haifa")
+
+        prop.city = "חיפה"
+        assert prop.city_canonical == "Haifa"
+        prop.city = "Ramat-HaSharon"
+        assert prop.city_canonical == "ramat hasharon"
+
+    def test_spelling_variants_fall_back_to_fuzzy(self, db, make_property):
+        """Test misspelled cities and streets still find the listing"""
+        prop = make_property(db, city="Herzliya", address="123 Dizengoff St")
+        make_property(db, city="Hadera", address="5 Weizmann St")
+
+        assert [p.id for p in search_properties_by_criteria({"city": "Herzliyya"}, db)] == [prop.id]
+        assert [p.id for p in search_properties_by_criteria({"address": "Dizengof"}, db)] == [prop.id]
+        assert search_properties_by_criteria({"city": "Jerusalem"}, db) == []
+
+    def test_fuzzy_search_postgres(self, postgres_db, make_property):
+        """Test the pg_trgm path finds spelling variants"""
+        db = postgres_db
+        db.add(Agent(id="agent-1", full_name="Agent", email="agent@example.com", password_hash="x"))
+        prop = make_property(db, city="Herzliya", address="123 Dizengoff St")
+
+        assert [p.id for p in search_properties_by_criteria({"address": "Dizengof"}, db)] == [prop.id]
+        assert [p.id for p in search_properties_by_criteria({"city": "Herzliyya"}, db)] == [prop.id]
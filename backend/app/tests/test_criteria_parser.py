@@ -0,0 +1,70 @@
+from app.services.criteria_parser import parse_search_criteria
+
+
+class TestCriteriaParser:
+    def test_english_rooms_city_price(self):
+        """Test simple English question is fully parsed"""
+        criteria, confidence = parse_search_criteria("3 rooms in Haifa up to 2 million")
+        assert confidence == 1.0
+        assert criteria["city"] == "Haifa"
+        assert criteria["max_price"] == 2000000
+        assert criteria["min_rooms"] == 3 and criteria["max_rooms"] == 3
+
+    def test_hebrew_city_type_price(self):
+        """Test Hebrew question with prefixes and million suffix"""
+        criteria, confidence = parse_search_criteria("דירה בתל אביב עד 9 מיליון")
+        assert confidence == 1.0
+        assert criteria["city"] == "Tel Aviv"
+        assert criteria["property_type"] == "apartment"
+        assert criteria["max_price"] == 9000000
+
+    def test_ranges_and_description_filters(self):
+        """Test price range shorthand, floors and FILTER_SYNONYMS keywords"""
+        criteria, confidence = parse_search_criteria("Apartments with pool, 1-2M")
+        assert confidence == 1.0
+        assert criteria["min_price"] == 1000000
+        assert criteria["max_price"] == 2000000
+        assert criteria["description_filters"] == ["pool"]
+
+        criteria, _ = parse_search_criteria("בין 3 ל-4 חדרים בחיפה מקומה 2 ומעלה עם מרפסת")
+        assert (criteria["min_rooms"], criteria["max_rooms"]) == (3, 4)
+        assert criteria["min_floor"] == 2 and criteria["max_floor"] is None
+        assert criteria["description_filters"] == ["balcony"]
+
+    def test_rent_context(self):
+        """Test rent amounts go to rental_estimate_max"""
+        criteria, confidence = parse_search_criteria("apartment for rent in Haifa up to 5000")
+        assert confidence == 1.0
+        assert criteria["rental_estimate_max"] == 5000
+        assert criteria["max_price"] is None
+
+    def test_ambiguous_questions_have_low_confidence(self):
+        """Test unknown words, streets and implausible prices defer to GPT"""
+        assert parse_search_criteria("Investment properties in Haifa")[1] < 0.8
+        assert parse_search_criteria("apartment on Ben Yehuda street")[1] == 0.0
+        assert parse_search_criteria("apartments in Haifa up to 2000")[1] == 0.0
+        assert parse_search_criteria("something cool")[1] == 0.0
+
+    def test_negations_go_to_gpt(self):
+        """Test a negated value is never read as a filter without GPT"""
+        for question in (
+            "apartment in Tel Aviv with parking and balcony without elevator up to 3 million",
+            "apartment in Tel Aviv with parking and balcony not on the ground floor up to 3 million",
+            "apartment in Tel Aviv with parking but no pool up to 3 million",
+            "דירה בחיפה ללא מעלית עד 3 מיליון",
+            "דירה בחיפה עם חניה בלי בריכה",
+        ):
+            assert parse_search_criteria(question)[1] == 0.0, question
+
+        # "no more than" is a price bound, not a negation
+        criteria, confidence = parse_search_criteria("apartment in Haifa no more than 2 million")
+        assert confidence == 1.0 and criteria["max_price"] == 2000000
+
+    def test_alternatives(self):
+        """Test "X or Y rooms" is a range and other alternatives go to GPT"""
+        for question in ("3 or 4 room apartment in Haifa", "דירה בחיפה 3 או 4 חדרים"):
+            criteria, confidence = parse_search_criteria(question)
+            assert confidence == 1.0, question
+            assert (criteria["min_rooms"], criteria["max_rooms"]) == (3, 4)
+
+        assert parse_search_criteria("apartment in Haifa 3 rooms or more")[1] == 0.0
@@ -0,0 +1,63 @@
+import re
+
+from sqlalchemy import text
+
+from app.models.agent import Agent
+from app.services.property_service import build_search_query, search_properties_by_criteria
+from app.utils.description_filters import HEBREW_PREFIXES, build_description_tsquery
+
+
+class TestDescriptionSearch:
+    def test_synonyms_compile_to_one_tsquery(self):
+        """Test keywords and synonyms become a single OR-ed tsquery"""
+        tsquery = build_description_tsquery(["pool", "near metro"])
+
+        def hebrew(word):
+            return "(" + " | ".join([word] + [p + word for p in HEBREW_PREFIXES]) + ")"
+
+        assert tsquery == (f"pool | {hebrew('בריכה')} | (near <-> metro) | train | railway | "
+                           f"({hebrew('תחבורה')} <-> ציבורית) | {hebrew('רכבת')}")
+        assert build_description_tsquery([]) is None
+
+    def test_hebrew_prefixes_in_tsquery(self):
+        """Test Hebrew synonyms also match with a prefix letter (במרפסת, ומרפסת, החניה)"""
+        terms = set(re.findall(r"\w+", build_description_tsquery(["balcony", "parking"])))
+
+        assert {"מרפסת", "במרפסת", "ומרפסת", "שבמרפסת", "חניה", "החניה", "וחניה"} <= terms
+
+    def test_prefixed_hebrew_description(self, db, make_property):
+        """Test a description with prefixed Hebrew words is found (SQLite fallback)"""
+        match = make_property(db, description="דירה מרווחת ומרפסת, החניה בטאבו")
+        make_property(db, description="דירה בקומת קרקע")
+
+        results = search_properties_by_criteria({"description_filters": ["balcony", "parking"]}, db)
+        assert [p.id for p in results] == [match.id]
+
+    def test_best_matches_first(self, db, make_property):
+        """Test listings matching more keywords are ranked first (SQLite fallback)"""
+        make_property(db, description="Quiet flat with a balcony")
+        best = make_property(db, description="Balcony, pool and parking")
+        make_property(db, description="Ground floor, no extras")
+
+        results = search_properties_by_criteria({"description_filters": ["balcony", "pool", "parking"]}, db)
+
+        assert len(results) == 2
+        assert results[0].id == best.id
+
+    def test_full_text_search_postgres(self, postgres_db, make_property, explain):
+        """Test the tsvector path matches word forms and uses the GIN index"""
+        db = postgres_db
+        db.add(Agent(id="agent-1", full_name="Agent", email="agent@example.com", password_hash="x"))
+        make_property(db, description="Two balconies and a garden")
+        make_property(db, description="דירה עם מרפסת שמש")
+        make_property(db, description="דירה מרווחת ומרפסת, החניה בטאבו")
+        make_property(db, description="Ground floor, no extras")
+
+        results = search_properties_by_criteria({"description_filters": ["balcony"]}, db)
+        assert len(results) == 3
+        results = search_properties_by_criteria({"description_filters": ["parking"]}, db)
+        assert len(results) == 1
+
+        db.execute(text("SET enable_seqscan = off"))
+        plan = explain(db, build_search_query({"description_filters": ["balcony"]}, db))
+        assert "ix_properties_description_tsv" in plan, plan
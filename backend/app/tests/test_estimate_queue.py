@@ -0,0 +1,101 @@
+from unittest.mock import patch
+
+from app.config import Config
+from app.jobs.estimate_queue import EstimateQueue
+from app.jobs.worker import process_estimate_job
+from app.models.property import Property
+
+
+class TestEstimateOnCreate:
+    def test_create_property_queues_estimate(self, client, auth_headers):
+        """Test a property without estimates is saved right away and queued"""
+        with patch('app.services.property_service.EstimateQueue.enqueue', return_value=True) as mock_enqueue, \
+                patch('app.services.gpt_service.GPTService.estimate_property_metrics') as mock_estimate:
+            response = client.post("/properties/",
+                                   json={"city": "Haifa", "address": "1 Herzl St", "price": 900000},
+                                   headers=auth_headers)
+
+        assert response.status_code == 201
+        assert response.json()["estimate_status"] == "pending"
+        assert response.json()["rental_estimate"] is None
+        mock_enqueue.assert_called_once_with(response.json()["id"])
+        mock_estimate.assert_not_called()
+
+    def test_create_property_estimates_inline_without_redis(self, client, auth_headers):
+        """Test the estimate still happens inline when the queue is unavailable"""
+        with patch('app.services.property_service.EstimateQueue.enqueue', return_value=False):
+            response = client.post("/properties/",
+                                   json={"city": "Haifa", "address": "1 Herzl St", "price": 900000},
+                                   headers=auth_headers)
+
+        assert response.status_code == 201
+        assert response.json()["estimate_status"] == "done"
+        assert float(response.json()["rental_estimate"]) == 5000
+
+
+class TestEstimateJobs:
+    def _queued_property(self, client, auth_headers):
+        with patch('app.services.property_service.EstimateQueue.enqueue', return_value=True):
+            response = client.post("/properties/",
+                                   json={"city": "Haifa", "address": "1 Herzl St", "price": 900000},
+                                   headers=auth_headers)
+        return response.json()["id"]
+
+    def test_job_fills_estimate(self, client, auth_headers, db):
+        """Test the worker fills the missing values and marks the job done"""
+        property_id = self._queued_property(client, auth_headers)
+
+        assert process_estimate_job(db, property_id) == "done"
+        property = db.query(Property).filter_by(id=property_id).first()
+        assert float(property.rental_estimate) == 5000
+        assert property.estimate_attempts == 1
+
+    def test_failed_job_retries_with_backoff(self, client, auth_headers, db):
+        """Test a failed estimate is retried later, then marked failed"""
+        property_id = self._queued_property(client, auth_headers)
+
+        with patch('app.services.gpt_service.GPTService.estimate_property_metrics', side_effect=TimeoutError("slow")), \
+                patch('app.jobs.worker.EstimateQueue.schedule_retry') as mock_retry:
+            for attempt in range(1, Config.ESTIMATE_MAX_ATTEMPTS):
+                assert process_estimate_job(db, property_id) == "pending"
+                mock_retry.assert_called_with(property_id, attempt)
+
+            assert process_estimate_job(db, property_id) == "failed"
+
+        property = db.query(Property).filter_by(id=property_id).first()
+        assert property.estimate_error == "slow"
+        assert mock_retry.call_count == Config.ESTIMATE_MAX_ATTEMPTS - 1
+
+    def test_requeued_job_gives_up_after_max_attempts(self, client, auth_headers, db):
+        """Test a job that keeps stopping its worker is marked failed instead of looping"""
+        property_id = self._queued_property(client, auth_headers)
+        property = db.query(Property).filter_by(id=property_id).first()
+        property.estimate_status = "running"
+        property.estimate_attempts = Config.ESTIMATE_MAX_ATTEMPTS
+        db.commit()
+
+        with patch('app.services.gpt_service.GPTService.estimate_property_metrics') as mock_estimate:
+            assert process_estimate_job(db, property_id) == "failed"
+        mock_estimate.assert_not_called()
+
+
+class TestEstimateQueue:
+    def test_job_of_stopped_worker_is_requeued(self, fake_redis):
+        """Test a job taken but never acknowledged goes back on the queue after the timeout"""
+        with patch('app.jobs.estimate_queue.get_redis_client', return_value=fake_redis), \
+                patch('app.jobs.estimate_queue.time.time') as mock_time:
+            mock_time.return_value = 1000.0
+            EstimateQueue.enqueue("p1")
+            EstimateQueue.enqueue("p2")
+
+            assert EstimateQueue.dequeue(timeout=0) == "p1"  # worker dies here
+            assert EstimateQueue.dequeue(timeout=0) == "p2"
+            EstimateQueue.ack("p2")
+            assert EstimateQueue.dequeue(timeout=0) is None
+            assert EstimateQueue.get_stats()["processing"] == 1
+
+            mock_time.return_value = 1000.0 + Config.ESTIMATE_JOB_TIMEOUT_SECONDS
+            assert EstimateQueue.dequeue(timeout=0) == "p1"
+            EstimateQueue.ack("p1")
+            assert EstimateQueue.get_stats() == {"status": "connected", "queued": 0,
+                                                  "waiting_retry": 0, "processing": 0}
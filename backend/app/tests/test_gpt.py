@@ -1,3 +1,6 @@
+import asyncio
+
+
 class TestGPTChat:
     def test_chat_endpoint(self, client, auth_token):
         """Test GPT chat endpoint"""
@@ -40,4 +43,55 @@ class TestGPTChat:
                                json={"question": "Investment properties in Haifa"},
                                headers=headers)
         assert response.status_code == 200
-        assert response.json()["filters"]["rental_estimate_max"] == 5000
\ No newline at end of file
+        assert response.json()["filters"]["rental_estimate_max"] == 5000
+
+    def test_simple_question_skips_gpt(self, flexible_client, auth_token):
+        """Test confidently parsed questions never reach GPT"""
+        client, mock_gpt = flexible_client
+        headers = {"Authorization": f"Bearer {auth_token}"}
+
+        response = client.post("/gpt/chat/",
+                               json={"question": "3 rooms in Haifa up to 2 million"},
+                               headers=headers)
+        assert response.status_code == 200
+        assert response.json()["filters"]["city"] == "Haifa"
+        assert response.json()["filters"]["max_price"] == 2000000
+        mock_gpt.assert_not_called()
+
+
+class TestAsyncChat:
+    def test_async_chat_matches_sync(self, client):
+        """Test the async path returns the same payload as the sync one"""
+        from app.database import get_db
+        from app.services.chat_service import aprocess_chat_question, process_chat_question
+
+        db = next(client.app.dependency_overrides[get_db]())
+        question = "Looking for something nice by the sea"
+
+        sync_result = process_chat_question(question, db)
+        async_result = asyncio.run(aprocess_chat_question(question, db))
+
+        assert async_result["filters"] == sync_result["filters"]
+        assert async_result["message"] == sync_result["message"]
+
+    def test_concurrent_async_extractions_coalesce(self):
+        """Test concurrent async callers share one GPT call"""
+        from app.services.criteria_flight import CriteriaSingleFlight
+
+        calls = []
+
+        async def slow_extractor(question):
+            calls.append(question)
+            await asyncio.sleep(0.05)
+            return {"city": "Haifa"}
+
+        async def ask_many():
+            return await asyncio.gather(*[
+                CriteriaSingleFlight.aextract("Quiet flat near the port?", slow_extractor)
+                for _ in range(10)
+            ])
+
+        results = asyncio.run(ask_many())
+
+        assert len(calls) == 1
+        assert all(r == {"city": "Haifa"} for r in results)
@@ -0,0 +1,144 @@
+import asyncio
+import io
+import re
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.models.property import Property
+from app.services.presign_cache import PresignCache
+from app.utils.aws_s3 import UploadTooLarge, upload_stream_to_s3
+
+JPEG = b"\xff\xd8\xff\xe0" + b"\x00" * 100
+
+
+def _jpeg(width, height) -> bytes:
+    from PIL import Image
+    out = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 120, 40)).save(out, "JPEG")
+    return out.getvalue()
+
+
+class TestImageUpload:
+    @pytest.fixture(autouse=True)
+    def _no_variants(self):
+        # Upload only - TestImageVariants covers the background job
+        with patch('app.routes.properties.generate_image_variants'):
+            yield
+
+    def test_type_is_sniffed_from_content(self, client, auth_headers, sample_property, fake_s3):
+        """Test the stored type comes from the bytes, and non-images are refused"""
+        response = client.post(f"/properties/{sample_property}/upload-image", headers=auth_headers,
+                               files={"file": ("photo.png", JPEG, "image/png")})
+        refused = client.post(f"/properties/{sample_property}/upload-image", headers=auth_headers,
+                              files={"file": ("photo.jpg", b"<html>not an image</html>", "image/jpeg")})
+
+        key = response.json()["file_key"]
+        assert response.status_code == 200
+        assert re.fullmatch(rf"property_images/{sample_property}/[0-9a-f]{{12}}\.jpg", key)
+        assert fake_s3.calls == [("put_object", key, "image/jpeg", len(JPEG))]
+        assert refused.status_code == 415
+
+    def test_size_limit(self, client, auth_headers, sample_property, fake_s3):
+        """Test uploads over IMAGE_UPLOAD_MAX_MB are refused before anything reaches S3"""
+        with patch('app.routes.properties.Config.IMAGE_UPLOAD_MAX_MB', 1):
+            response = client.post(f"/properties/{sample_property}/upload-image", headers=auth_headers,
+                                   files={"file": ("big.jpg", JPEG + b"\x00" * 2**20, "image/jpeg")})
+
+        assert response.status_code == 413
+        assert fake_s3.calls == []
+
+    def test_large_files_stream_in_parts(self, fake_s3):
+        """Test a file bigger than one part goes up as a multipart upload, aborted when over the limit"""
+        assert upload_stream_to_s3("k.jpg", io.BytesIO(b"x" * 25), "image/jpeg", max_bytes=100, part_size=10)
+        assert fake_s3.calls == [("create", "k.jpg", "image/jpeg"), ("part", 1, 10), ("part", 2, 10),
+                                 ("part", 3, 5), ("complete", [1, 2, 3])]
+
+        fake_s3.calls.clear()
+        with pytest.raises(UploadTooLarge):
+            upload_stream_to_s3("k.jpg", io.BytesIO(b"x" * 25), "image/jpeg", max_bytes=15, part_size=10)
+        assert fake_s3.calls == [("create", "k.jpg", "image/jpeg"), ("part", 1, 10), ("abort",)]
+
+
+class TestImageVariants:
+    @pytest.fixture
+    def variant_job(self, db):
+        """Background jobs open their own session - on the test database here; the pool is stopped after"""
+        pytest.importorskip("PIL")
+        from app.services.image_variants import shutdown_image_pool
+
+        try:
+            with patch('app.services.image_variants.SessionLocal', sessionmaker(bind=db.get_bind())), \
+                    patch('app.services.presign_cache.generate_presigned_view_url',
+                          side_effect=lambda key, expires_in: f"https://signed/{key}"):
+                yield
+        finally:
+            shutdown_image_pool()
+
+    def test_variants_are_resized_not_enlarged(self):
+        """Test every size is rendered as WebP and JPEG within its longest edge"""
+        pytest.importorskip("PIL")
+        from PIL import Image
+        from app.services.image_variants import render_variants
+
+        rendered = render_variants(_jpeg(2000, 1000), quality=80)
+        small = render_variants(_jpeg(500, 250), quality=80)
+
+        dimensions = {k: Image.open(io.BytesIO(v)).size for k, v in rendered.items()}
+        assert dimensions[("thumbnail", "webp")] == (320, 160)
+        assert dimensions[("card", "jpeg")] == (800, 400)
+        assert dimensions[("full", "webp")] == (1600, 800)
+        assert Image.open(io.BytesIO(rendered[("card", "webp")])).format == "WEBP"
+        assert Image.open(io.BytesIO(small[("full", "jpeg")])).size == (500, 250)
+
+    def test_upload_records_variants_and_serves_sizes(self, client, auth_headers, sample_property, fake_s3,
+                                                      variant_job):
+        """Test an upload produces derived keys next to the original and image-url serves them by size"""
+        PresignCache.clear_local()
+
+        # TestClient runs the background task before returning
+        key = client.post(f"/properties/{sample_property}/upload-image", headers=auth_headers,
+                          files={"file": ("photo.jpg", _jpeg(1200, 900), "image/jpeg")}).json()["file_key"]
+        card = client.get(f"/properties/{sample_property}/image-url", params={"size": "card", "format": "webp"})
+        original = client.get(f"/properties/{sample_property}/image-url")
+
+        base = key.rsplit(".", 1)[0]
+        assert f"{base}/thumbnail.webp" in fake_s3.objects
+        assert fake_s3.objects[f"{base}/full.jpg"][1] == "image/jpeg"
+        assert card.json() == {"image_url": f"https://signed/{base}/card.webp", "size": "card"}
+        assert original.json() == {"image_url": f"https://signed/{key}", "size": "original"}
+
+    def test_stale_job_does_not_record_its_variants(self, client, auth_headers, sample_property, db, fake_s3,
+                                                    variant_job):
+        """Test a variants job finishing after a re-upload leaves the new image's row alone and cleans up"""
+        from app.services.image_variants import generate_image_variants
+
+        with patch('app.routes.properties.generate_image_variants'):  # first job hasn't run yet
+            first = client.post(f"/properties/{sample_property}/upload-image", headers=auth_headers,
+                                files={"file": ("a.jpg", _jpeg(1200, 900), "image/jpeg")}).json()["file_key"]
+            fake_s3.objects["first-copy"] = fake_s3.objects[first]
+        second = client.post(f"/properties/{sample_property}/upload-image", headers=auth_headers,
+                             files={"file": ("b.jpg", _jpeg(900, 900), "image/jpeg")}).json()["file_key"]
+        fake_s3.objects[first] = fake_s3.objects.pop("first-copy")  # still readable by the late job
+        stale = asyncio.run(generate_image_variants(sample_property, first))
+
+        property = db.query(Property).filter_by(id=sample_property).first()
+        assert stale is None
+        assert ("delete", first) in fake_s3.calls  # the replaced original
+        assert first != second and property.image_url == second
+        assert property.image_variants["card"]["webp"] == f"{second.rsplit('.', 1)[0]}/card.webp"
+        assert not [k for k in fake_s3.objects if k.startswith(first.rsplit(".", 1)[0] + "/")]
+
+    def test_missing_variants_fall_back_to_original(self, client, db, sample_property):
+        """Test a property uploaded before variants existed still gets its original for any size"""
+        db.query(Property).filter_by(id=sample_property).update({"image_url": "property_images/old.jpg"})
+        db.commit()
+        PresignCache.clear_local()
+
+        with patch('app.services.presign_cache.generate_presigned_view_url',
+                   side_effect=lambda key, expires_in: f"https://signed/{key}"):
+            response = client.get(f"/properties/{sample_property}/image-url", params={"size": "thumbnail"})
+
+        assert response.json() == {"image_url": "https://signed/property_images/old.jpg", "size": "original"}
+        assert client.get(f"/properties/{sample_property}/image-url", params={"size": "huge"}).status_code == 422
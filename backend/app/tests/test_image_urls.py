@@ -0,0 +1,101 @@
+import time
+from unittest.mock import patch
+
+import boto3
+import pytest
+import requests
+from moto import mock_aws
+
+from app.models.agent import Agent
+from app.models.property import Property
+from app.services.presign_cache import PresignCache
+from app.utils.aws_s3 import upload_file_to_s3
+
+
+class TestImageUrls:
+    def test_batch_resolves_in_one_query(self, client, db, make_property, count_queries):
+        """Test many image URLs come from one query and each key is signed once"""
+        agent = Agent(full_name="Img Agent", email="img@example.com", password_hash="x", phone_number="0500000000")
+        db.add(agent)
+        db.flush()
+        ids = [make_property(db, agent_id=agent.id, address=f"{i} Img St",
+                             image_url="property_images/shared.jpg" if i < 3 else None).id
+               for i in range(4)]
+        missing = "00000000-0000-0000-0000-000000000000"
+        PresignCache.clear_local()
+
+        with patch('app.services.presign_cache.generate_presigned_view_url',
+                   side_effect=lambda key, expires_in: f"https://signed/{key}") as mock_sign, count_queries() as queries:
+            response = client.post("/properties/image-urls", json={"property_ids": ids + [missing]})
+
+        assert response.status_code == 200
+        urls = response.json()["image_urls"]
+        assert urls == {**{i: "https://signed/property_images/shared.jpg" for i in ids[:3]}, ids[3]: None}
+        assert mock_sign.call_count == 1
+        assert queries.count == 1, queries.statements
+
+    def test_batch_size_is_limited(self, client):
+        """Test the batch endpoint rejects empty and oversized requests"""
+        assert client.post("/properties/image-urls", json={"property_ids": []}).status_code == 422
+        ids = ["00000000-0000-0000-0000-%012d" % i for i in range(101)]
+        assert client.post("/properties/image-urls", json={"property_ids": ids}).status_code == 422
+
+
+@pytest.fixture
+def moto_s3():
+    """moto's S3 in place of app.utils.aws_s3's client, with the bucket created - presigned URLs can be fetched"""
+    with mock_aws():
+        s3 = boto3.client("s3", region_name="us-east-2", aws_access_key_id="testing",
+                          aws_secret_access_key="testing")
+        s3.create_bucket(Bucket="test-bucket", CreateBucketConfiguration={"LocationConstraint": "us-east-2"})
+        with patch.multiple('app.utils.aws_s3', s3_client=s3, AWS_BUCKET="test-bucket"):
+            yield s3
+
+
+class TestPresignCache:
+    def test_cached_url_fetches_the_object(self, moto_s3):
+        """Test the URL handed out (fresh or cached) serves the uploaded image"""
+        PresignCache.clear_local()
+        assert upload_file_to_s3("property_images/a.jpg", b"image bytes", "image/jpeg")
+
+        for _ in range(2):  # signed, then from the LRU
+            response = requests.get(PresignCache.get_url("property_images/a.jpg"))
+            assert response.status_code == 200
+            assert response.content == b"image bytes"
+            assert response.headers["Content-Type"] == "image/jpeg"
+
+        assert requests.get(PresignCache.get_url("property_images/missing.jpg")).status_code == 404
+
+    def test_url_is_reused_until_near_expiry(self, client, db, sample_property, moto_s3):
+        """Test the image-url endpoint returns the same signed URL until it's close to expiring"""
+        key = f"property_images/{sample_property}.jpg"
+        db.query(Property).filter_by(id=sample_property).update({"image_url": key})
+        db.commit()
+        PresignCache.clear_local()
+        before = PresignCache.get_stats()
+
+        first = client.get(f"/properties/{sample_property}/image-url").json()["image_url"]
+        second = client.get(f"/properties/{sample_property}/image-url").json()["image_url"]
+        PresignCache._lru[key] = (first, time.time() + 10)  # about to expire
+        client.get(f"/properties/{sample_property}/image-url").json()["image_url"]
+
+        stats = PresignCache.get_stats()
+        assert first == second
+        assert "test-bucket" in first and "X-Amz-Signature" in first
+        assert stats["misses"] - before["misses"] == 2
+        assert stats["local_hits"] - before["local_hits"] == 1
+
+    def test_workers_share_urls_through_redis(self, fake_redis):
+        """Test a URL signed by one worker is reused by another, and invalidate drops it"""
+        PresignCache.clear_local()
+        with patch('app.services.presign_cache.get_redis_client', return_value=fake_redis), \
+                patch('app.services.presign_cache.generate_presigned_view_url',
+                      side_effect=lambda key, expires_in: f"https://signed/{key}/{time.time_ns()}") as mock_sign:
+            url = PresignCache.get_url("property_images/a.jpg")
+            PresignCache.clear_local()  # another worker
+            assert PresignCache.get_url("property_images/a.jpg") == url
+            assert mock_sign.call_count == 1
+
+            PresignCache.invalidate("property_images/a.jpg")
+            assert PresignCache.get_url("property_images/a.jpg") != url
+            assert mock_sign.call_count == 2
@@ -0,0 +1,109 @@
+import random
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from app.database import get_db
+from app.models.property import Property
+from app.services import property_index
+from app.services.property_index import PropertyIndex, load_rows, rebuild_property_index
+from app.services.property_service import build_search_query, search_properties_page
+
+CRITERIA = [
+    {},
+    {"city": "Haifa"},
+    {"city": "תל אביב", "max_price": 2500000},
+    {"agent_id": "agent-1", "min_rooms": 3, "max_rooms": 4},
+    {"property_type": "House", "min_price": 1500000},
+    {"min_floor": 2, "max_floor": 5, "yield_percent": 3},
+    {"rental_estimate_max": 6000, "city": "Eilat"},
+    {"city": "Atlantis"},
+]
+
+
+def _add_random(db, n, seed=0):
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    for i in range(n):
+        db.add(Property(
+            agent_id=rng.choice(["agent-1", "agent-2"]),
+            city=rng.choice(["Haifa", "Tel Aviv", "Eilat"]),
+            address=f"{i} Herzl St",
+            price=rng.randrange(800_000, 4_000_000, 50_000),
+            rooms=rng.choice([None, 2, 3, 4, 5]),
+            floor=rng.choice([None, 0, 1, 3, 6]),
+            property_type=rng.choice(["apartment", "house", "vacation"]),
+            rental_estimate=rng.choice([None, 4000, 5500, 7000]),
+            yield_percent=rng.choice([None, 2.5, 3.2, 4.1]),
+            created_at=start + timedelta(hours=rng.randrange(100)),  # ties exercise the id tie-breaker
+        ))
+    db.commit()
+
+
+@pytest.fixture
+def enabled_index():
+    with patch('app.services.property_index.Config.PROPERTY_INDEX_ENABLED', True):
+        yield
+    property_index._index = None
+
+
+class TestPropertyIndex:
+    def test_matches_sql(self, client):
+        """Test the index returns the same ids in the same order as the SQL search"""
+        db = next(client.app.dependency_overrides[get_db]())
+        _add_random(db, 200)
+        index = PropertyIndex.build(load_rows(db))
+
+        for criteria in CRITERIA:
+            expected = [p.id for p in build_search_query(criteria, db).all()]
+            assert index.search(criteria) == expected, criteria
+
+    def test_text_criteria_use_sql(self):
+        """Test address and description searches are left to SQL"""
+        index = PropertyIndex.build([])
+
+        assert index.search({"address": "Herzl"}) is None
+        assert index.search({"description_filters": ["pool"]}) is None
+
+    def test_write_hooks_keep_index_current(self, client, auth_token, enabled_index):
+        """Test create, update and delete are visible without a resync"""
+        headers = {"Authorization": f"Bearer {auth_token}"}
+        db = next(client.app.dependency_overrides[get_db]())
+        index = rebuild_property_index(db)
+
+        created = client.post("/properties/", json={"city": "Haifa", "address": "1 Herzl St", "price": 900000,
+                                                    "rental_estimate": 4000, "yield_percent": 5},
+                              headers=headers).json()
+        assert index.search({"city": "Haifa"}) == [created["id"]]
+
+        client.put(f"/properties/{created['id']}", json={"city": "Eilat"}, headers=headers)
+        assert index.search({"city": "Haifa"}) == []
+        assert index.search({"city": "Eilat"}) == [created["id"]]
+
+        client.delete(f"/properties/{created['id']}", headers=headers)
+        assert index.search({"city": "Eilat"}) == []
+
+    def test_pages_match_sql(self, client, enabled_index):
+        """Test paging from the index gives the SQL pages, and cursors work across both paths"""
+        db = next(client.app.dependency_overrides[get_db]())
+        _add_random(db, 60, seed=1)
+        criteria = {"city": "Haifa"}
+
+        def walk():
+            ids, cursor = [], None
+            while True:
+                page = search_properties_page(criteria, db, limit=7, cursor=cursor)
+                ids += [p.id for p in page["items"]]
+                cursor = page["next_cursor"]
+                if not cursor:
+                    return ids, page["total"]
+
+        sql_ids, sql_total = walk()
+        rebuild_property_index(db)
+        assert walk() == (sql_ids, sql_total)
+
+        first = search_properties_page(criteria, db, limit=7)
+        property_index._index = None  # continue on the SQL path
+        second = search_properties_page(criteria, db, limit=7, cursor=first["next_cursor"])
+        assert [p.id for p in second["items"]] == sql_ids[7:14]
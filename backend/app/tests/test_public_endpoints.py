@@ -1,3 +1,11 @@
+import json
+from datetime import datetime
+
+from app.database import get_db
+from app.models.property import Property
+from app.services.export_service import encode_ndjson, iter_export_batches
+
+
 class TestPublicEndpoints:
     def test_public_properties(self, client):
         """Test public properties endpoint (no auth required)"""
@@ -5,6 +13,117 @@ class TestPublicEndpoints:
         assert response.status_code == 200
         assert isinstance(response.json(), list)
 
+    def test_public_properties_select_only_public_columns(self, client, count_queries):
+        """Test the public list and detail read just the columns they return"""
+        db = next(client.app.dependency_overrides[get_db]())
+        prop = Property(agent_id="agent-1", city="Haifa", address="1 Herzl St", price=1000000, rooms=3,
+                        description="long text " * 100, image_url="properties/1.jpg")
+        db.add(prop)
+        db.commit()
+        property_id = prop.id
+
+        with count_queries() as queries:
+            listing = client.get("/public/properties").json()
+            detail = client.get(f"/public/properties/{property_id}").json()
+
+        assert listing == [detail]
+        assert detail == {"id": property_id, "city": "Haifa", "address": "1 Herzl St", "price": 1000000.0, "rooms": 3,
+                          "floor": None, "rental_estimate": None, "yield_percent": None}
+        assert not any("description" in s or "image_url" in s for s in queries.statements)
+        assert client.get("/public/properties/missing").status_code == 404
+
     def test_config_values(self):
         from app.config import Config
-        assert Config.SECRET_KEY is not None
\ No newline at end of file
+        assert Config.SECRET_KEY is not None
+
+class TestPublicExport:
+    def _add(self, db, n):
+        for i in range(n):
+            db.add(Property(agent_id="agent-1", city="Haifa", address=f"{i} Herzl St", price=1000000 + i,
+                            updated_at=datetime(2026, 1, 1 + i)))
+        db.commit()
+
+    def test_ndjson_streams_in_batches(self, client):
+        """Test NDJSON export sends one line per property, a batch at a time"""
+        db = next(client.app.dependency_overrides[get_db]())
+        self._add(db, 5)
+
+        response = client.get("/public/properties?format=ndjson", headers={"Accept-Encoding": "identity"})
+        rows = [json.loads(line) for line in response.text.splitlines()]
+
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert [r["price"] for r in rows] == [1000000.0 + i for i in range(5)]
+        assert rows[0]["updated_at"] == "2026-01-01T00:00:00"
+        assert len(list(encode_ndjson(iter_export_batches(db.get_bind(), batch_size=2)))) == 3
+
+    def test_json_export_gzip_and_updated_since(self, client):
+        """Test the JSON array export is gzipped on request and filtered by updated_since"""
+        self._add(next(client.app.dependency_overrides[get_db]()), 5)
+
+        response = client.get("/public/properties?format=json&updated_since=2026-01-04T00:00:00",
+                              headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert [r["address"] for r in response.json()] == ["3 Herzl St", "4 Herzl St"]
+        assert len(client.get("/public/properties?updated_since=2026-01-04T00:00:00").json()) == 2
+        assert client.get("/public/properties?format=json&updated_since=2030-01-01T00:00:00").json() == []
+
+
+class TestPublicCaching:
+    def test_listing_revalidates_with_etag(self, client, auth_token):
+        """Test the list answers If-None-Match with 304 until a property changes"""
+        headers = {"Authorization": f"Bearer {auth_token}"}
+        created = client.post("/properties/", json={"city": "Haifa", "address": "1 Herzl St", "price": 900000,
+                                                    "rental_estimate": 4000, "yield_percent": 5},
+                              headers=headers).json()
+
+        first = client.get("/public/properties")
+        etag = first.headers["etag"]
+        assert first.headers["last-modified"]
+
+        cached = client.get("/public/properties", headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.content == b""
+
+        client.put(f"/properties/{created['id']}", json={"price": 950000}, headers=headers)
+        changed = client.get("/public/properties", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["etag"] != etag
+
+        client.delete(f"/properties/{created['id']}", headers=headers)
+        assert client.get("/public/properties",
+                          headers={"If-None-Match": changed.headers["etag"]}).status_code == 200
+
+    def test_property_and_feed_etags(self, client):
+        """Test the detail and streamed feed support 304, per property / per query"""
+        db = next(client.app.dependency_overrides[get_db]())
+        prop = Property(agent_id="agent-1", city="Haifa", address="1 Herzl St", price=1000000)
+        db.add(prop)
+        db.commit()
+        url = f"/public/properties/{prop.id}"
+
+        etag = client.get(url).headers["etag"]
+        assert client.get(url, headers={"If-None-Match": f'"other", {etag}'}).status_code == 304
+
+        feed = client.get("/public/properties?format=ndjson")
+        assert feed.headers["etag"] not in (etag, client.get("/public/properties").headers["etag"])
+        assert client.get("/public/properties?format=ndjson",
+                          headers={"If-None-Match": feed.headers["etag"]}).status_code == 304
+
+    def test_if_modified_since(self, client):
+        """Test If-Modified-Since gets 304 at second precision, and If-None-Match wins when both are sent"""
+        db = next(client.app.dependency_overrides[get_db]())
+        prop = Property(agent_id="agent-1", city="Haifa", address="1 Herzl St", price=1000000,
+                        updated_at=datetime(2024, 5, 1, 12, 0, 0, 750000))
+        db.add(prop)
+        db.commit()
+
+        for url in (f"/public/properties/{prop.id}", "/public/properties"):
+            last_modified = client.get(url).headers["last-modified"]
+            assert last_modified == "Wed, 01 May 2024 12:00:00 GMT"
+
+            assert client.get(url, headers={"If-Modified-Since": last_modified}).status_code == 304
+            assert client.get(url, headers={"If-Modified-Since": "Wed, 01 May 2024 11:59:59 GMT"}).status_code == 200
+            assert client.get(url, headers={"If-Modified-Since": "yesterday"}).status_code == 200
+            assert client.get(url, headers={"If-Modified-Since": last_modified,
+                                            "If-None-Match": '"other"'}).status_code == 200
@@ -0,0 +1,40 @@
+from app.models.agent import Agent
+
+
+def _add_with_agents(db, make_property, n, start=0):
+    for i in range(start, start + n):
+        agent = Agent(full_name=f"Agent {i}", email=f"agent{i}@example.com", password_hash="x",
+                      phone_number="0500000000")
+        db.add(agent)
+        db.flush()
+        make_property(db, agent_id=agent.id, address=f"{i} Herzl St", price=1000000 + i, property_type="apartment")
+
+
+class TestQueryCounts:
+    def test_listing_loads_agent_once(self, client, auth_headers, count_queries):
+        """Test the agent's property list doesn't query per property"""
+        counts = []
+        for _ in range(2):
+            for i in range(4):
+                client.post("/properties/", json={"city": "Haifa", "address": f"{i} Herzl St", "price": 900000,
+                                                  "rental_estimate": 4000, "yield_percent": 5}, headers=auth_headers)
+            with count_queries() as queries:
+                response = client.get("/properties/", headers=auth_headers)
+            counts.append(queries.count)
+
+        assert len(response.json()) == 8
+        assert response.json()[0]["agent"]["full_name"] == "Test User"
+        assert counts[0] == counts[1], queries.statements
+
+    def test_chat_results_load_agents_in_one_query(self, client, db, make_property, count_queries):
+        """Test chat results from many agents don't query each agent"""
+        counts = []
+        for start, n in ((0, 2), (2, 8)):
+            _add_with_agents(db, make_property, n, start)
+            with count_queries() as queries:
+                result = client.post("/gpt/chat/", json={"question": "apartments in Haifa", "limit": 20}).json()
+            counts.append(queries.count)
+
+        assert len(result["results"]) == 10
+        assert all(r["agent"]["full_name"].startswith("Agent") for r in result["results"])
+        assert counts[0] == counts[1], queries.statements
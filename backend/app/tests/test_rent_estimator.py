@@ -0,0 +1,142 @@
+from unittest.mock import patch
+
+import numpy as np
+
+from app.jobs.rent_model import evaluate
+from app.models.property import Property
+from app.services.property_service import estimate_missing_metrics
+from app.services.rent_estimator import RentEstimator
+from app.utils.city_names import city_key
+
+
+def _listings(city, n, seed=0):
+    """Synthetic listings where rent grows with price and rooms"""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i in range(n):
+        price = float(rng.uniform(1_000_000, 4_000_000))
+        rooms = int(rng.integers(2, 6))
+        rent = 0.0028 * price + 300 * rooms
+        rows.append({
+            "id": f"{city}-{i}", "city": city, "price": price, "rooms": rooms, "floor": int(rng.integers(0, 10)),
+            "rental_estimate": rent, "yield_percent": rent * 12 / price * 100, "estimate_source": "gpt",
+        })
+    return rows
+
+
+class TestRentEstimator:
+    def test_predicts_close_to_training_data(self):
+        """Test per-city predictions follow the data"""
+        estimator = RentEstimator(min_rows=20).fit(_listings("Haifa", 200))
+
+        predicted = estimator.predict(2_000_000, "Haifa", rooms=3)
+        expected_rent = 0.0028 * 2_000_000 + 300 * 3
+
+        assert abs(predicted["rental_estimate"] - expected_rent) / expected_rent < 0.05
+        assert abs(predicted["yield_percent"] - expected_rent * 12 / 2_000_000 * 100) < 0.2
+
+    def test_sparse_city_falls_back(self):
+        """Test cities below min_rows are not modelled"""
+        estimator = RentEstimator(min_rows=20).fit(_listings("Haifa", 200) + _listings("Eilat", 5))
+
+        assert estimator.predict(2_000_000, "Eilat") is None
+        assert estimator.predict(2_000_000, "Haifa") is not None
+
+    def test_city_aliases_share_a_model(self):
+        """Test Hebrew and English city names hit the same model"""
+        estimator = RentEstimator(min_rows=20).fit(_listings("Tel Aviv", 50))
+
+        assert estimator.predict(2_000_000, "תל אביב") == estimator.predict(2_000_000, "tel-aviv")
+
+    def test_save_and_load(self, tmp_path):
+        """Test a saved model predicts the same after loading"""
+        estimator = RentEstimator(min_rows=20).fit(_listings("Haifa", 50))
+        path = tmp_path / "rent_model.json"
+        estimator.save(str(path))
+
+        loaded = RentEstimator.load(str(path))
+        assert loaded.predict(1_500_000, "Haifa", 4, 2) == estimator.predict(1_500_000, "Haifa", 4, 2)
+
+    def test_local_model_skips_gpt(self):
+        """Test modelled cities are estimated without GPT"""
+        estimator = RentEstimator(min_rows=20).fit(_listings("Haifa", 50))
+        property = Property(city="Haifa", address="1 Herzl St", price=2_000_000, rooms=3)
+
+        with patch('app.services.property_service.get_rent_estimator', return_value=estimator), \
+                patch('app.services.gpt_service.GPTService.estimate_property_metrics') as mock_estimate:
+            estimate_missing_metrics(property)
+
+        mock_estimate.assert_not_called()
+        assert property.rental_estimate is not None
+        assert property.yield_percent is not None
+        assert property.estimate_source == "model"
+
+    def test_half_agent_pair_is_not_tagged(self):
+        """Test a row where the agent typed one value and GPT the other isn't labelled gpt"""
+        property = Property(city="Eilat", address="1 Herzl St", price=2_000_000, rental_estimate=6000)
+
+        with patch('app.services.property_service.get_rent_estimator', return_value=None), \
+                patch('app.services.gpt_service.GPTService.estimate_property_metrics',
+                      return_value={"rental_estimate": 5000, "yield_percent": 3.1}):
+            estimate_missing_metrics(property)
+
+        assert float(property.rental_estimate) == 6000
+        assert float(property.yield_percent) == 3.1
+        assert property.estimate_source is None
+
+    def test_evaluation_report(self):
+        """Test the evaluation report covers modelled cities only"""
+        report = evaluate(_listings("Haifa", 200) + _listings("Eilat", 10), min_rows=20)
+
+        assert report["test_rows"] > 0
+        haifa, eilat = report["cities"][city_key("Haifa")], report["cities"][city_key("Eilat")]
+        assert haifa["covered"] == haifa["rows"]
+        assert eilat["covered"] == 0
+        assert report["rent"]["mape"] < 5
+
+    def test_model_predictions_are_not_learned_back(self):
+        """Test training and evaluation skip the model's own estimates"""
+        model_rows = [{**row, "estimate_source": "model", "rental_estimate": 1.0}
+                      for row in _listings("Haifa", 200, seed=1)]
+        agent_rows = [{**row, "estimate_source": "agent"} for row in _listings("Haifa", 100, seed=2)]
+
+        report = evaluate(_listings("Haifa", 200) + model_rows + agent_rows, min_rows=20)
+
+        assert report["train_rows"] + report["test_rows"] == 300
+        assert report["rent"]["mape"] < 5  # the bogus model rows would wreck this
+
+    def test_training_rows_come_from_agent_and_gpt(self, client):
+        """Test load_training_rows leaves out model estimates and unknown sources"""
+        from app.database import get_db
+        from app.jobs.rent_model import load_training_rows
+
+        db = next(client.app.dependency_overrides[get_db]())
+        for i, source in enumerate(["agent", "gpt", "model", None]):
+            db.add(Property(agent_id="a1", city="Haifa", address=f"{i} Herzl St", price=1_000_000,
+                            rental_estimate=4000, yield_percent=4.8, estimate_source=source))
+        db.commit()
+
+        assert sorted(row["estimate_source"] for row in load_training_rows(db)) == ["agent", "gpt"]
+
+    def test_agent_values_are_marked(self, client, auth_token):
+        """Test a property created with both values records the agent as their source"""
+        from app.database import get_db
+
+        headers = {"Authorization": f"Bearer {auth_token}"}
+        created = client.post("/properties/", json={"city": "Haifa", "address": "1 Herzl St", "price": 900000,
+                                                    "rental_estimate": 4000, "yield_percent": 5},
+                              headers=headers).json()
+
+        db = next(client.app.dependency_overrides[get_db]())
+        assert db.get(Property, created["id"]).estimate_source == "agent"
+
+        client.put(f"/properties/{created['id']}", json={"yield_percent": 6}, headers=headers)
+        db.expire_all()
+        assert db.get(Property, created["id"]).estimate_source == "agent"
+
+        # Agent value over one GPT estimate - neither source is right for the pair
+        db.get(Property, created["id"]).estimate_source = "gpt"
+        db.commit()
+        client.put(f"/properties/{created['id']}", json={"yield_percent": 5}, headers=headers)
+        db.expire_all()
+        assert db.get(Property, created["id"]).estimate_source is None
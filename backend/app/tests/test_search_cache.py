@@ -0,0 +1,45 @@
+from unittest.mock import patch
+
+from app.services.search_cache import SearchCache
+
+
+class TestSearchCache:
+    def test_equivalent_filters_share_key(self):
+        """Test filters that describe the same search hash to the same cache key"""
+        key = SearchCache._key({"city": "Tel Aviv", "max_price": 2000000, "description_filters": ["pool", "balcony"]},
+                               None, None)
+        same = SearchCache._key({"city": "תל אביב", "max_price": 2000000.0, "address": None,
+                                 "description_filters": ["balcony", "pool", "pool"]}, None, None)
+
+        assert key == same
+        assert key != SearchCache._key({"city": "Tel Aviv", "max_price": 2000000, "min_rooms": 3}, None, None)
+        assert key != SearchCache._key({"city": "Tel Aviv", "max_price": 2000000}, 5, None)
+
+    def test_writes_bump_generations(self, client, auth_headers):
+        """Test create/update/delete invalidate the agent and every city they touch"""
+        with patch('app.services.property_service.SearchCache.invalidate') as mock_invalidate:
+            created = client.post("/properties/", json={"city": "Haifa", "address": "1 Herzl St", "price": 900000,
+                                                        "rental_estimate": 4000, "yield_percent": 5},
+                                  headers=auth_headers).json()
+            agent_id = mock_invalidate.call_args.args[0]
+            assert agent_id
+            mock_invalidate.assert_called_with(agent_id, ["Haifa"])
+
+            client.put(f"/properties/{created['id']}", json={"city": "Eilat"}, headers=auth_headers)
+            mock_invalidate.assert_called_with(agent_id, ["Haifa", "Eilat"])
+
+            client.delete(f"/properties/{created['id']}", headers=auth_headers)
+            mock_invalidate.assert_called_with(agent_id, ["Eilat"])
+
+    def test_search_page_uses_cache(self, flexible_client, db, make_property):
+        """Test a cached page is served without running the search again"""
+        client, mock_gpt = flexible_client
+        prop = make_property(db, property_type="apartment")
+
+        cached = {"items": [prop], "next_cursor": None, "total": 1, "fuzzy": False}
+        with patch('app.services.chat_service.SearchCache.lookup', return_value=(cached, None)), \
+                patch('app.services.chat_service.search_properties_page') as mock_search:
+            result = client.post("/gpt/chat/", json={"question": "apartments in Haifa"}).json()
+
+        mock_search.assert_not_called()
+        assert [r["id"] for r in result["results"]] == [prop.id]
@@ -0,0 +1,85 @@
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.property_service import search_properties_page
+
+
+def _add_many(db, make_property, n, description=None):
+    return [make_property(db, address=f"{i} Herzl St", price=1000000 + i, property_type="apartment",
+                          description=description).id
+            for i in range(n)]
+
+
+def _all_pages(criteria, db, limit):
+    pages, cursor = [], None
+    while True:
+        page = search_properties_page(criteria, db, limit=limit, cursor=cursor)
+        pages.append(page)
+        cursor = page["next_cursor"]
+        if not cursor:
+            return pages
+
+
+class TestSearchPagination:
+    def test_pages_cover_every_result_once(self, db, make_property):
+        """Test cursors walk through all results newest first, without repeats"""
+        ids = _add_many(db, make_property, 7)
+
+        pages = _all_pages({"city": "Haifa"}, db, limit=3)
+
+        assert [len(p["items"]) for p in pages] == [3, 3, 1]
+        assert [prop.id for p in pages for prop in p["items"]] == list(reversed(ids))
+        assert all(p["total"] == 7 for p in pages)
+
+    def test_pages_keep_relevance_order(self, db, make_property):
+        """Test paging works when results are ranked by description relevance"""
+        plain = _add_many(db, make_property, 4, description="balcony")
+        best = _add_many(db, make_property, 2, description="balcony and pool")
+
+        pages = _all_pages({"description_filters": ["balcony", "pool"]}, db, limit=4)
+        seen = [prop.id for p in pages for prop in p["items"]]
+
+        assert set(seen[:2]) == set(best)
+        assert sorted(seen) == sorted(plain + best)
+
+    def test_chat_returns_cursor(self, flexible_client, db, make_property):
+        """Test /gpt/chat pages results and rejects bad cursors"""
+        client, mock_gpt = flexible_client
+        _add_many(db, make_property, 3)
+
+        first = client.post("/gpt/chat/", json={"question": "apartments in Haifa", "limit": 2}).json()
+        assert len(first["results"]) == 2
+        assert first["total"] == 3
+
+        second = client.post("/gpt/chat/", json={"question": "apartments in Haifa", "limit": 2,
+                                                 "cursor": first["next_cursor"]}).json()
+        assert len(second["results"]) == 1
+        assert second["next_cursor"] is None
+
+        response = client.post("/gpt/chat/", json={"question": "apartments in Haifa", "cursor": "garbage"})
+        assert response.status_code == 400
+
+    def test_cursor_only_continues_its_own_search(self, db, make_property):
+        """Test a cursor replayed against other criteria is refused instead of paging the wrong results"""
+        _add_many(db, make_property, 3)
+        make_property(db, city="Eilat", address="1 Coral St")
+        cursor = search_properties_page({"city": "Haifa"}, db, limit=2)["next_cursor"]
+
+        assert len(search_properties_page({"city": "חיפה"}, db, limit=2, cursor=cursor)["items"]) == 1
+        with pytest.raises(HTTPException) as error:
+            search_properties_page({"city": "Eilat"}, db, limit=2, cursor=cursor)
+        assert error.value.status_code == 400
+
+    def test_chat_limit_follows_config(self, flexible_client, db, make_property):
+        """Test /gpt/chat caps the page at SEARCH_MAX_PAGE_SIZE instead of its own bound"""
+        client, mock_gpt = flexible_client
+        _add_many(db, make_property, 3)
+
+        with patch('app.services.property_service.Config.SEARCH_MAX_PAGE_SIZE', 2):
+            response = client.post("/gpt/chat/", json={"question": "apartments in Haifa", "limit": 500})
+
+        assert response.status_code == 200
+        assert len(response.json()["results"]) == 2
+        assert response.json()["next_cursor"]
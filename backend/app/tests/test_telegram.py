@@ -0,0 +1,310 @@
+import asyncio
+import json
+import random
+import time
+from unittest.mock import patch
+
+import httpx
+
+from app.database import get_db
+from app.services.presign_cache import PresignCache
+from app.telegram.client import TelegramClient
+from app.telegram.delivery import deliver_property_results, plan_messages
+from app.telegram.rate_limit import RateLimiter, TokenBucket
+from app.telegram.update_queue import UpdateQueue
+
+
+def _update(update_id, chat_id, text="hi"):
+    return {"update_id": update_id, "message": {"chat": {"id": chat_id}, "text": text}}
+
+
+class TestUpdateQueue:
+    def test_chat_order_is_kept(self):
+        """Test each chat's updates are handled in arrival order while chats run concurrently"""
+        handled = []
+
+        async def handler(update):
+            await asyncio.sleep(random.uniform(0, 0.005))
+            handled.append((update["message"]["chat"]["id"], update["update_id"]))
+
+        async def scenario():
+            queue = UpdateQueue(handler, workers=3, capacity=300)
+            for update_id in range(60):
+                assert queue.submit(_update(update_id, chat_id=update_id % 5))
+            await queue.stop(timeout=5)
+            return queue.get_stats()
+
+        stats = asyncio.run(scenario())
+
+        assert stats["processed"] == 60
+        for chat_id in range(5):
+            ids = [update_id for chat, update_id in handled if chat == chat_id]
+            assert ids == sorted(ids) and len(ids) == 12
+
+    def test_full_queue_rejects(self):
+        """Test a full shard rejects updates and reports the backlog"""
+        async def scenario():
+            release = asyncio.Event()
+
+            async def handler(update):
+                await release.wait()
+
+            queue = UpdateQueue(handler, workers=1, capacity=2)
+            assert queue.submit(_update(1, chat_id=7))
+            await asyncio.sleep(0)  # the worker takes update 1 and blocks
+            results = [queue.submit(_update(i, chat_id=7)) for i in (2, 3, 4)]
+            stats = queue.get_stats()
+            release.set()
+            await queue.stop(timeout=5)
+            return results, stats
+
+        results, stats = asyncio.run(scenario())
+
+        assert results == [True, True, False]
+        assert stats["rejected"] == 1
+        assert stats["depth"] == 2
+        assert stats["utilization"] == 1.0
+
+    def test_webhook_acknowledges_immediately(self, client):
+        """Test the webhook queues updates and answers 503 when the queue is full"""
+        with patch('app.telegram.webhook.update_queue.submit', return_value=True) as mock_submit, \
+                patch('app.telegram.webhook.process_update') as mock_process:
+            response = client.post("/telegram/webhook", json=_update(1, chat_id=7))
+
+        assert response.json() == {"ok": True}
+        mock_submit.assert_called_once_with(_update(1, chat_id=7))
+        mock_process.assert_not_called()
+
+        with patch('app.telegram.webhook.update_queue.submit', return_value=False):
+            response = client.post("/telegram/webhook", json=_update(2, chat_id=7))
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+
+    def test_session_is_opened_only_inline(self, client):
+        """Test queue mode acknowledges without a DB session, and inline mode closes the one it opens"""
+        with patch('app.telegram.webhook.update_queue.submit', return_value=True), \
+                patch('app.telegram.webhook.SessionLocal') as mock_session:
+            client.post("/telegram/webhook", json=_update(3, chat_id=7))
+        mock_session.assert_not_called()
+
+        with patch('app.telegram.webhook.Config.TELEGRAM_INGEST_MODE', "inline"), \
+                patch('app.telegram.webhook.SessionLocal') as mock_session, \
+                patch('app.telegram.webhook.process_update', return_value={"ok": True}) as mock_process:
+            response = client.post("/telegram/webhook", json=_update(4, chat_id=7))
+
+        assert response.json() == {"ok": True}
+        mock_process.assert_called_once_with(_update(4, chat_id=7), mock_session.return_value)
+        mock_session.return_value.close.assert_called_once()
+
+
+class TestUpdateDedup:
+    def test_duplicate_updates_are_acknowledged_once(self, client):
+        """Test a redelivered update_id is acknowledged without being queued again"""
+        from app.telegram.webhook import update_dedup
+
+        duplicates = update_dedup.get_stats()["duplicates"]
+        with patch('app.telegram.webhook.update_queue.submit', return_value=True) as mock_submit:
+            first = client.post("/telegram/webhook", json=_update(5001, chat_id=7))
+            second = client.post("/telegram/webhook", json=_update(5001, chat_id=7))
+
+        assert first.json() == {"ok": True}
+        assert second.json() == {"ok": True, "duplicate": True}
+        assert mock_submit.call_count == 1
+        assert client.get("/telegram/stats").json()["dedup"]["duplicates"] == duplicates + 1
+
+    def test_rejected_update_can_be_redelivered(self, client):
+        """Test an update refused with 503 is processed when Telegram retries it"""
+        with patch('app.telegram.webhook.update_queue.submit', side_effect=[False, True]):
+            assert client.post("/telegram/webhook", json=_update(5002, chat_id=7)).status_code == 503
+            assert client.post("/telegram/webhook", json=_update(5002, chat_id=7)).json() == {"ok": True}
+
+    def test_local_memory_is_bounded(self):
+        """Test the in-process fallback forgets the oldest ids"""
+        from app.telegram.dedup import UpdateDeduplicator
+
+        dedup = UpdateDeduplicator(lru_size=2)
+        assert [dedup.first_time(i) for i in (1, 2, 2, 3)] == [True, True, False, True]
+        assert dedup.first_time(1)  # evicted
+        assert dedup.get_stats()["tracked_locally"] == 2
+
+
+class TestChatSearchState:
+    def test_show_more_state_is_shared_through_redis(self, fake_redis):
+        """Test "show more" state saved by one worker is read by another, and cleared on the last page"""
+        from app.telegram import chat_context
+
+        with patch('app.telegram.chat_context.get_redis_client', return_value=fake_redis):
+            chat_context.set_search_for_chat(7, "apartments in Haifa", "cursor-1")
+            chat_context._local_searches.clear()  # another worker
+            assert chat_context.get_search_for_chat(7) == ("apartments in Haifa", "cursor-1")
+
+            chat_context.set_search_for_chat(7, "apartments in Haifa", None)
+            assert chat_context.get_search_for_chat(7) is None
+
+    def test_local_fallback_is_bounded_and_expires(self):
+        """Test without Redis the state is an LRU that drops the oldest chats and expired searches"""
+        from app.telegram import chat_context
+
+        with patch('app.telegram.chat_context.get_redis_client', return_value=None), \
+                patch('app.telegram.chat_context.Config.TELEGRAM_SEARCH_LRU_SIZE', 2), \
+                patch('app.telegram.chat_context.time.time', return_value=1000.0) as mock_time:
+            for chat_id in (1, 2, 3):
+                chat_context.set_search_for_chat(chat_id, f"q{chat_id}", f"c{chat_id}")
+            assert chat_context.get_search_for_chat(1) is None
+            assert chat_context.get_search_for_chat(3) == ("q3", "c3")
+
+            mock_time.return_value = 1000.0 + chat_context.Config.TELEGRAM_SEARCH_TTL_SECONDS + 1
+            assert chat_context.get_search_for_chat(3) is None
+
+
+def _recording_client(calls):
+    def respond(request):
+        calls.append((request.url.path, json.loads(request.content)))
+        return httpx.Response(200, json={"ok": True, "result": {}})
+
+    http = httpx.AsyncClient(base_url="https://api.telegram.org", transport=httpx.MockTransport(respond))
+    return TelegramClient(token="T", http=http)
+
+
+class TestTelegramClient:
+    def test_helpers_build_bot_api_calls(self):
+        """Test the typed helpers post the Bot API method and payload"""
+        calls = []
+
+        async def scenario():
+            client = _recording_client(calls)
+            await client.send_message(7, "hi", parse_mode="Markdown")
+            await client.send_photo(7, "https://img/1.jpg")
+            await client.send_media_group(7, [{"type": "photo", "media": "https://img/1.jpg"}])
+            await client.edit_message_reply_markup(7, 42)
+            await client.answer_callback_query("q1", "done")
+            await client.aclose()
+
+        asyncio.run(scenario())
+
+        assert calls == [
+            ("/botT/sendMessage", {"chat_id": 7, "text": "hi", "parse_mode": "Markdown"}),
+            ("/botT/sendPhoto", {"chat_id": 7, "photo": "https://img/1.jpg"}),
+            ("/botT/sendMediaGroup", {"chat_id": 7, "media": [{"type": "photo", "media": "https://img/1.jpg"}]}),
+            ("/botT/editMessageReplyMarkup", {"chat_id": 7, "message_id": 42, "reply_markup": {"inline_keyboard": []}}),
+            ("/botT/answerCallbackQuery", {"callback_query_id": "q1", "text": "done"}),
+        ]
+
+    def test_errors_are_returned_not_raised(self):
+        """Test a transport failure is reported in the reply instead of raising"""
+        def fail(request):
+            raise httpx.ConnectError("down")
+
+        async def scenario():
+            client = TelegramClient(token="T", http=httpx.AsyncClient(transport=httpx.MockTransport(fail),
+                                                                      base_url="https://api.telegram.org"))
+            return await client.send_message(7, "hi")
+
+        assert asyncio.run(scenario())["ok"] is False
+
+    def test_updates_share_one_client(self, client):
+        """Test callback updates go through the shared client rather than a new connection each"""
+        from app.telegram.webhook import process_update
+
+        calls = []
+        telegram = _recording_client(calls)
+        db = next(client.app.dependency_overrides[get_db]())
+        update = {"callback_query": {"id": "q1", "data": "show_more",
+                                     "message": {"message_id": 3, "chat": {"id": 9101}}}}
+
+        async def scenario():
+            await process_update(update, db)
+            await process_update(update, db)
+
+        with patch('app.telegram.webhook.get_telegram_client', return_value=telegram), \
+                patch('app.telegram.webhook.get_search_for_chat', return_value=None):
+            asyncio.run(scenario())
+
+        assert [path for path, _ in calls] == ["/botT/editMessageReplyMarkup", "/botT/answerCallbackQuery"] * 2
+
+
+def _result(n):
+    return {"id": f"p{n}", "city": "Haifa", "address": f"Street {n}", "agent": {}}
+
+
+class TestResultDelivery:
+    def test_results_are_grouped_into_albums(self):
+        """Test results with images become albums and the rest one text message"""
+        results = [_result(n) for n in range(13)]
+        image_urls = {f"p{n}": f"https://img/{n}.jpg" for n in range(11)}
+
+        plan = plan_messages(results, image_urls)
+
+        assert [step[0] for step in plan] == ["album", "photo", "text"]
+        assert [m["media"] for m in plan[0][1]] == [f"https://img/{n}.jpg" for n in range(10)]
+        assert plan[0][1][3]["caption"].startswith("📍 Haifa, Street 3")
+        assert "Street 11" in plan[2][1] and "Street 12" in plan[2][1]
+
+    def test_page_is_sent_in_few_calls(self):
+        """Test a page of ten results with images takes one album plus the "show more" button"""
+        calls = []
+        result = {"results": [_result(n) for n in range(10)], "next_cursor": "c", "total": 25}
+
+        async def scenario():
+            client = _recording_client(calls)
+            return await deliver_property_results(client, 7, result, {f"p{n}": f"u{n}" for n in range(10)})
+
+        assert asyncio.run(scenario()) == 2
+        assert [path for path, _ in calls] == ["/botT/sendMediaGroup", "/botT/sendMessage"]
+
+    def test_image_keys_are_signed_in_process(self):
+        """Test result images are signed from their keys without calling our own API"""
+        from app.telegram.webhook import send_property_results
+
+        calls = []
+        results = [{**_result(n), "image_url": f"property_images/p{n}.jpg"} for n in range(2)]
+
+        async def scenario():
+            await send_property_results(_recording_client(calls), 7, {"results": results})
+
+        PresignCache.clear_local()
+        with patch('app.services.presign_cache.generate_presigned_view_url',
+                   side_effect=lambda key, expires_in: f"https://signed/{key}"):
+            asyncio.run(scenario())
+
+        assert [path for path, _ in calls] == ["/botT/sendMediaGroup"]
+        assert [m["media"] for m in calls[0][1]["media"]] == [f"https://signed/property_images/p{n}.jpg" for n in range(2)]
+
+
+class TestRateLimiting:
+    def test_bucket_limits_rate_after_burst(self):
+        """Test the burst goes out at once and further sends wait for tokens"""
+        async def scenario():
+            bucket = TokenBucket(rate=20, capacity=2)
+            started = time.monotonic()
+            for _ in range(2):
+                await bucket.acquire()
+            burst = time.monotonic() - started
+            for _ in range(3):
+                await bucket.acquire()
+            return burst, time.monotonic() - started
+
+        burst, total = asyncio.run(scenario())
+        assert burst < 0.05
+        assert total >= 0.14
+
+    def test_429_is_retried_after_retry_after(self):
+        """Test a 429 reply pauses the chat and the call is retried"""
+        replies = [
+            httpx.Response(429, json={"ok": False, "error_code": 429, "parameters": {"retry_after": 0.1}}),
+            httpx.Response(200, json={"ok": True, "result": {}}),
+        ]
+
+        async def scenario():
+            limiter = RateLimiter(global_rate=100, chat_rate=100, chat_burst=10)
+            http = httpx.AsyncClient(base_url="https://api.telegram.org",
+                                     transport=httpx.MockTransport(lambda request: replies.pop(0)))
+            client = TelegramClient(token="T", http=http, limiter=limiter)
+            started = time.monotonic()
+            reply = await client.send_message(7, "hi")
+            return reply, time.monotonic() - started, limiter.get_stats()
+
+        reply, elapsed, stats = asyncio.run(scenario())
+        assert reply["ok"] is True
+        assert elapsed >= 0.1
+        assert stats["throttled"] == 1 and stats["acquired"] == 2
@@ -2,6 +2,7 @@
 
 import boto3
 import os
+from typing import BinaryIO
 from botocore.exceptions import ClientError
 
 # טוען משתני סביבה
@@ -35,11 +36,61 @@ def upload_file_to_s3(key: str, content: bytes, content_type: str = "image/jpeg"
         return False
 
 
+class UploadTooLarge(Exception):
+    pass
+
+
+def upload_stream_to_s3(key: str, stream: BinaryIO, content_type: str, max_bytes: int,
+                        part_size: int = 8 * 2**20) -> bool:
+    """
+    Upload a file object to S3 without reading it whole: files up to one part go out
+    with a single put_object, bigger ones as a multipart upload, one part in memory at a time.
+    Blocking - call it from a thread pool.
+
+    Raises:
+        UploadTooLarge: more than max_bytes arrived (the multipart upload is aborted)
+    """
+    chunk = stream.read(part_size)
+    if len(chunk) < part_size:
+        if len(chunk) > max_bytes:
+            raise UploadTooLarge(key)
+        return upload_file_to_s3(key, chunk, content_type)
+
+    upload_id, completed = None, False
+    try:
+        upload_id = s3_client.create_multipart_upload(
+            Bucket=AWS_BUCKET, Key=key, ContentType=content_type
+        )["UploadId"]
+        parts, total = [], 0
+        while chunk:
+            total += len(chunk)
+            if total > max_bytes:
+                raise UploadTooLarge(key)
+            response = s3_client.upload_part(
+                Bucket=AWS_BUCKET, Key=key, UploadId=upload_id, PartNumber=len(parts) + 1, Body=chunk
+            )
+            parts.append({"PartNumber": len(parts) + 1, "ETag": response["ETag"]})
+            chunk = stream.read(part_size)
+
+        s3_client.complete_multipart_upload(
+            Bucket=AWS_BUCKET, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+        )
+        completed = True
+        return True
+    except ClientError as e:
+        print(f"[S3] Multipart upload failed: {e}")
+        return False
+    finally:
+        if upload_id and not completed:
+            # Otherwise S3 keeps (and bills) the uploaded parts
+            try:
+                s3_client.abort_multipart_upload(Bucket=AWS_BUCKET, Key=key, UploadId=upload_id)
+            except ClientError as e:
+                print(f"[S3] Abort multipart upload failed: {e}")
+
+
 def generate_presigned_view_url(key: str, expires_in: int = 3600) -> str | None:
     """Generate a presigned GET URL for a given S3 object key."""
-    print("🧾 AWS_ACCESS_KEY_ID:", os.getenv("AWS_ACCESS_KEY_ID"))
-    print("🧾 AWS_REGION:", os.getenv("AWS_REGION"))
-
     try:
         return s3_client.generate_presigned_url(
             "get_object",
@@ -51,6 +102,15 @@ def generate_presigned_view_url(key: str, expires_in: int = 3600) -> str | None:
         return None
 
 
+def download_s3_object(key: str) -> bytes | None:
+    """Read a whole S3 object (images, after the size limit checked at upload)."""
+    try:
+        return s3_client.get_object(Bucket=AWS_BUCKET, Key=key)["Body"].read()
+    except ClientError as e:
+        print(f"[S3] Download failed: {e}")
+        return None
+
+
 def delete_s3_object(key: str) -> bool:
     """Delete an object from S3."""
     try:
@@ -0,0 +1,52 @@
+# app/utils/city_names.py
+
+from typing import Optional
+
+# שם קנוני באנגלית -> כל הצורות המוכרות (אנגלית + עברית)
+CITY_NAMES = {
+    "Tel Aviv": ["tel aviv", "tel aviv yafo", "tel aviv jaffa", "tlv", "תל אביב", "תל אביב יפו", "ת\"א"],
+    "Jerusalem": ["jerusalem", "ירושלים"],
+    "Haifa": ["haifa", "חיפה"],
+    "Netanya": ["netanya", "natanya", "נתניה"],
+    "Herzliya": ["herzliya", "herzlia", "הרצליה"],
+    "Petah Tikva": ["petah tikva", "petah tiqva", "petach tikva", "פתח תקווה", "פתח תקוה", "פ\"ת"],
+    "Ramat Gan": ["ramat gan", "רמת גן"],
+    "Givatayim": ["givatayim", "givataim", "גבעתיים"],
+    "Rishon LeZion": ["rishon lezion", "rishon letzion", "rishon", "ראשון לציון"],
+    "Holon": ["holon", "חולון"],
+    "Bat Yam": ["bat yam", "בת ים"],
+    "Ashdod": ["ashdod", "אשדוד"],
+    "Ashkelon": ["ashkelon", "אשקלון"],
+    "Beer Sheva": ["beer sheva", "beersheba", "be'er sheva", "באר שבע"],
+    "Raanana": ["raanana", "ra'anana", "רעננה"],
+    "Kfar Saba": ["kfar saba", "כפר סבא"],
+    "Hod Hasharon": ["hod hasharon", "הוד השרון"],
+    "Modiin": ["modiin", "modi'in", "מודיעין"],
+    "Rehovot": ["rehovot", "רחובות"],
+    "Eilat": ["eilat", "אילת"],
+    "Nahariya": ["nahariya", "נהריה"],
+    "Hadera": ["hadera", "חדרה"],
+}
+
+# צורה -> שם קנוני
+CITY_ALIASES = {
+    alias: canonical
+    for canonical, aliases in CITY_NAMES.items()
+    for alias in aliases
+}
+
+
+def canonical_city(name: Optional[str]) -> Optional[str]:
+    """Returns the canonical English city name for a known alias, else None."""
+    if not name:
+        return None
+    key = " ".join(name.lower().replace("-", " ").split())
+    return CITY_ALIASES.get(key)
+
+
+def city_key(name: Optional[str]) -> str:
+    """
+    Stable lookup key for a city: the canonical name for known aliases,
+    otherwise the lowercased name with dashes and extra spaces removed.
+    """
+    return canonical_city(name) or " ".join((name or "").casefold().replace("-", " ").split())
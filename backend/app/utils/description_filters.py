@@ -1,7 +1,9 @@
 # app/utils/description_filters.py
 
-from typing import List
-from app.models.property import Property
+import re
+from typing import List, Optional
+from app.models.property import Property, DESCRIPTION_TSV, TSV_CONFIGS
+from sqlalchemy import case, func, literal_column
 from sqlalchemy.sql import or_
 
 FILTER_SYNONYMS = {
@@ -13,9 +15,12 @@ FILTER_SYNONYMS = {
     "elevator": ["elevator", "מעלית"],
     "parking": ["parking", "חניה"],
     "garden": ["garden", "חצר"],
-    "near metro": ["near metro", "train", "תחבורה ציבורית", "רכבת"],
+    "near metro": ["near metro", "train", "railway", "תחבורה ציבורית", "רכבת"],
 }
 
+# אותיות השימוש - "במרפסת", "ומרפסת", "החניה", "שבמרפסת" are separate words in a tsvector
+HEBREW_PREFIXES = ("ו", "ב", "ה", "ל", "מ", "ש", "כ", "וב", "וה", "ול", "ומ", "וש", "שב", "שה", "מה", "כש")
+
 
 def build_description_filters(keywords: List[str]):
     conditions = []
@@ -25,3 +30,54 @@ def build_description_filters(keywords: List[str]):
             # מחזיר תנאי SQLAlchemy אמיתי
             conditions.append(Property.description.ilike(f"%{syn}%"))
     return conditions
+
+
+def build_description_tsquery(keywords: List[str]) -> Optional[str]:
+    """
+    All keywords and their synonyms as one to_tsquery() string:
+    "near metro" -> "(near <-> metro) | train | railway | ..."
+    Hebrew words also match with a prefix letter: "מרפסת" -> "(מרפסת | ומרפסת | במרפסת | ...)".
+    """
+    terms = []
+    for keyword in keywords:
+        for syn in FILTER_SYNONYMS.get(keyword, [keyword]):
+            words = re.findall(r"\w+", syn.lower())
+            if not words:
+                continue
+            first = words[0]
+            if re.search(r"[֐-׿]", first):
+                # Only the first word of a phrase takes the prefix ("במרכז העיר")
+                first = "(" + " | ".join([first] + [p + first for p in HEBREW_PREFIXES]) + ")"
+            term = " <-> ".join([first] + words[1:])
+            terms.append(f"({term})" if len(words) > 1 else term)
+    return " | ".join(dict.fromkeys(terms)) or None
+
+
+def description_match(keywords: List[str], dialect: str):
+    """
+    Condition for description keywords and a relevance expression (higher is better).
+
+    Returns:
+        (condition, rank) or None if there is nothing to match
+    """
+    if not keywords:
+        return None
+
+    if dialect == "postgresql":
+        tsquery_text = build_description_tsquery(keywords)
+        if not tsquery_text:
+            return None
+
+        # Same configs the tsvector column is built from (English stems + plain Hebrew words)
+        tsquery = None
+        for config in TSV_CONFIGS:
+            term = func.to_tsquery(literal_column(f"'{config}'::regconfig"), tsquery_text)
+            tsquery = term if tsquery is None else tsquery.op("||")(term)
+
+        tsv = literal_column(f"properties.{DESCRIPTION_TSV}")
+        return tsv.op("@@")(tsquery), func.ts_rank(tsv, tsquery)
+
+    # SQLite and others - substring match, ranked by how many synonyms matched
+    conditions = build_description_filters(keywords)
+    score = sum(case((condition, 1), else_=0) for condition in conditions)
+    return or_(*conditions), score
@@ -0,0 +1,49 @@
+# app/utils/http_cache.py
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request
+
+
+def make_etag(*parts) -> str:
+    """
+    Weak ETag from the parts that determine a response (a version, not the body -
+    so it's known before anything is serialized). Weak because gzip and identity
+    encodings of the same data share it.
+    """
+    digest = hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """
+    If-None-Match check with weak comparison (RFC 9110 13.1.2). Without it, falls back
+    to If-Modified-Since against last_modified (naive UTC) at the header's second precision.
+    """
+    header = request.headers.get("if-none-match")
+    if header:
+        if header.strip() == "*":
+            return True
+        tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+        return etag.removeprefix("W/") in tags
+
+    since = request.headers.get("if-modified-since")
+    if not since or not last_modified:
+        return False
+    try:
+        since = parsedate_to_datetime(since)
+    except (TypeError, ValueError):
+        return False  # unparsable dates are ignored (RFC 9110 13.1.3)
+    if since.tzinfo is None:
+        return False
+    return last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= since
+
+
+def cache_headers(etag: str, last_modified: Optional[datetime]) -> dict:
+    # no-cache - clients may store the response but revalidate it every time
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified:
+        headers["Last-Modified"] = format_datetime(last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+    return headers
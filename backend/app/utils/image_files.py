@@ -0,0 +1,29 @@
+# app/utils/image_files.py
+from typing import Optional, Tuple
+
+SNIFF_BYTES = 12
+
+# (magic bytes, offset) -> content type, extension
+_SIGNATURES = [
+    (b"\xff\xd8\xff", 0, "image/jpeg", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", 0, "image/png", ".png"),
+    (b"GIF87a", 0, "image/gif", ".gif"),
+    (b"GIF89a", 0, "image/gif", ".gif"),
+    (b"WEBP", 8, "image/webp", ".webp"),  # after "RIFF" + size
+]
+
+
+def sniff_image_type(head: bytes) -> Optional[Tuple[str, str]]:
+    """
+    Content type and extension from the file's first bytes - the client's filename
+    and Content-Type header are not trusted.
+
+    Returns:
+        (content_type, extension), or None if it isn't an image we accept
+    """
+    for magic, offset, content_type, extension in _SIGNATURES:
+        if head[offset:offset + len(magic)] == magic:
+            if magic == b"WEBP" and not head.startswith(b"RIFF"):
+                continue
+            return content_type, extension
+    return None
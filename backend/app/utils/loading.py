@@ -0,0 +1,13 @@
+# app/utils/loading.py
+"""
+Relationship loading for queries whose rows are serialized with PropertyOut.
+PropertyOut includes property.agent, so without these options every row
+lazy-loads its agent with its own SELECT (N+1).
+"""
+from sqlalchemy.orm import selectinload
+
+from app.models.property import Property
+
+# One SELECT ... WHERE agents.id IN (...) per batch of properties, skipping agents
+# already in the session. Works with LIMIT and yield_per, unlike a collection join.
+PROPERTY_WITH_AGENT = (selectinload(Property.agent),)
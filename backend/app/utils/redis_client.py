@@ -10,13 +10,15 @@ def get_redis_client() -> Optional[redis.Redis]:
 
     if _redis_client is None:
         try:
-            _redis_client = redis.from_url(
+            client = redis.from_url(
                 Config.REDIS_URL,
                 decode_responses=True,
                 socket_connect_timeout=5,
                 socket_timeout=5
             )
-            _redis_client.ping()
+            client.ping()
+            # Publish only after ping, so other threads never see an unchecked client
+            _redis_client = client
             print("✅ Redis connected successfully")
         except Exception as e:
             print(f"⚠️ Redis connection failed: {e}")
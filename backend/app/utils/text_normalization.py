@@ -0,0 +1,68 @@
+# app/utils/text_normalization.py
+
+import hashlib
+import re
+import unicodedata
+
+# טעמים וניקוד, בלי מקף עברי (U+05BE) וסימני פיסוק
+NIQQUD = re.compile(r"[\u0591-\u05BD\u05BF\u05C1\u05C2\u05C4\u05C5\u05C7]")
+
+MAGNITUDES = {
+    "million": 1_000_000, "m": 1_000_000, "מיליון": 1_000_000, "מליון": 1_000_000,
+    "thousand": 1_000, "k": 1_000, "אלף": 1_000,
+}
+AMOUNT = re.compile(r"(?<![\w.])(\d+(?:\.\d+)?)(?:\s*(million|thousand|מיליון|מליון|אלף)|(m|k))(?!\w)")
+
+# סימנים שמשנים את המשמעות - נשמרים כמילים לפני שהפיסוק נמחק
+# ("3+ rooms" is not "3 rooms", "<2M" is not ">2M", "floor -1" is not "floor 1")
+SYMBOL_WORDS = [
+    (re.compile(r"(?<=\d)\s*\+"), " and up "),
+    (re.compile(r"<=|≤"), " up to "),
+    (re.compile(r">=|≥"), " at least "),
+    (re.compile(r"<"), " under "),
+    (re.compile(r">"), " over "),
+    (re.compile(r"(?<![\w.])-(?=\d)"), " minus "),
+]
+
+KEY_LENGTH = 32
+
+
+def _expand_amount(match) -> str:
+    unit = match.group(2) or match.group(3)
+    value = float(match.group(1)) * MAGNITUDES[unit]
+    return str(int(value)) if value.is_integer() else str(value)
+
+
+def normalize_question(question: str) -> str:
+    """
+    Canonical form of a search question for cache lookups.
+
+    "Apartments in Tel-Aviv?" and "apartments in tel aviv " both become
+    "apartments in tel aviv"; "2 million" and "2,000,000" both become "2000000".
+    Symbols that carry meaning become words first: "3+" -> "3 and up", "<" -> "under".
+    """
+    text = unicodedata.normalize("NFKC", question or "")
+    text = NIQQUD.sub("", text).casefold()
+
+    # ספרות מכל כתב -> ספרות ASCII
+    text = "".join(str(unicodedata.decimal(c)) if c.isdecimal() and not c.isascii() else c for c in text)
+    text = re.sub(r"(?<=\d)[,_](?=\d{3}(?!\d))", "", text)
+    text = AMOUNT.sub(_expand_amount, text)
+    for pattern, words in SYMBOL_WORDS:
+        text = pattern.sub(words, text)
+
+    # פיסוק -> רווח, חוץ מנקודה עשרונית, אחוז ושקל
+    text = re.sub(r"[^\w\s.%₪]", " ", text)
+    text = re.sub(r"(?<!\d)\.|\.(?!\d)", " ", text)
+    return " ".join(text.split())
+
+
+def question_key(question: str) -> str:
+    """Fixed-length hash of the normalized question."""
+    normalized = normalize_question(question)
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=KEY_LENGTH // 2).hexdigest()
+
+
+def raw_question_key(question: str) -> str:
+    """Hash of the question exactly as typed - used to measure normalization gains."""
+    return hashlib.blake2b((question or "").encode("utf-8"), digest_size=KEY_LENGTH // 2).hexdigest()
@@ -0,0 +1,79 @@
+# benchmarks/data.py
+"""Random listings for the benchmarks. Import before app modules - app.database needs DATABASE_URL."""
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import insert
+
+from app.models.agent import Agent
+from app.models.property import Property
+from app.utils.city_names import city_key
+
+CITIES = ["Tel Aviv", "Haifa", "Jerusalem", "Eilat", "Netanya", "Ashdod", "Beersheba", "Herzliya"]
+TYPES = ["apartment", "house", "vacation"]
+WORDS = ["balcony", "parking", "elevator", "renovated", "sea view", "quiet street", "near schools", "storage",
+         "sunny", "garden", "pool", "safe room", "air conditioning", "close to the train", "spacious"]
+
+
+def fill(engine, size: int, seed: int = 0) -> str:
+    """Inserts size random properties (100 per agent). Returns one agent id."""
+    rng = random.Random(seed)
+    agents = [str(uuid.uuid4()) for _ in range(max(size // 100, 1))]
+    start = datetime(2024, 1, 1)
+
+    with engine.begin() as conn:
+        conn.execute(insert(Agent), [
+            {"id": a, "full_name": "Bench", "email": f"{a}@bench.local", "password_hash": "x"} for a in agents
+        ])
+        for offset in range(0, size, 50_000):
+            rows = []
+            for _ in range(min(50_000, size - offset)):
+                city = rng.choice(CITIES)
+                property_id = str(uuid.uuid4())
+                rows.append({
+                    "id": property_id,
+                    "agent_id": rng.choice(agents),
+                    "city": city,
+                    "city_canonical": city_key(city),
+                    "address": f"{rng.randrange(1, 200)} Herzl St",
+                    "price": rng.randrange(700_000, 6_000_000, 10_000),
+                    "rooms": rng.choice([None, 1, 2, 3, 4, 5, 6]),
+                    "floor": rng.choice([None, 0, 1, 2, 3, 5, 8, 12]),
+                    "property_type": rng.choice(TYPES),
+                    "rental_estimate": rng.choice([None, rng.randrange(2500, 15000, 100)]),
+                    "yield_percent": rng.choice([None, round(rng.uniform(2, 6), 2)]),
+                    # Agents write a few paragraphs - the bulk of a row
+                    "description": ". ".join(rng.choices(WORDS, k=rng.randrange(20, 120))),
+                    "image_url": f"properties/{property_id}.jpg",
+                    "created_at": start + timedelta(minutes=rng.randrange(1_000_000)),
+                    "estimate_attempts": 0,
+                })
+            conn.execute(insert(Property), rows)
+    return agents[0]
+
+
+def timed(fn, repeat: int) -> float:
+    """Median milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def database_urls(sizes: list, database_url: str = None):
+    """(size, url) per run - a fresh temporary SQLite file each time unless a scratch database is given"""
+    for size in sizes:
+        if database_url:
+            yield size, database_url
+            continue
+        with tempfile.TemporaryDirectory() as tmp:
+            yield size, f"sqlite:///{os.path.join(tmp, 'bench.db')}"
@@ -0,0 +1,115 @@
+# benchmarks/image_upload.py
+"""
+Property image upload: reading the whole file then put_object vs streaming multipart.
+Each path runs in its own process so the peak RSS of one doesn't hide the other.
+S3 is a sink that keeps nothing and takes a few ms per request, like a fast network.
+
+    python -m benchmarks.image_upload                      # 8 concurrent 20 MB uploads
+    python -m benchmarks.image_upload --uploads 16 --size-mb 20
+"""
+import argparse
+import asyncio
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import UploadFile
+
+from app.utils import aws_s3
+
+PART_BYTES = 8 * 2**20
+
+
+class SinkS3:
+    def _send(self, body):
+        time.sleep(0.005 + len(body) / (500 * 2**20))  # ~500 MB/s
+
+    def put_object(self, Body, **kwargs):
+        self._send(Body)
+
+    def create_multipart_upload(self, **kwargs):
+        return {"UploadId": "bench"}
+
+    def upload_part(self, Body, PartNumber, **kwargs):
+        self._send(Body)
+        return {"ETag": str(PartNumber)}
+
+    def complete_multipart_upload(self, **kwargs):
+        pass
+
+    def abort_multipart_upload(self, **kwargs):
+        pass
+
+
+def make_upload(size: int) -> UploadFile:
+    """Like Starlette's multipart parser: spooled to disk above 1 MB"""
+    spooled = tempfile.SpooledTemporaryFile(max_size=2**20)
+    block = b"\xff\xd8\xff" + b"\x00" * (2**20 - 3)
+    for _ in range(size // len(block)):
+        spooled.write(block)
+    spooled.seek(0)
+    return UploadFile(spooled, size=size, filename="photo.jpg")
+
+
+async def buffered(file: UploadFile, key: str):
+    """The previous route body: the whole file in memory, blocking put_object on the event loop"""
+    content = await file.read()
+    aws_s3.upload_file_to_s3(key, content, "image/jpeg")
+
+
+async def streaming(file: UploadFile, key: str):
+    await file.seek(0)
+    await run_in_threadpool(aws_s3.upload_stream_to_s3, key, file.file, "image/jpeg", 2**31, PART_BYTES)
+
+
+async def measure(path, uploads: int, size: int):
+    files = [make_upload(size) for _ in range(uploads)]
+    stalls = []
+
+    async def ticker():
+        # How long the event loop went without running - other requests wait that long
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(0.001)
+            stalls.append(time.perf_counter() - started)
+
+    tick = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    await asyncio.gather(*(path(f, f"bench/{i}.jpg") for i, f in enumerate(files)))
+    elapsed = time.perf_counter() - started
+    tick.cancel()
+    return elapsed, max(stalls, default=0.0)
+
+
+def run_one(name: str, uploads: int, size_mb: int):
+    aws_s3.s3_client = SinkS3()
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    elapsed, stall = asyncio.run(measure({"buffered": buffered, "streaming": streaming}[name],
+                                         uploads, size_mb * 2**20))
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{name:<12}{elapsed * 1000:>10.0f}{stall * 1000:>14.0f}{peak:>12.1f}{peak - baseline:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Buffered vs streaming image upload benchmark")
+    parser.add_argument("--uploads", type=int, default=8)
+    parser.add_argument("--size-mb", type=int, default=20)
+    parser.add_argument("--run", choices=["buffered", "streaming"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run_one(args.run, args.uploads, args.size_mb)
+        return
+
+    print(f"=== {args.uploads} concurrent uploads of {args.size_mb} MB ===")
+    print(f"{'path':<12}{'ms':>10}{'loop stall ms':>14}{'peak MiB':>12}{'+MiB':>12}")
+    for name in ("buffered", "streaming"):
+        subprocess.run([sys.executable, "-m", "benchmarks.image_upload", "--run", name,
+                        "--uploads", str(args.uploads), "--size-mb", str(args.size_mb)], check=True)
+
+
+if __name__ == "__main__":
+    main()
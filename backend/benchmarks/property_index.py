@@ -0,0 +1,87 @@
+# benchmarks/property_index.py
+"""
+In-memory property index vs the SQL search.
+
+    python -m benchmarks.property_index                        # 10k, 100k, 1M rows in a temporary SQLite file
+    python -m benchmarks.property_index --sizes 10000 100000
+    python -m benchmarks.property_index --database-url postgresql://...   # an EMPTY scratch database
+
+The tables are created and filled by the benchmark - never point it at real data.
+"""
+import argparse
+import time
+
+from benchmarks.data import database_urls, fill, timed  # first - sets up DATABASE_URL
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import Config
+from app.database import Base
+from app.models.property import Property
+from app.services import property_index
+from app.services.property_index import PropertyIndex, load_rows
+from app.services.property_service import build_search_query, search_properties_page
+
+QUERIES = {
+    "city": {"city": "Haifa"},
+    "city+price+rooms": {"city": "Tel Aviv", "max_price": 2500000, "min_rooms": 3},
+    "agent+type": {"agent_id": None, "property_type": "house"},  # agent filled in at run time
+    "yield+rent": {"yield_percent": 4, "rental_estimate_max": 6000},
+    "no matches": {"city": "Eilat", "min_price": 9000000},
+}
+
+
+def run(size: int, database_url: str, repeat: int):
+    engine = create_engine(database_url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+
+    started = time.perf_counter()
+    agent_id = fill(engine, size)
+    print(f"\n=== {size:,} properties (filled in {time.perf_counter() - started:.1f}s) ===")
+
+    started = time.perf_counter()
+    index = PropertyIndex.build(load_rows(db))
+    build_seconds = time.perf_counter() - started
+    memory = sum(a.nbytes for a in [index._ids, index._created, index._alive,
+                                    *index._numeric.values(), *index._codes.values()])
+    print(f"Index build {build_seconds:.2f}s, arrays {memory / 2**20:.1f} MiB")
+
+    print(f"{'query':<18}{'matches':>9}{'SQL ids ms':>12}{'index ms':>10}{'SQL page ms':>13}{'index page ms':>15}")
+    for name, criteria in QUERIES.items():
+        criteria = {**criteria, "agent_id": agent_id} if "agent_id" in criteria else criteria
+        sql_ids = lambda: build_search_query(criteria, db).with_entities(Property.id).all()
+        matches = len(index.search(criteria))
+        assert matches == len(sql_ids())
+
+        property_index._index = None
+        sql_page = timed(lambda: search_properties_page(criteria, db, limit=10), repeat)
+        property_index._index = index
+        index_page = timed(lambda: search_properties_page(criteria, db, limit=10), repeat)
+        property_index._index = None
+
+        print(f"{name:<18}{matches:>9}{timed(sql_ids, repeat):>12.2f}{timed(lambda: index.search(criteria), repeat):>10.2f}"
+              f"{sql_page:>13.2f}{index_page:>15.2f}")
+
+    db.close()
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Property index vs SQL search benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--database-url", default=None, help="empty scratch database (default: temporary SQLite file)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    Config.PROPERTY_INDEX_ENABLED = True
+    Config.FUZZY_MATCH_ENABLED = False  # compare the exact path only
+
+    for size, database_url in database_urls(args.sizes, args.database_url):
+        run(size, database_url, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
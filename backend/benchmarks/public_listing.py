@@ -0,0 +1,72 @@
+# benchmarks/public_listing.py
+"""
+GET /public/properties: ORM objects vs the column projection.
+
+    python -m benchmarks.public_listing                 # 100k rows in a temporary SQLite file
+    python -m benchmarks.public_listing --sizes 10000 100000
+    python -m benchmarks.public_listing --database-url postgresql://...   # an EMPTY scratch database
+"""
+import argparse
+import tracemalloc
+
+from benchmarks.data import database_urls, fill, timed  # first - sets up DATABASE_URL
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.property import Property
+from app.schemas.property import PublicPropertyOut
+from app.services.property_service import get_public_property_rows
+
+
+def orm_listing(Session):
+    """The previous endpoint body: full ORM rows, trimmed by the response model"""
+    with Session() as db:
+        return [PublicPropertyOut.model_validate(p).model_dump() for p in db.query(Property).all()]
+
+
+def projected_listing(Session):
+    with Session() as db:
+        return [PublicPropertyOut.model_validate(row).model_dump() for row in get_public_property_rows(db)]
+
+
+def peak_mib(fn) -> float:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+
+def run(size: int, database_url: str, repeat: int):
+    engine = create_engine(database_url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    fill(engine, size)
+
+    assert orm_listing(Session) == projected_listing(Session)
+
+    print(f"\n=== {size:,} properties ===")
+    print(f"{'path':<12}{'ms':>10}{'peak MiB':>10}")
+    for name, listing in (("ORM", orm_listing), ("projection", projected_listing)):
+        print(f"{name:<12}{timed(lambda: listing(Session), repeat):>10.0f}{peak_mib(lambda: listing(Session)):>10.1f}")
+
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Public listing ORM vs projection benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000])
+    parser.add_argument("--database-url", default=None, help="empty scratch database (default: temporary SQLite file)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for size, database_url in database_urls(args.sizes, args.database_url):
+        run(size, database_url, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""add property estimate status
+
+Revision ID: a7c3e91f4b20
+Revises: d16598e2c455
+Create Date: 2026-10-18 10:12:41.208314
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e91f4b20'
+down_revision: Union[str, Sequence[str], None] = 'd16598e2c455'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('properties', sa.Column('estimate_status', sa.String(length=20), nullable=True))
+    op.add_column('properties', sa.Column('estimate_attempts', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('properties', sa.Column('estimate_error', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('properties', 'estimate_error')
+    op.drop_column('properties', 'estimate_attempts')
+    op.drop_column('properties', 'estimate_status')
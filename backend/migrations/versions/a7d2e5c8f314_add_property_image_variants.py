@@ -0,0 +1,28 @@
+"""add property image_variants
+
+Revision ID: a7d2e5c8f314
+Revises: f3c6a9d1b842
+Create Date: 2026-10-18 18:21:07.503912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d2e5c8f314'
+down_revision: Union[str, Sequence[str], None] = 'f3c6a9d1b842'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('properties', sa.Column('image_variants', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('properties', 'image_variants')
@@ -0,0 +1,39 @@
+"""add property search indexes
+
+Revision ID: b4e2d8a61c37
+Revises: a7c3e91f4b20
+Create Date: 2026-10-18 11:02:17.554190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4e2d8a61c37'
+down_revision: Union[str, Sequence[str], None] = 'a7c3e91f4b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_properties_agent_city_price', ['agent_id', 'city', 'price']),
+    ('ix_properties_agent_type_rooms', ['agent_id', 'property_type', 'rooms']),
+    ('ix_properties_city_type_rooms', ['city', 'property_type', 'rooms']),
+    ('ix_properties_price', ['price']),
+    ('ix_properties_rental_estimate', ['rental_estimate']),
+    ('ix_properties_yield_percent', ['yield_percent']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, columns in INDEXES:
+        op.create_index(name, 'properties', columns, unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name='properties')
@@ -0,0 +1,31 @@
+"""add property estimate_source
+
+Revision ID: b8e3f6a1c925
+Revises: a7d2e5c8f314
+Create Date: 2026-10-18 19:40:12.661054
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e3f6a1c925'
+down_revision: Union[str, Sequence[str], None] = 'a7d2e5c8f314'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # No backfill: before estimate_status existed, create_property filled missing values inline
+    # from GPT, so existing rows can't be told apart from agent-typed ones. They stay NULL and
+    # out of the training data; new and updated rows are tagged by property_service.
+    op.add_column('properties', sa.Column('estimate_source', sa.String(length=10), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('properties', 'estimate_source')
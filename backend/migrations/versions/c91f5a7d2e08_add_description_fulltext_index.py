@@ -0,0 +1,42 @@
+"""add description full-text index
+
+Revision ID: c91f5a7d2e08
+Revises: b4e2d8a61c37
+Create Date: 2026-10-18 11:48:03.117642
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c91f5a7d2e08'
+down_revision: Union[str, Sequence[str], None] = 'b4e2d8a61c37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # tsvector / GIN are Postgres-only; other databases keep the ILIKE search
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("""
+        ALTER TABLE properties ADD COLUMN IF NOT EXISTS description_tsv tsvector
+            GENERATED ALWAYS AS (
+                to_tsvector('english', coalesce(description, '')) || to_tsvector('simple', coalesce(description, ''))
+            ) STORED
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_properties_description_tsv ON properties USING GIN (description_tsv)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("DROP INDEX IF EXISTS ix_properties_description_tsv")
+    op.execute("ALTER TABLE properties DROP COLUMN IF EXISTS description_tsv")
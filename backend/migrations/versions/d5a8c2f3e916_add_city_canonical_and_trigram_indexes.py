@@ -0,0 +1,92 @@
+"""add city_canonical and trigram indexes
+
+Revision ID: d5a8c2f3e916
+Revises: c91f5a7d2e08
+Create Date: 2026-10-18 12:31:44.902175
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a8c2f3e916'
+down_revision: Union[str, Sequence[str], None] = 'c91f5a7d2e08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copy of app.utils.city_names at this revision - the migration must backfill
+# the same keys whenever it runs, whatever the app's city list has become since.
+_CITY_NAMES = {
+    "Tel Aviv": ["tel aviv", "tel aviv yafo", "tel aviv jaffa", "tlv", "תל אביב", "תל אביב יפו", "ת\"א"],
+    "Jerusalem": ["jerusalem", "ירושלים"],
+    "Haifa": ["haifa", "חיפה"],
+    "Netanya": ["netanya", "natanya", "נתניה"],
+    "Herzliya": ["herzliya", "herzlia", "הרצליה"],
+    "Petah Tikva": ["petah tikva", "petah tiqva", "petach tikva", "פתח תקווה", "פתח תקוה", "פ\"ת"],
+    "Ramat Gan": ["ramat gan", "רמת גן"],
+    "Givatayim": ["givatayim", "givataim", "גבעתיים"],
+    "Rishon LeZion": ["rishon lezion", "rishon letzion", "rishon", "ראשון לציון"],
+    "Holon": ["holon", "חולון"],
+    "Bat Yam": ["bat yam", "בת ים"],
+    "Ashdod": ["ashdod", "אשדוד"],
+    "Ashkelon": ["ashkelon", "אשקלון"],
+    "Beer Sheva": ["beer sheva", "beersheba", "be'er sheva", "באר שבע"],
+    "Raanana": ["raanana", "ra'anana", "רעננה"],
+    "Kfar Saba": ["kfar saba", "כפר סבא"],
+    "Hod Hasharon": ["hod hasharon", "הוד השרון"],
+    "Modiin": ["modiin", "modi'in", "מודיעין"],
+    "Rehovot": ["rehovot", "רחובות"],
+    "Eilat": ["eilat", "אילת"],
+    "Nahariya": ["nahariya", "נהריה"],
+    "Hadera": ["hadera", "חדרה"],
+}
+_CITY_ALIASES = {alias: canonical for canonical, aliases in _CITY_NAMES.items() for alias in aliases}
+
+
+def _city_key(name):
+    normalized = " ".join((name or "").lower().replace("-", " ").split())
+    return _CITY_ALIASES.get(normalized) or " ".join((name or "").casefold().replace("-", " ").split())
+
+
+def _recreate_city_indexes(column: str) -> None:
+    op.drop_index('ix_properties_agent_city_price', table_name='properties')
+    op.drop_index('ix_properties_city_type_rooms', table_name='properties')
+    op.create_index('ix_properties_agent_city_price', 'properties', ['agent_id', column, 'price'], unique=False)
+    op.create_index('ix_properties_city_type_rooms', 'properties', [column, 'property_type', 'rooms'], unique=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('properties', sa.Column('city_canonical', sa.String(length=100), nullable=True))
+
+    # Backfill - new rows get it from Property's city validator.
+    # One executemany UPDATE per distinct city spelling, not per row.
+    bind = op.get_bind()
+    properties = sa.table('properties', sa.column('city', sa.String), sa.column('city_canonical', sa.String))
+    cities = bind.execute(sa.select(properties.c.city).distinct()).scalars().all()
+    if cities:
+        bind.execute(
+            properties.update().where(properties.c.city == sa.bindparam('old_city'))
+            .values(city_canonical=sa.bindparam('key')),
+            [{'old_city': city, 'key': _city_key(city)} for city in cities],
+        )
+
+    _recreate_city_indexes('city_canonical')
+
+    if bind.dialect.name == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute("CREATE INDEX IF NOT EXISTS ix_properties_city_trgm ON properties USING GIN (city gin_trgm_ops)")
+        op.execute("CREATE INDEX IF NOT EXISTS ix_properties_address_trgm ON properties USING GIN (address gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_properties_address_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_properties_city_trgm")
+
+    _recreate_city_indexes('city')
+    op.drop_column('properties', 'city_canonical')
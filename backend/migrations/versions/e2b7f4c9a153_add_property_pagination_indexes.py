@@ -0,0 +1,32 @@
+"""add property pagination indexes
+
+Revision ID: e2b7f4c9a153
+Revises: d5a8c2f3e916
+Create Date: 2026-10-18 13:20:09.481226
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b7f4c9a153'
+down_revision: Union[str, Sequence[str], None] = 'd5a8c2f3e916'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keyset pagination compares (created_at, id) - NULLs would drop out of later pages
+    op.execute("UPDATE properties SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+    op.create_index('ix_properties_agent_created', 'properties', ['agent_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_properties_created', 'properties', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_properties_created', table_name='properties')
+    op.drop_index('ix_properties_agent_created', table_name='properties')
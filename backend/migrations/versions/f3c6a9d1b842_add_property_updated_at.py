@@ -0,0 +1,32 @@
+"""add property updated_at
+
+Revision ID: f3c6a9d1b842
+Revises: e2b7f4c9a153
+Create Date: 2026-10-18 15:02:44.118305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c6a9d1b842'
+down_revision: Union[str, Sequence[str], None] = 'e2b7f4c9a153'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('properties', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    # Existing rows count as last changed when created
+    op.execute("UPDATE properties SET updated_at = created_at")
+    op.create_index('ix_properties_updated', 'properties', ['updated_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_properties_updated', table_name='properties')
+    op.drop_column('properties', 'updated_at')
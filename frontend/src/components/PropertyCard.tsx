@@ -18,7 +18,7 @@ export const PropertyCard: React.FC<PropertyCardProps> = ({ property }) => {
   useEffect(() => {
     const fetchImage = async () => {
       try {
-        const { image_url } = await api.getPropertyImageUrl(property.id);
+        const { image_url } = await api.getPropertyImageUrl(property.id, 'card', 'webp');
         setImageUrl(image_url);
       } catch (error) {
         console.warn('Failed to fetch image for property', property.id);
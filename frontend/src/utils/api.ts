@@ -132,9 +132,13 @@ export const api = {
   },
 
   async getPropertyImageUrl(
-    propertyId: string
-  ): Promise<{ image_url: string }> {
-    const response = await fetchWithBase(`/properties/${propertyId}/image-url`);
+    propertyId: string,
+    size: 'original' | 'thumbnail' | 'card' | 'full' = 'original',
+    format: 'jpeg' | 'webp' = 'jpeg'
+  ): Promise<{ image_url: string; size: string }> {
+    const response = await fetchWithBase(
+      `/properties/${propertyId}/image-url?size=${size}&format=${format}`
+    );
     if (!response.ok) {
       throw new Error('Failed to fetch image URL');
     }